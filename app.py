@@ -4,7 +4,11 @@ Aplicação Streamlit para rankear e analisar as melhores ações e fundos
 """
 
 import streamlit as st
-from modules import ranking_acoes, ranking_fundos, analise_detalhada, comparacao
+from config import Config
+from modules import obter_pagina
+from utils.perf import iniciar_execucao, medir, exportar_json, exportar_prometheus, gravar_prometheus
+from utils.memoria import bytes_cache, bytes_sessao, aplicar_orcamento_sessao, RastreadorAlocacoes
+from utils.formatters import formatar_bytes
 
 # Configuração da página
 st.set_page_config(
@@ -144,6 +148,54 @@ st.markdown("""
     """, unsafe_allow_html=True)
 
 
+def mostrar_painel_performance(execucao):
+    """Mostra os tempos da renderização atual na sidebar."""
+    with st.expander("⚙️ Performance"):
+        st.caption(f"{execucao.nome} — {execucao.duracao:.2f}s no total")
+        
+        st.markdown("**Tempo por etapa**")
+        st.dataframe(execucao.resumo_etapas(), use_container_width=True, hide_index=True)
+        
+        lentos = execucao.mais_lentos()
+        if not lentos.empty:
+            st.markdown("**Ativos mais lentos**")
+            st.dataframe(lentos, use_container_width=True, hide_index=True)
+        
+        cache = execucao.acertos_cache()
+        if not cache.empty:
+            st.markdown("**Cache**")
+            st.dataframe(cache, use_container_width=True, hide_index=True)
+        
+        st.download_button("📥 JSON", exportar_json(execucao),
+                           file_name="performance.json", mime="application/json")
+        st.download_button("📥 Prometheus", exportar_prometheus(),
+                           file_name="metrics.prom", mime="text/plain")
+
+
+def mostrar_painel_memoria(rastreador, removidas):
+    """Mostra a memória do cache, da sessão e as alocações da renderização."""
+    with st.expander("🧠 Memória"):
+        cache = bytes_cache()
+        st.caption(f"Cache compartilhado: {formatar_bytes(cache['bytes'].sum())}")
+        cache['bytes'] = cache['bytes'].map(formatar_bytes)
+        cache['cota'] = cache['cota'].map(formatar_bytes)
+        st.dataframe(cache, use_container_width=True, hide_index=True)
+        
+        sessao = bytes_sessao(st.session_state)
+        st.caption(f"Esta sessão: {formatar_bytes(sessao['bytes_exclusivos'].sum())} "
+                   f"(orçamento {formatar_bytes(Config.SESSAO_ORCAMENTO_BYTES)})")
+        for coluna in ('bytes', 'bytes_exclusivos'):
+            sessao[coluna] = sessao[coluna].map(formatar_bytes)
+        st.dataframe(sessao, use_container_width=True, hide_index=True)
+        
+        if removidas:
+            st.caption(f"Descartado por exceder o orçamento: {', '.join(removidas)}")
+        
+        if rastreador is not None:
+            st.markdown("**Maiores alocações nesta renderização**")
+            st.dataframe(rastreador.maiores(), use_container_width=True, hide_index=True)
+
+
 def main():
     """Função principal da aplicação."""
     
@@ -151,6 +203,11 @@ def main():
     if 'pagina_atual' not in st.session_state:
         st.session_state.pagina_atual = "🏆 Ranking de Ações"
     
+    execucao = iniciar_execucao(st.session_state.pagina_atual)
+    rastreador = None
+    if Config.MEMORIA_TRACEMALLOC or st.query_params.get('mem') == '1':
+        rastreador = RastreadorAlocacoes()
+    
     if 'ativo_selecionado' not in st.session_state:
         st.session_state.ativo_selecionado = None
     
@@ -195,6 +252,11 @@ def main():
             st.session_state.pagina_atual = "⚖️ Comparação"
             st.rerun()
         
+        if st.button("🧪 Backtest", use_container_width=True,
+                    type="primary" if st.session_state.pagina_atual == "🧪 Backtest" else "secondary"):
+            st.session_state.pagina_atual = "🧪 Backtest"
+            st.rerun()
+        
         st.markdown("<hr style='margin: 2rem 0; opacity: 0.3;'>", unsafe_allow_html=True)
         
         # Informações
@@ -248,18 +310,27 @@ def main():
                 ❤️ Feito com Streamlit
             </div>
         """, unsafe_allow_html=True)
+        
+        # Preenchido depois da página, quando os tempos já estão completos
+        painel_performance = st.empty()
     
     # Conteúdo principal - roteamento baseado em session_state
     pagina = st.session_state.pagina_atual
     
-    if pagina == "🏆 Ranking de Ações":
-        ranking_acoes.show()
-    elif pagina == "💼 Ranking de Fundos":
-        ranking_fundos.show()
-    elif pagina == "🔍 Análise Detalhada":
-        analise_detalhada.show()
-    elif pagina == "⚖️ Comparação":
-        comparacao.show()
+    with medir('pagina'):
+        obter_pagina(pagina).show()
+    
+    execucao.finalizar()
+    gravar_prometheus()
+    if rastreador is not None:
+        rastreador.finalizar()
+    
+    removidas = aplicar_orcamento_sessao(st.session_state, pagina)
+    
+    if Config.PERF_PAINEL or st.query_params.get('perf') == '1':
+        with painel_performance.container():
+            mostrar_painel_performance(execucao)
+            mostrar_painel_memoria(rastreador, removidas)
 
 
 if __name__ == "__main__":
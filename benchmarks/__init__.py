@@ -0,0 +1,11 @@
+"""Benchmarks de desempenho do dashboard (offline, com dados sintéticos).
+
+Uso::
+
+    python -m benchmarks                              # todas as escalas e históricos
+    python -m benchmarks --escalas 100,1000 --historicos 1y
+    python -m benchmarks --base benchmarks/resultados/20250101-120000.json
+
+Os resultados são gravados em ``benchmarks/resultados`` e comparados com a
+execução anterior; regressões acima do limiar fazem o comando sair com código 1.
+"""
@@ -0,0 +1,167 @@
+"""Executa a suíte de benchmarks (``python -m benchmarks --help``)."""
+
+import argparse
+import logging
+import os
+import platform
+import sys
+import time
+import warnings
+from typing import Dict, List
+
+import pandas as pd
+
+from benchmarks.casos import Caso, obter_casos
+from benchmarks.medicao import (
+    carregar, comparar, medir_chamadas, resumir, salvar, ultimo_relatorio
+)
+from utils.fontes import definir_fonte, obter_fonte
+from utils.sintetico import FonteSintetica, universo_sintetico
+
+DIRETORIO_RESULTADOS = os.path.join(os.path.dirname(__file__), 'resultados')
+
+# Data final fixa: os dados sintéticos são os mesmos em todas as execuções
+FIM_DADOS = '2025-12-31'
+
+
+def _anos(historico: str) -> int:
+    """Anos de histórico de um período ('1y', '20y')."""
+    return int(historico.rstrip('y'))
+
+
+def _gerar(fonte: FonteSintetica, tickers: List[str], historico: str,
+           colunas=None) -> Dict[str, pd.DataFrame]:
+    dados = {}
+    for ticker in tickers:
+        barras = fonte.baixar_barras(ticker, historico)
+        if barras is not None:
+            dados[ticker] = barras if colunas is None else barras[colunas]
+    return dados
+
+
+def _executar_caso(caso: Caso, escala: int, historico: str, fonte: FonteSintetica,
+                   universo: List[str], args) -> Dict:
+    resultado = {'caso': caso.nome, 'escala': escala if not caso.por_ativo else None,
+                 'historico': historico}
+    celulas = (args.amostra if caso.por_ativo else escala) * 252 * _anos(historico)
+
+    if celulas > caso.limite_celulas and not args.completo:
+        return {**resultado, 'status': 'ignorado',
+                'motivo': f"{celulas:.1e} células > limite {caso.limite_celulas:.1e} (use --completo)"}
+
+    if caso.por_ativo:
+        dados = _gerar(fonte, universo[:args.amostra], historico)
+        chamadas = [
+            (lambda t=ticker, d=barras: caso.executar(t, d))
+            for ticker, barras in dados.items()
+        ]
+        medicao = medir_chamadas(chamadas, memoria=not args.sem_memoria)
+        return {**resultado, 'status': 'ok', **resumir(medicao['latencias'], 1, medicao['pico_memoria_bytes'])}
+
+    tickers = universo[:escala]
+    dados = _gerar(fonte, tickers, historico, caso.colunas) if caso.colunas != [] else {}
+
+    def executar():
+        return caso.executar(tickers, historico, dados)
+
+    repeticoes = max(1, min(args.repeticoes, caso.repeticoes_max))
+    medicao = medir_chamadas([executar] * repeticoes, memoria=not args.sem_memoria,
+                             amostra_memoria=1, preparar=caso.antes)
+    return {**resultado, 'status': 'ok',
+            **resumir(medicao['latencias'], len(tickers), medicao['pico_memoria_bytes'])}
+
+
+def _formatar_bytes(valor) -> str:
+    if not valor:
+        return '-'
+    return f"{valor / 2 ** 20:,.1f} MB"
+
+
+def _imprimir(resultado: Dict) -> None:
+    rotulo = f"{resultado['caso']:<13} {str(resultado['escala'] or 'amostra'):>8} {resultado['historico']:>4}"
+    if resultado['status'] != 'ok':
+        print(f"{rotulo}  ignorado: {resultado['motivo']}")
+        return
+    print(
+        f"{rotulo}  p50 {resultado['p50'] * 1e3:10.2f} ms  p90 {resultado['p90'] * 1e3:10.2f} ms  "
+        f"p99 {resultado['p99'] * 1e3:10.2f} ms  {resultado['vazao_ativos_s']:10.1f} ativos/s  "
+        f"pico {_formatar_bytes(resultado['pico_memoria_bytes']):>10}"
+    )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__)
+    parser.add_argument('--escalas', default='100,1000,10000',
+                        help='Tamanhos de universo (padrão: 100,1000,10000)')
+    parser.add_argument('--historicos', default='1y,5y,20y',
+                        help='Históricos (padrão: 1y,5y,20y)')
+    parser.add_argument('--casos', default='',
+                        help='Casos a executar, separados por vírgula (padrão: todos)')
+    parser.add_argument('--repeticoes', type=int, default=3,
+                        help='Repetições dos casos por universo (padrão: 3)')
+    parser.add_argument('--amostra', type=int, default=200,
+                        help='Ativos medidos nos casos por ativo (padrão: 200)')
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--sem-memoria', action='store_true',
+                        help='Não medir o pico de memória (mais rápido)')
+    parser.add_argument('--completo', action='store_true',
+                        help='Executar mesmo os casos acima do limite de células')
+    parser.add_argument('--saida', default=DIRETORIO_RESULTADOS,
+                        help='Diretório dos resultados JSON')
+    parser.add_argument('--base', default=None,
+                        help='Relatório de referência (padrão: o mais recente da saída)')
+    parser.add_argument('--limiar', type=float, default=0.10,
+                        help='Aumento relativo considerado regressão (padrão: 0.10)')
+    args = parser.parse_args(argv)
+
+    logging.getLogger().setLevel(logging.WARNING)
+    warnings.simplefilter('ignore', pd.errors.PerformanceWarning)
+
+    escalas = sorted(int(e) for e in args.escalas.split(','))
+    historicos = args.historicos.split(',')
+    casos = obter_casos([c for c in args.casos.split(',') if c])
+    universo = universo_sintetico(max(escalas))
+    base = args.base or ultimo_relatorio(args.saida)
+
+    fonte_anterior = obter_fonte()
+    resultados = []
+    inicio = time.time()
+    try:
+        for historico in historicos:
+            fonte = FonteSintetica(args.semente, anos=_anos(historico), fim=FIM_DADOS)
+            definir_fonte(fonte)
+            for caso in casos:
+                for escala in ([None] if caso.por_ativo else escalas):
+                    resultado = _executar_caso(caso, escala, historico, fonte, universo, args)
+                    _imprimir(resultado)
+                    resultados.append(resultado)
+    finally:
+        definir_fonte(fonte_anterior)
+
+    relatorio = {
+        'criado_em': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'duracao_s': time.time() - inicio,
+        'python': sys.version.split()[0],
+        'pandas': pd.__version__,
+        'plataforma': platform.platform(),
+        'parametros': vars(args),
+        'resultados': resultados
+    }
+    caminho = salvar(relatorio, args.saida)
+    print(f"\nResultados gravados em {caminho}")
+
+    if not base:
+        return 0
+
+    comparacoes = comparar(relatorio, carregar(base), args.limiar)
+    print(f"Comparação com {base} (limiar {args.limiar:.0%}):")
+    for c in comparacoes:
+        marca = 'REGRESSÃO' if c['regressao'] else 'ok'
+        memoria = f"{c['variacao_memoria']:+.1%}" if c['variacao_memoria'] is not None else '-'
+        print(f"  {c['chave']:<28} p50 {c['variacao_p50']:+7.1%}  memória {memoria:>7}  {marca}")
+
+    return 1 if any(c['regressao'] for c in comparacoes) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""Casos de benchmark.
+
+Há dois tipos de caso:
+
+- por ativo: a função é aplicada a uma amostra de ativos e cada chamada é
+  medida individualmente (o custo não depende do tamanho do universo);
+- por universo: a função recebe o universo inteiro e cada repetição é
+  uma medição.
+
+Os dados vêm direto de ``FonteSintetica``, sem marcação de cache, então as
+funções com ``cache_por_dados`` sempre calculam. O ranking é medido de
+ponta a ponta (geração dos dados, busca, score), com o cache limpo antes
+de cada repetição.
+"""
+
+from typing import Callable, List, Optional
+
+from utils.backtest import backtest_painel, montar_painel
+from utils.cache import cache_global
+from utils.data_fetcher import calcular_correlacao, normalize_prices
+from utils.indicators import calculate_all_indicators
+from utils.scoring import calcular_score_ativo, rankear_ativos, serie_score
+
+
+class Caso:
+    """
+    Descrição de um caso de benchmark.
+
+    Args:
+        nome: Identificador do caso
+        por_ativo: Se True, mede chamadas individuais sobre uma amostra
+        executar: Função (ticker, dados) para casos por ativo, ou
+            (tickers, periodo, dados) para casos por universo
+        colunas: Colunas dos dados necessárias (None: OHLCV completo)
+        limite_celulas: Ativos x barras acima do qual o caso é ignorado
+            (sem ``--completo``), para não estourar tempo ou memória
+        repeticoes_max: Limite de repetições do caso
+        antes: Função chamada antes de cada repetição (fora da medição)
+    """
+
+    def __init__(self, nome: str, por_ativo: bool, executar: Callable,
+                 colunas: Optional[List[str]] = None,
+                 limite_celulas: float = float('inf'),
+                 repeticoes_max: int = 100,
+                 antes: Optional[Callable[[], None]] = None):
+        self.nome = nome
+        self.por_ativo = por_ativo
+        self.executar = executar
+        self.colunas = colunas
+        self.limite_celulas = limite_celulas
+        self.repeticoes_max = repeticoes_max
+        self.antes = antes
+
+
+CASOS = [
+    Caso(
+        nome='indicadores',
+        por_ativo=True,
+        executar=lambda ticker, dados: calculate_all_indicators(dados)
+    ),
+    Caso(
+        nome='score',
+        por_ativo=True,
+        executar=lambda ticker, dados: calcular_score_ativo(dados)
+    ),
+    Caso(
+        nome='serie_score',
+        por_ativo=True,
+        executar=lambda ticker, dados: serie_score(dados, 252),
+        colunas=['Close']
+    ),
+    Caso(
+        nome='normalizacao',
+        por_ativo=False,
+        executar=lambda tickers, periodo, dados: normalize_prices(dados),
+        colunas=['Close'],
+        limite_celulas=2.6e7
+    ),
+    Caso(
+        nome='correlacao',
+        por_ativo=False,
+        executar=lambda tickers, periodo, dados: calcular_correlacao(dados),
+        colunas=['Close'],
+        limite_celulas=1.3e7
+    ),
+    Caso(
+        nome='ranking',
+        por_ativo=False,
+        executar=lambda tickers, periodo, dados: rankear_ativos(tickers, periodo),
+        colunas=[],
+        limite_celulas=5.1e6,
+        repeticoes_max=2,
+        antes=cache_global.limpar
+    ),
+    Caso(
+        nome='ranking_top',
+        por_ativo=False,
+        executar=lambda tickers, periodo, dados: rankear_ativos(tickers, periodo, top=10),
+        colunas=[],
+        limite_celulas=5.1e6,
+        repeticoes_max=2,
+        antes=cache_global.limpar
+    ),
+    Caso(
+        nome='backtest',
+        por_ativo=False,
+        executar=lambda tickers, periodo, dados: backtest_painel(montar_painel(dados)),
+        colunas=['Close'],
+        limite_celulas=2.6e7
+    ),
+]
+
+
+def obter_casos(nomes: Optional[List[str]] = None) -> List[Caso]:
+    """
+    Seleciona casos pelo nome.
+
+    Args:
+        nomes: Nomes desejados (None: todos)
+
+    Returns:
+        Lista de casos na ordem de ``CASOS``
+
+    Raises:
+        ValueError: Se algum nome não existir
+    """
+    if not nomes:
+        return list(CASOS)
+    desconhecidos = set(nomes) - {caso.nome for caso in CASOS}
+    if desconhecidos:
+        raise ValueError(f"Casos desconhecidos: {', '.join(sorted(desconhecidos))}")
+    return [caso for caso in CASOS if caso.nome in nomes]
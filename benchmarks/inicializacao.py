@@ -0,0 +1,91 @@
+"""Mede o tempo de inicialização a frio do app (``python -m benchmarks.inicializacao``).
+
+Cada medição roda em um interpretador novo. O cenário 'sob demanda' importa
+``app`` como está; o cenário 'antecipado' importa também todas as páginas e
+as dependências pesadas (plotly.express, yfinance), reproduzindo o custo de
+quando ``app.py`` importava tudo no topo.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.medicao import salvar
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CENARIOS = {
+    'sob demanda': 'import app',
+    'antecipado': (
+        'import app\n'
+        'from modules import ranking_acoes, ranking_fundos, analise_detalhada, comparacao\n'
+        'import plotly.express\n'
+        'import yfinance'
+    ),
+}
+
+_MEDIDOR = '''
+import time
+inicio = time.perf_counter()
+{codigo}
+print(time.perf_counter() - inicio)
+'''
+
+
+def medir_cenario(codigo: str, repeticoes: int) -> list:
+    """
+    Executa o código em interpretadores novos e mede o tempo de importação.
+
+    Args:
+        codigo: Código Python a medir
+        repeticoes: Número de interpretadores
+
+    Returns:
+        Lista de tempos em segundos
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        saida = subprocess.run(
+            [sys.executable, '-c', _MEDIDOR.format(codigo=codigo)],
+            cwd=RAIZ, capture_output=True, text=True, check=True
+        )
+        tempos.append(float(saida.stdout.strip().splitlines()[-1]))
+    return tempos
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.inicializacao', description=__doc__)
+    parser.add_argument('--repeticoes', type=int, default=10)
+    parser.add_argument('--saida', default=os.path.join(RAIZ, 'benchmarks', 'resultados', 'inicializacao'))
+    args = parser.parse_args(argv)
+
+    resultados = {}
+    for nome, codigo in CENARIOS.items():
+        tempos = medir_cenario(codigo, args.repeticoes)
+        resultados[nome] = {
+            'p50': float(np.median(tempos)),
+            'min': float(np.min(tempos)),
+            'max': float(np.max(tempos))
+        }
+        print(f"{nome:<12} p50 {resultados[nome]['p50'] * 1e3:8.1f} ms  "
+              f"(min {resultados[nome]['min'] * 1e3:.1f}, max {resultados[nome]['max'] * 1e3:.1f})")
+
+    ganho = resultados['antecipado']['p50'] - resultados['sob demanda']['p50']
+    print(f"Ganho na inicialização: {ganho * 1e3:.1f} ms "
+          f"({ganho / resultados['antecipado']['p50']:.0%})")
+
+    caminho = salvar({
+        'criado_em': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'repeticoes': args.repeticoes,
+        'resultados': resultados
+    }, args.saida)
+    print(f"Resultados gravados em {caminho}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,183 @@
+"""Verifica o limitador da fonte contra um servidor que limita a taxa (``python -m benchmarks.limitador``).
+
+Um ``ThreadingHTTPServer`` local responde HTTP 429 quando recebe mais de
+``--limite`` requisições por segundo. Várias threads fazem requisições por
+um ``LimitadorFonte`` novo, em duas fases: com o servidor limitando e, em
+seguida, sem limite. Os limites de concorrência e de taxa precisam cair
+depois das respostas 429 e voltar a subir quando a limitação acaba (sai
+com código 1 se não caírem ou não se recuperarem).
+"""
+
+import argparse
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.limitador import LimitadorFonte
+from utils.resiliencia import ErroLimiteRequisicoes
+
+
+class ServidorLimitado(ThreadingHTTPServer):
+    """Servidor local que recusa (429) o que passar de ``limite`` requisições/s."""
+
+    daemon_threads = True
+
+    def __init__(self, limite: float, latencia: float):
+        super().__init__(('127.0.0.1', 0), _Tratador)
+        self.limite = limite
+        self.latencia = latencia
+        self._aceitas = deque()
+        self._lock = threading.Lock()
+
+    def aceitar(self) -> bool:
+        """Registra a requisição na janela de 1 s; False se passar do limite."""
+        if self.limite is None:
+            return True
+        with self._lock:
+            agora = time.monotonic()
+            while self._aceitas and agora - self._aceitas[0] >= 1.0:
+                self._aceitas.popleft()
+            if len(self._aceitas) >= self.limite:
+                return False
+            self._aceitas.append(agora)
+            return True
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/"
+
+
+class _Tratador(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if not self.server.aceitar():
+            self.send_error(429, 'Too Many Requests')
+            return
+        time.sleep(self.server.latencia)
+        corpo = b'ok'
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+
+def _requisitar(url: str) -> bytes:
+    try:
+        with urllib.request.urlopen(url, timeout=10) as resposta:
+            return resposta.read()
+    except urllib.error.HTTPError as e:
+        if e.code == 429:
+            raise ErroLimiteRequisicoes(f"{url}: 429 Too Many Requests") from e
+        raise
+
+
+def executar_fase(limitador: LimitadorFonte, url: str, requisicoes: int, threads: int) -> dict:
+    """
+    Faz as requisições pelo limitador e registra os limites após cada uma.
+
+    Args:
+        limitador: Limitador sob teste
+        url: Endereço do servidor
+        requisicoes: Total de requisições da fase
+        threads: Threads clientes
+
+    Returns:
+        Dicionário com as amostras (estatísticas do limitador após cada
+        requisição), a duração e a quantidade de respostas 429
+    """
+    amostras = []
+    lock = threading.Lock()
+
+    def requisitar(_):
+        try:
+            limitador.executar(lambda: _requisitar(url))
+        except ErroLimiteRequisicoes:
+            pass
+        with lock:
+            amostras.append(limitador.estatisticas())
+
+    limitadas_antes = limitador.estatisticas()['limitadas']
+    inicio = time.monotonic()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(requisitar, range(requisicoes)))
+    return {
+        'amostras': amostras,
+        'segundos': time.monotonic() - inicio,
+        'limitadas': limitador.estatisticas()['limitadas'] - limitadas_antes
+    }
+
+
+def verificar(limitada: dict, livre: dict) -> list:
+    """
+    Confere que os limites caíram com as respostas 429 e se recuperaram depois.
+
+    Args:
+        limitada: Resultado de ``executar_fase`` com o servidor limitando
+        livre: Resultado de ``executar_fase`` com o servidor sem limite
+
+    Returns:
+        Lista de falhas encontradas
+    """
+    if not limitada['limitadas']:
+        return ["o servidor não limitou nenhuma requisição; aumente --requisicoes ou reduza --limite"]
+
+    antes = [a for a in limitada['amostras'] if a['limitadas'] == 0]
+    depois = [a for a in limitada['amostras'] if a['limitadas'] > 0]
+    falhas = []
+    for chave, nome in (('concorrencia', 'concorrência'), ('taxa', 'taxa')):
+        pico = max((a[chave] for a in antes), default=limitada['amostras'][0][chave])
+        minimo = min(a[chave] for a in depois)
+        final = livre['amostras'][-1][chave]
+        print(f"{nome:<12} pico antes do 1º 429 {pico:6.2f}  mínimo após {minimo:6.2f}  "
+              f"final sem limitação {final:6.2f}")
+        if minimo >= pico:
+            falhas.append(f"{nome} não caiu após as respostas 429 ({pico:.2f} -> {minimo:.2f})")
+        if final < pico:
+            falhas.append(f"{nome} não se recuperou sem limitação ({final:.2f} < pico de {pico:.2f})")
+    return falhas
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.limitador', description=__doc__)
+    parser.add_argument('--limite', type=float, default=20.0, help='Requisições por segundo aceitas pelo servidor')
+    parser.add_argument('--latencia', type=float, default=0.05, help='Latência das respostas aceitas (s)')
+    parser.add_argument('--threads', type=int, default=16, help='Threads clientes')
+    parser.add_argument('--requisicoes', type=int, default=400, help='Requisições na fase limitada')
+    parser.add_argument('--recuperacao', type=int, default=300, help='Requisições na fase sem limite')
+    args = parser.parse_args(argv)
+
+    servidor = ServidorLimitado(args.limite, args.latencia)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    limitador = LimitadorFonte()
+    try:
+        limitada = executar_fase(limitador, servidor.url, args.requisicoes, args.threads)
+        servidor.limite = None
+        livre = executar_fase(limitador, servidor.url, args.recuperacao, args.threads)
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
+
+    for nome, fase in (('limitada', limitada), ('sem limite', livre)):
+        total = len(fase['amostras'])
+        print(f"fase {nome:<10} {total} requisições em {fase['segundos']:.1f}s "
+              f"({total / fase['segundos']:.1f}/s), {fase['limitadas']} com 429 "
+              f"({fase['limitadas'] / total:.1%})")
+
+    falhas = verificar(limitada, livre)
+    for falha in falhas:
+        print(f"FALHA: {falha}")
+    if not falhas:
+        print("OK: os limites caem com as respostas 429 e se recuperam quando a limitação acaba")
+    return 1 if falhas else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
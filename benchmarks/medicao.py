@@ -0,0 +1,154 @@
+"""Medição de tempo e memória, persistência e comparação de resultados."""
+
+import glob
+import json
+import os
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+
+def medir_chamadas(chamadas: List[Callable[[], object]], memoria: bool = True,
+                   amostra_memoria: int = 10,
+                   preparar: Optional[Callable[[], None]] = None) -> Dict:
+    """
+    Mede uma lista de chamadas independentes (uma latência por chamada).
+
+    A memória é medida em uma passada separada com ``tracemalloc`` (que
+    deixa a execução mais lenta e distorceria as latências).
+
+    Args:
+        chamadas: Funções sem argumentos
+        memoria: Se True, mede o pico de memória
+        amostra_memoria: Quantas chamadas usar na medição de memória
+        preparar: Função chamada antes de cada chamada, fora da medição
+
+    Returns:
+        Dicionário com latências (s) e pico de memória (bytes ou None)
+    """
+    latencias = []
+    for chamada in chamadas:
+        if preparar:
+            preparar()
+        inicio = time.perf_counter()
+        chamada()
+        latencias.append(time.perf_counter() - inicio)
+
+    pico = None
+    if memoria:
+        pico = 0
+        for chamada in chamadas[:amostra_memoria]:
+            if preparar:
+                preparar()
+            tracemalloc.start()
+            try:
+                chamada()
+                pico = max(pico, tracemalloc.get_traced_memory()[1])
+            finally:
+                tracemalloc.stop()
+
+    return {'latencias': latencias, 'pico_memoria_bytes': pico}
+
+
+def resumir(latencias: List[float], unidades_por_chamada: int, pico: Optional[int]) -> Dict:
+    """
+    Calcula percentis, média e vazão a partir das latências.
+
+    Args:
+        latencias: Latências em segundos
+        unidades_por_chamada: Ativos processados por chamada
+        pico: Pico de memória em bytes
+
+    Returns:
+        Dicionário com o resumo da medição
+    """
+    valores = np.asarray(latencias)
+    return {
+        'chamadas': len(valores),
+        'p50': float(np.percentile(valores, 50)),
+        'p90': float(np.percentile(valores, 90)),
+        'p99': float(np.percentile(valores, 99)),
+        'media': float(valores.mean()),
+        'vazao_ativos_s': float(unidades_por_chamada * len(valores) / valores.sum()),
+        'pico_memoria_bytes': pico
+    }
+
+
+def chave_resultado(resultado: Dict) -> str:
+    """Identificador de um resultado para comparação entre execuções."""
+    return f"{resultado['caso']}|{resultado['escala']}|{resultado['historico']}"
+
+
+def salvar(relatorio: Dict, diretorio: str) -> str:
+    """
+    Grava o relatório em ``diretorio/AAAAMMDD-HHMMSS.json``.
+
+    Returns:
+        Caminho do arquivo gravado
+    """
+    os.makedirs(diretorio, exist_ok=True)
+    caminho = os.path.join(diretorio, time.strftime('%Y%m%d-%H%M%S') + '.json')
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(relatorio, f, indent=2, ensure_ascii=False)
+    return caminho
+
+
+def carregar(caminho: str) -> Dict:
+    """Lê um relatório gravado por ``salvar``."""
+    with open(caminho, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def ultimo_relatorio(diretorio: str) -> Optional[str]:
+    """Caminho do relatório mais recente do diretório (ou None)."""
+    arquivos = sorted(glob.glob(os.path.join(diretorio, '*.json')))
+    return arquivos[-1] if arquivos else None
+
+
+def comparar(atual: Dict, base: Dict, limiar: float, minimo_absoluto: float = 5e-4) -> List[Dict]:
+    """
+    Compara dois relatórios caso a caso.
+
+    Uma regressão é um aumento relativo acima de ``limiar`` na latência p50
+    (desde que maior que ``minimo_absoluto`` segundos, para ignorar ruído
+    em casos muito rápidos) ou no pico de memória.
+
+    Args:
+        atual: Relatório da execução atual
+        base: Relatório de referência
+        limiar: Aumento relativo tolerado (0.1 = 10%)
+        minimo_absoluto: Diferença mínima de latência considerada (s)
+
+    Returns:
+        Lista com uma entrada por caso presente nos dois relatórios
+    """
+    anteriores = {
+        chave_resultado(r): r for r in base.get('resultados', []) if r.get('status') == 'ok'
+    }
+    comparacoes = []
+
+    for resultado in atual.get('resultados', []):
+        anterior = anteriores.get(chave_resultado(resultado))
+        if resultado.get('status') != 'ok' or anterior is None:
+            continue
+
+        variacao = resultado['p50'] / anterior['p50'] - 1 if anterior['p50'] > 0 else 0.0
+        regressao = variacao > limiar and resultado['p50'] - anterior['p50'] > minimo_absoluto
+
+        variacao_memoria = None
+        if resultado.get('pico_memoria_bytes') and anterior.get('pico_memoria_bytes'):
+            variacao_memoria = resultado['pico_memoria_bytes'] / anterior['pico_memoria_bytes'] - 1
+            regressao = regressao or variacao_memoria > limiar
+
+        comparacoes.append({
+            'chave': chave_resultado(resultado),
+            'p50_base': anterior['p50'],
+            'p50_atual': resultado['p50'],
+            'variacao_p50': variacao,
+            'variacao_memoria': variacao_memoria,
+            'regressao': regressao
+        })
+
+    return comparacoes
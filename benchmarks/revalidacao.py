@@ -0,0 +1,94 @@
+"""Verifica o stale-while-revalidate do cache (``python -m benchmarks.revalidacao``).
+
+Uma função com ``cache_por_argumentos(..., revalidar=True)`` e TTL curto é
+chamada até a entrada expirar. A chamada seguinte deve devolver o valor
+obsoleto na hora e, depois da revalidação em segundo plano, o valor novo
+deve substituir o obsoleto, com uma única chamada à função por expiração.
+Um valor recusado por ``cachear`` deve manter o obsoleto.
+"""
+
+import argparse
+import sys
+import time
+
+from utils.cache import cache_global, cache_por_argumentos
+
+_NAMESPACE = 'verificacao_revalidacao'
+
+
+def _aguardar(condicao, prazo: float) -> bool:
+    limite = time.monotonic() + prazo
+    while time.monotonic() < limite:
+        if condicao():
+            return True
+        time.sleep(0.02)
+    return condicao()
+
+
+def verificar_substituicao(ttl: float, prazo: float) -> list:
+    """Valor revalidado substitui o obsoleto. Retorna as falhas encontradas."""
+    chamadas = []
+
+    @cache_por_argumentos(_NAMESPACE, ttl=ttl, revalidar=True)
+    def carregar(chave):
+        chamadas.append(chave)
+        return len(chamadas)
+
+    falhas = []
+    if carregar('a') != 1:
+        falhas.append("primeira chamada não calculou o valor")
+    time.sleep(ttl * 1.5)
+
+    obsoleto = carregar('a')
+    if obsoleto != 1:
+        falhas.append(f"entrada expirada deveria ser servida obsoleta (1), veio {obsoleto}")
+    # A idade da entrada volta a zero quando a revalidação grava o valor novo
+    if not _aguardar(lambda: (carregar.idade_cache('a') or ttl) < ttl, prazo):
+        falhas.append("revalidação não gravou um valor novo")
+    atual = carregar('a')
+    if atual != 2:
+        falhas.append(f"valor revalidado (2) não substituiu o obsoleto, veio {atual}")
+    if len(chamadas) != 2:
+        falhas.append(f"esperadas 2 chamadas à função, houve {len(chamadas)}")
+    return falhas
+
+
+def verificar_recusa(ttl: float, prazo: float) -> list:
+    """Valor recusado por ``cachear`` mantém o obsoleto."""
+    chamadas = []
+
+    @cache_por_argumentos(_NAMESPACE, ttl=ttl, revalidar=True, cachear=lambda valor: valor != 'ruim')
+    def carregar(chave):
+        chamadas.append(chave)
+        return 'bom' if len(chamadas) == 1 else 'ruim'
+
+    falhas = []
+    carregar('b')
+    time.sleep(ttl * 1.5)
+    carregar('b')
+    _aguardar(lambda: len(chamadas) >= 2, prazo)
+    time.sleep(0.1)
+    valor = carregar('b')
+    if valor != 'bom':
+        falhas.append(f"valor recusado por cachear substituiu o obsoleto: {valor!r}")
+    return falhas
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.revalidacao', description=__doc__)
+    parser.add_argument('--ttl', type=float, default=0.2, help='TTL das entradas (s)')
+    parser.add_argument('--prazo', type=float, default=5.0, help='Espera máxima pela revalidação (s)')
+    args = parser.parse_args(argv)
+
+    falhas = verificar_substituicao(args.ttl, args.prazo) + verificar_recusa(args.ttl, args.prazo)
+    cache_global.limpar(_NAMESPACE)
+
+    for falha in falhas:
+        print(f"FALHA: {falha}")
+    if not falhas:
+        print("OK: valores revalidados substituem os obsoletos; valores recusados são descartados")
+    return 1 if falhas else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,5 +1,8 @@
 """Configurações centralizadas do dashboard."""
 
+import os
+
+
 class Config:
     """Classe de configuração do aplicativo."""
     
@@ -328,6 +331,102 @@ class Config:
         'momento': 0.15            # 15% - Momentum (RSI)
     }
     
+    # Desempenho dos gráficos
+    GRAFICO_MAX_PONTOS = 800         # Pontos por série após downsampling (LTTB)
+    GRAFICO_LIMIAR_WEBGL = 2000      # Total de pontos a partir do qual usa WebGL
+    GRAFICO_MAX_CANDLES = 300        # Candles exibidos antes de agregar barras
+    
+    # Cache em memória (compartilhado entre sessões)
+    CACHE_ORCAMENTO_BYTES = 512 * 1024 ** 2     # Orçamento total
+    CACHE_COTAS = {                             # Cota por namespace
+        'precos': 256 * 1024 ** 2,
+        'info': 16 * 1024 ** 2,
+        'indicadores': 192 * 1024 ** 2,
+        'scores': 16 * 1024 ** 2,
+        'historico': 16 * 1024 ** 2
+    }
+    CACHE_POLITICA = 'lru'                      # 'lru' ou 'lfu'
+    CACHE_MAX_OBSOLETO = 24 * 3600              # Idade máxima servida após expirar (s)
+    CACHE_SWR_WORKERS = 4                       # Threads de revalidação em segundo plano
+    
+    # Pregões (fuso, abertura, fechamento) usados na expiração do cache de preços
+    PREGOES = {
+        'B3': ('America/Sao_Paulo', '10:00', '17:00'),
+        'NYSE': ('America/New_York', '09:30', '16:00')
+    }
+    CACHE_TTL_PREGAO = 300                      # TTL da última barra com pregão aberto (s)
+    CACHE_ATRASO_FECHAMENTO = 3600              # Após o fechamento, até a barra final estabilizar (s)
+    CACHE_TTL_INFO = 6 * 3600                   # TTL mínimo das informações dos ativos (s)
+    CACHE_PERIODO_CAUDA = '5d'                  # Barras recentes baixadas na atualização incremental
+    
+    # Cache negativo (tickers que falham) e disjuntor da fonte de dados
+    NEGATIVO_BACKOFF_BASE = 300                 # Primeira espera após falha (s)
+    NEGATIVO_BACKOFF_MAX = 24 * 3600            # Espera máxima (s)
+    NEGATIVO_FALHAS_CRONICAS = 3                # Falhas seguidas para entrar no relatório
+    DISJUNTOR_JANELA = 60                       # Janela de observação (s)
+    DISJUNTOR_MIN_CHAMADAS = 10                 # Chamadas mínimas na janela para abrir
+    DISJUNTOR_LIMIAR_ERRO = 0.5                 # Taxa de erro que abre o disjuntor
+    DISJUNTOR_TEMPO_ABERTO = 60                 # Tempo aberto antes de testar de novo (s)
+    
+    # Limitador adaptativo de requisições (balde de tokens + concorrência AIMD)
+    LIMITADOR_TAXA_INICIAL = 5.0                # Requisições por segundo no início
+    LIMITADOR_TAXA_MIN = 0.5
+    LIMITADOR_TAXA_MAX = 50.0
+    LIMITADOR_INCREMENTO_TAXA = 0.2             # Aumento da taxa a cada sucesso
+    LIMITADOR_RAJADA = 5                        # Capacidade do balde
+    LIMITADOR_CONCORRENCIA_INICIAL = 4
+    LIMITADOR_CONCORRENCIA_MIN = 1
+    LIMITADOR_CONCORRENCIA_MAX = 16
+    LIMITADOR_FATOR_LIMITADO = 0.5              # Redução após HTTP 429
+    LIMITADOR_FATOR_ERRO = 0.8                  # Redução após outros erros
+    LIMITADOR_INTERVALO_REDUCAO = 1.0           # Intervalo mínimo entre reduções (s)
+    
+    # Fonte de dados: 'yfinance', 'gravar' (yfinance + gravação em disco),
+    # 'reproduzir' (offline, a partir das gravações) ou 'sintetico' (gerada)
+    FONTE_DADOS = os.environ.get('FONTE_DADOS', 'yfinance')
+    FONTE_DIRETORIO_GRAVACOES = os.environ.get('FONTE_DIRETORIO_GRAVACOES', 'gravacoes')
+    FONTE_LATENCIA_REPRODUCAO = float(os.environ.get('FONTE_LATENCIA_REPRODUCAO', '0'))    # (s)
+    FONTE_VARIACAO_REPRODUCAO = float(os.environ.get('FONTE_VARIACAO_REPRODUCAO', '0'))    # Ruído (s)
+    SINTETICO_SEMENTE = int(os.environ.get('SINTETICO_SEMENTE', '0'))
+    SINTETICO_ANOS = int(os.environ.get('SINTETICO_ANOS', '20'))             # Histórico máximo
+    
+    # Backtest da estratégia de ranking (comprar os melhores e rebalancear)
+    BACKTEST_PERIODO = '10y'                    # Histórico buscado
+    BACKTEST_TOP = 10                           # Ativos na carteira
+    BACKTEST_JANELA = 252                       # Pregões de histórico por score (≈ '1y')
+    BACKTEST_FREQUENCIA = 'M'                   # Rebalanceamento: 'W', 'M' ou 'Q'
+    BACKTEST_CUSTO = 0.001                      # Custo por unidade de giro (0,1%)
+    BACKTEST_BENCHMARK_BR = 'BOVA11.SA'
+    BACKTEST_BENCHMARK_EUA = 'SPY'
+    
+    # Histórico dos rankings de ações (um snapshot Parquet por dia; ver utils.historico)
+    HISTORICO_ATIVO = os.environ.get('HISTORICO_ATIVO', '1') == '1'
+    HISTORICO_DIRETORIO = os.environ.get('HISTORICO_DIRETORIO', 'historico_ranking')
+    
+    # Cards por página na lista de fundos
+    FUNDOS_POR_PAGINA = 20
+    
+    # Instrumentação de performance: painel "⚙️ Performance" na sidebar
+    # (também ativado com ?perf=1 na URL) e arquivo de métricas Prometheus
+    PERF_PAINEL = os.environ.get('PERF_PAINEL', '0') == '1'
+    PERF_ARQUIVO_PROMETHEUS = os.environ.get('PERF_ARQUIVO_PROMETHEUS', '')
+    
+    # Memória por sessão: acima do orçamento, o estado de outras páginas é
+    # descartado (e recalculado se o usuário voltar a elas)
+    SESSAO_ORCAMENTO_BYTES = int(os.environ.get('SESSAO_ORCAMENTO_BYTES', 64 * 1024 ** 2))
+    SESSAO_ESTADO_PAGINAS = {
+        "🏆 Ranking de Ações": ('df_ranking', 'df_ranking_dados_em', 'df_ranking_universo', 'indice_ranking'),
+        "💼 Ranking de Fundos": ('df_ranking_fundos', 'df_ranking_fundos_dados_em', 'indice_ranking_fundos'),
+        "⚖️ Comparação": ('dados_comparacao', 'tickers_comparacao'),
+        "🧪 Backtest": ('resultado_backtest',)
+    }
+    MEMORIA_TRACEMALLOC = os.environ.get('MEMORIA_TRACEMALLOC', '0') == '1'    # Também ?mem=1
+    
+    # Pipeline assíncrono de busca
+    ASYNC_CONCORRENCIA = 16                     # Ativos em andamento por lote
+    ASYNC_PRAZO = 20                            # Prazo por ativo (s)
+    ASYNC_HEDGE_MIN = 3.0                       # Espera mínima antes da segunda tentativa (s)
+    
     # Setores em português
     SETORES_PORTUGUES = {
         'Technology': 'Tecnologia',
@@ -1,17 +1,49 @@
 """
 Módulos de análise do Dashboard de Investimentos - Sistema de Ranking.
+
+As páginas são importadas na primeira navegação (``obter_pagina``), e não
+na inicialização: cada execução renderiza uma só página.
 """
 
-from . import ranking_acoes
-from . import ranking_fundos
-from . import analise_detalhada
-from . import comparacao
+import importlib
+
+# Página (rótulo da navegação) -> módulo que a implementa
+PAGINAS = {
+    "🏆 Ranking de Ações": 'ranking_acoes',
+    "💼 Ranking de Fundos": 'ranking_fundos',
+    "🔍 Análise Detalhada": 'analise_detalhada',
+    "⚖️ Comparação": 'comparacao',
+    "🧪 Backtest": 'backtest'
+}
+
+
+def obter_pagina(nome):
+    """
+    Importa (na primeira vez) e retorna o módulo de uma página.
+    
+    Args:
+        nome: Rótulo da página em PAGINAS
+        
+    Returns:
+        Módulo da página, com a função ``show()``
+    """
+    return importlib.import_module(f'.{PAGINAS[nome]}', __name__)
+
 
 __all__ = [
     'ranking_acoes',
     'ranking_fundos',
     'analise_detalhada',
-    'comparacao'
+    'comparacao',
+    'backtest',
+    'PAGINAS',
+    'obter_pagina'
 ]
 
 __version__ = '3.0.0'
+
+
+def __getattr__(nome):
+    if nome in PAGINAS.values():
+        return importlib.import_module(f'.{nome}', __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
@@ -2,10 +2,15 @@
 
 import streamlit as st
 import plotly.graph_objects as go
-from utils.data_fetcher import fetch_stock_data, get_stock_info
-from utils.indicators import calculate_all_indicators, get_signal_interpretation
-from utils.scoring import calcular_score_ativo
-from utils.formatters import formatar_moeda, formatar_percentual, traduzir_setor, obter_simbolo_moeda
+from plotly.subplots import make_subplots
+from config import Config
+from utils.data_fetcher import get_stock_info, idade_dados
+from utils.indicators import get_indicator_bundle, get_signal_interpretation
+from utils.charts import downsample_series, reamostrar_ohlc, usar_webgl, criar_linha
+from utils.scoring import calcular_score_ativo, serie_score_ativo
+from utils.historico import universos_historico, historico_ativo
+from utils.formatters import formatar_moeda, formatar_percentual, traduzir_setor, obter_simbolo_moeda, formatar_idade
+from utils.perf import medido
 
 
 def show():
@@ -42,19 +47,11 @@ def show():
     with col2:
         periodo_label = st.selectbox(
             "📅 Período:",
-            ['1 mês', '3 meses', '6 meses', '1 ano', '2 anos'],
+            list(Config.PERIODOS.keys()),
             index=3,
             key="select_periodo_detalhado"
         )
-        
-        periodos_map = {
-            '1 mês': '1mo',
-            '3 meses': '3mo',
-            '6 meses': '6mo',
-            '1 ano': '1y',
-            '2 anos': '2y'
-        }
-        periodo = periodos_map[periodo_label]
+        periodo = Config.PERIODOS[periodo_label]
     
     with col3:
         st.markdown("<br>", unsafe_allow_html=True)
@@ -74,9 +71,11 @@ def analisar_ativo(ticker, periodo):
     
     # Buscar dados
     with st.spinner(f'🔄 Carregando dados de {ticker}...'):
-        dados = fetch_stock_data(ticker, periodo)
+        bundle = get_indicator_bundle(ticker, periodo)
         info = get_stock_info(ticker)
     
+    dados = bundle['dados'] if bundle else None
+    
     if dados is None or dados.empty:
         st.error(f"""
             ### ❌ Não foi possível obter dados para {ticker}
@@ -113,6 +112,9 @@ def analisar_ativo(ticker, periodo):
         if info and 'sector' in info:
             setor = traduzir_setor(info['sector'])
             st.caption(f"Setor: {setor}")
+        idade = idade_dados([ticker], periodo)
+        if idade is not None:
+            st.caption(f"🕒 Dados de mercado atualizados {formatar_idade(idade)}")
     
     with col2:
         st.markdown(f"""
@@ -166,10 +168,26 @@ def analisar_ativo(ticker, periodo):
     st.markdown("### 🎯 Análise Multidimensional")
     criar_grafico_radar(score_data)
     
+    # === EVOLUÇÃO DO SCORE ===
+    serie = serie_score_ativo(ticker, periodo)
+    if serie is not None and serie['total'].notna().any():
+        st.markdown("### 📈 Evolução do Score")
+        criar_grafico_evolucao_score(serie.dropna(how='all'))
+    
+    # === HISTÓRICO NO RANKING (snapshots gravados pelo ranking de ações) ===
+    historicos = {}
+    for universo in universos_historico():
+        historico = historico_ativo(ticker, universo, periodo)
+        if not historico.empty:
+            historicos[universo] = historico
+    if historicos:
+        st.markdown("### 🕒 Histórico no Ranking")
+        criar_grafico_historico_ranking(historicos)
+    
     # === ANÁLISE TÉCNICA ===
     st.markdown("### 📈 Análise Técnica")
     
-    indicators = calculate_all_indicators(dados)
+    indicators = bundle['indicadores']
     signals = get_signal_interpretation(indicators)
     
     if signals:
@@ -201,6 +219,8 @@ def analisar_ativo(ticker, periodo):
                     </div>
                 """, unsafe_allow_html=True)
     
+    criar_grafico_tecnico(dados, indicators)
+    
     st.markdown("<br>", unsafe_allow_html=True)
     
     # === INFORMAÇÕES FUNDAMENTALISTAS ===
@@ -291,6 +311,7 @@ def criar_metrica_score(titulo, score, valor):
     """, unsafe_allow_html=True)
 
 
+@medido('grafico.radar')
 def criar_grafico_radar(score_data):
     """Cria gráfico de radar com os scores."""
     
@@ -333,3 +354,202 @@ def criar_grafico_radar(score_data):
     )
     
     st.plotly_chart(fig, use_container_width=True)
+
+
+@medido('grafico.evolucao_score')
+def criar_grafico_evolucao_score(serie):
+    """Cria gráfico da evolução diária do score total e dos componentes."""
+    componentes = {
+        'retorno': ('Retorno', '#3b82f6'),
+        'volatilidade': ('Volatilidade', '#10b981'),
+        'sharpe': ('Sharpe', '#f59e0b'),
+        'tendencia': ('Tendência', '#8b5cf6'),
+        'momento': ('Momento', '#ec4899')
+    }
+    
+    fig = go.Figure()
+    webgl = usar_webgl(serie.count().sum())
+    
+    total = downsample_series(serie['total'])
+    fig.add_trace(criar_linha(
+        total.index, total.values, webgl=webgl,
+        mode='lines', name='Score Total',
+        line=dict(color='#667eea', width=3)
+    ))
+    
+    # Componentes começam ocultos (clique na legenda para exibir)
+    for coluna, (nome, cor) in componentes.items():
+        valores = downsample_series(serie[coluna])
+        fig.add_trace(criar_linha(
+            valores.index, valores.values, webgl=webgl,
+            mode='lines', name=nome, visible='legendonly',
+            line=dict(color=cor, width=1.5)
+        ))
+    
+    fig.update_layout(
+        title='Score Diário (janela do período analisado)',
+        yaxis_title='Score',
+        yaxis=dict(range=[0, 100]),
+        xaxis_title='Data',
+        height=450,
+        hovermode='x unified',
+        template='plotly_white',
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        )
+    )
+    
+    st.plotly_chart(fig, use_container_width=True)
+
+
+@medido('grafico.historico_ranking')
+def criar_grafico_historico_ranking(historicos):
+    """Cria gráfico da posição do ativo no ranking ao longo do último ano, por mercado."""
+    nomes = {'brasil': '🇧🇷 Brasil', 'internacional': '🌎 Internacional', 'global': '🌍 Global'}
+    cores = ['#667eea', '#10b981', '#f59e0b']
+    
+    fig = go.Figure()
+    
+    for i, (universo, historico) in enumerate(historicos.items()):
+        fig.add_trace(go.Scatter(
+            x=historico.index,
+            y=historico['ranking'],
+            mode='lines+markers',
+            name=nomes.get(universo, universo),
+            line=dict(color=cores[i % len(cores)], width=2),
+            marker=dict(size=4),
+            customdata=historico[['ativos', 'score_total']].to_numpy(),
+            hovertemplate='%{y}º de %{customdata[0]} — score %{customdata[1]:.1f}<extra>%{fullData.name}</extra>'
+        ))
+    
+    fig.update_layout(
+        title='Posição no Ranking',
+        yaxis_title='Posição',
+        yaxis=dict(autorange='reversed'),
+        xaxis_title='Data',
+        height=400,
+        hovermode='x unified',
+        template='plotly_white'
+    )
+    
+    st.plotly_chart(fig, use_container_width=True)
+
+
+@medido('grafico.tecnico')
+def criar_grafico_tecnico(dados, indicators):
+    """Cria gráfico de candlestick com volume, RSI e MACD."""
+    
+    if not all(col in dados.columns for col in ['Open', 'High', 'Low', 'Close']):
+        st.warning("Dados OHLC indisponíveis para o gráfico técnico.")
+        return
+    
+    candles = reamostrar_ohlc(dados)
+    tem_volume = 'Volume' in candles.columns
+    
+    fig = make_subplots(
+        rows=4, cols=1,
+        shared_xaxes=True,
+        vertical_spacing=0.03,
+        row_heights=[0.5, 0.15, 0.15, 0.2],
+        subplot_titles=('Preço', 'Volume', 'RSI', 'MACD')
+    )
+    
+    # Preço
+    fig.add_trace(go.Candlestick(
+        x=candles.index,
+        open=candles['Open'],
+        high=candles['High'],
+        low=candles['Low'],
+        close=candles['Close'],
+        name='Preço',
+        increasing_line_color='#10b981',
+        decreasing_line_color='#ef4444'
+    ), row=1, col=1)
+    
+    linhas_preco = [
+        ('SMA_20', 'Média 20', '#667eea', 'solid'),
+        ('SMA_50', 'Média 50', '#f59e0b', 'solid'),
+        ('SMA_200', 'Média 200', '#8b5cf6', 'solid'),
+        ('BB_upper', 'Bollinger Sup.', '#94a3b8', 'dot'),
+        ('BB_lower', 'Bollinger Inf.', '#94a3b8', 'dot')
+    ]
+    
+    # WebGL pelos pontos das linhas desenhadas (candles e barras não mudam)
+    linhas = [chave for chave, *_ in linhas_preco if chave in indicators]
+    if 'RSI' in indicators and indicators['RSI'] is not None:
+        linhas.append('RSI')
+    if 'MACD' in indicators and 'MACD_signal' in indicators:
+        linhas += ['MACD', 'MACD_signal']
+    webgl = usar_webgl(sum(indicators[chave].count() for chave in linhas))
+    
+    for chave, nome, cor, estilo in linhas_preco:
+        if chave in indicators:
+            serie = downsample_series(indicators[chave])
+            fig.add_trace(criar_linha(
+                serie.index, serie.values, webgl=webgl,
+                mode='lines', name=nome,
+                line=dict(color=cor, width=1.5, dash=estilo)
+            ), row=1, col=1)
+    
+    # Volume
+    if tem_volume:
+        cores_volume = ['#10b981' if f >= a else '#ef4444'
+                        for a, f in zip(candles['Open'], candles['Close'])]
+        fig.add_trace(go.Bar(
+            x=candles.index,
+            y=candles['Volume'],
+            marker_color=cores_volume,
+            name='Volume',
+            showlegend=False
+        ), row=2, col=1)
+    
+    # RSI
+    if 'RSI' in indicators and indicators['RSI'] is not None:
+        rsi = downsample_series(indicators['RSI'])
+        fig.add_trace(criar_linha(
+            rsi.index, rsi.values, webgl=webgl,
+            mode='lines', name='RSI',
+            line=dict(color='#667eea', width=1.5)
+        ), row=3, col=1)
+        fig.add_hline(y=70, line_dash="dash", line_color="#ef4444", row=3, col=1)
+        fig.add_hline(y=30, line_dash="dash", line_color="#10b981", row=3, col=1)
+    
+    # MACD
+    if 'MACD' in indicators and 'MACD_signal' in indicators:
+        histograma = downsample_series(indicators['MACD_hist'])
+        fig.add_trace(go.Bar(
+            x=histograma.index,
+            y=histograma.values,
+            marker_color=['#10b981' if v >= 0 else '#ef4444' for v in histograma.values],
+            name='Histograma',
+            showlegend=False
+        ), row=4, col=1)
+        
+        for chave, nome, cor in [('MACD', 'MACD', '#667eea'), ('MACD_signal', 'Sinal', '#f59e0b')]:
+            serie = downsample_series(indicators[chave])
+            fig.add_trace(criar_linha(
+                serie.index, serie.values, webgl=webgl,
+                mode='lines', name=nome,
+                line=dict(color=cor, width=1.5)
+            ), row=4, col=1)
+    
+    fig.update_layout(
+        height=900,
+        template='plotly_white',
+        xaxis_rangeslider_visible=False,
+        hovermode='x unified',
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        )
+    )
+    fig.update_yaxes(range=[0, 100], row=3, col=1)
+    
+    st.plotly_chart(fig, use_container_width=True)
@@ -0,0 +1,220 @@
+"""Módulo de backtest da estratégia de ranking."""
+
+import streamlit as st
+import pandas as pd
+import plotly.graph_objects as go
+from config import Config
+from utils.backtest import executar_backtest
+from utils.formatters import formatar_percentual, formatar_percentual_coluna, formatar_decimal_coluna
+from utils.charts import downsample_series, usar_webgl, criar_linha
+from utils.perf import medido
+
+
+def show():
+    """Exibe a página de backtest."""
+
+    st.markdown("""
+        <div style='text-align: center; padding: 2rem 0; background: white; border-radius: 20px;
+                    box-shadow: 0 10px 30px rgba(0,0,0,0.1); margin-bottom: 2rem;'>
+            <div style='font-size: 4rem; margin-bottom: 1rem;'>🧪</div>
+            <h1 style='margin: 0; font-size: 2.5rem; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+                       -webkit-background-clip: text; -webkit-text-fill-color: transparent;'>
+                Backtest da Estratégia
+            </h1>
+            <p style='color: #64748b; font-size: 1.1rem; margin-top: 0.5rem;'>
+                Comprar as melhores ações do ranking e rebalancear periodicamente funciona?
+            </p>
+        </div>
+    """, unsafe_allow_html=True)
+
+    # Sidebar - Parâmetros
+    with st.sidebar:
+        st.markdown("### ⚙️ Parâmetros do Backtest")
+
+        mercado = st.radio(
+            "Mercado:",
+            ["🇧🇷 Brasil", "🌎 Internacional", "🌍 Global"],
+            index=0,
+            key="radio_backtest_mercado"
+        )
+
+        historicos = {'3 anos': '3y', '5 anos': '5y', '10 anos': '10y'}
+        historico_label = st.selectbox(
+            "Histórico:",
+            list(historicos.keys()),
+            index=2,
+            key="select_backtest_historico"
+        )
+
+        top = st.slider(
+            "Ações na carteira:",
+            3, 30, Config.BACKTEST_TOP,
+            help="A carteira compra, em pesos iguais, as ações de maior score"
+        )
+
+        frequencias = {'Mensal': 'M', 'Trimestral': 'Q', 'Semanal': 'W'}
+        frequencia_label = st.selectbox("Rebalanceamento:", list(frequencias.keys()), index=0)
+
+        janelas = {'6 meses': 126, '1 ano': 252}
+        janela_label = st.selectbox(
+            "Histórico do score:",
+            list(janelas.keys()),
+            index=1,
+            help="Pregões usados no cálculo do score em cada rebalanceamento"
+        )
+
+        custo_bps = st.slider(
+            "Custo de transação (pontos-base):",
+            0, 100, int(Config.BACKTEST_CUSTO * 10_000),
+            help="Custo sobre o valor negociado em cada rebalanceamento (10 = 0,1%)"
+        )
+
+        st.markdown("---")
+
+        executar = st.button("🚀 Executar Backtest", use_container_width=True, type="primary")
+
+    # Determinar universo
+    if mercado == "🇧🇷 Brasil":
+        universo = Config.ACOES_BRASILEIRAS
+    elif mercado == "🌎 Internacional":
+        universo = Config.ACOES_INTERNACIONAIS
+    else:
+        universo = Config.ACOES_BRASILEIRAS + Config.ACOES_INTERNACIONAIS
+
+    if executar:
+        with st.spinner(f'🔄 Buscando o histórico de {len(universo)} ações...'):
+            progresso_bar = st.progress(0)
+            status_text = st.empty()
+
+            def atualizar_progresso(atual, total, ticker):
+                progresso_bar.progress(atual / total)
+                status_text.text(f"Buscando {ticker}... ({atual}/{total})")
+
+            resultado = executar_backtest(
+                universo,
+                historicos[historico_label],
+                progresso_callback=atualizar_progresso,
+                top=top,
+                janela=janelas[janela_label],
+                custo=custo_bps / 10_000,
+                frequencia=frequencias[frequencia_label]
+            )
+
+            progresso_bar.empty()
+            status_text.empty()
+
+        if resultado is None:
+            st.error("❌ Histórico insuficiente para o backtest com estes parâmetros.")
+            return
+
+        st.session_state.resultado_backtest = resultado
+
+    if 'resultado_backtest' not in st.session_state:
+        st.info("👆 Escolha os parâmetros e clique em 'Executar Backtest'.")
+        return
+
+    resultado = st.session_state.resultado_backtest
+    metricas = resultado.metricas
+    estrategia = metricas.loc['Estratégia']
+    benchmark = metricas.drop(index='Estratégia').iloc[0] if len(metricas) > 1 else None
+
+    # === SEÇÃO 1: RESUMO ===
+    st.markdown("### 📊 Resultado")
+
+    col1, col2, col3, col4 = st.columns(4)
+
+    def diferenca(coluna):
+        if benchmark is None:
+            return None
+        return formatar_percentual(estrategia[coluna] - benchmark[coluna]) + " vs benchmark"
+
+    with col1:
+        st.metric("CAGR", formatar_percentual(estrategia['cagr']), delta=diferenca('cagr'))
+
+    with col2:
+        st.metric("Sharpe", f"{estrategia['sharpe']:.2f}",
+                  delta=f"{estrategia['sharpe'] - benchmark['sharpe']:+.2f} vs benchmark" if benchmark is not None else None)
+
+    with col3:
+        st.metric("Drawdown Máximo", formatar_percentual(estrategia['max_drawdown']), delta=diferenca('max_drawdown'))
+
+    with col4:
+        st.metric("Giro Médio", formatar_percentual(estrategia['giro_medio']))
+
+    parametros = resultado.parametros
+    st.caption(
+        f"🧮 {parametros['ativos']} ativos, {parametros['pregoes']} pregões, "
+        f"{len(resultado.carteiras)} rebalanceamentos — calculado em {resultado.duracao:.2f} s"
+    )
+
+    mostrar_tabela_metricas(metricas)
+
+    # === SEÇÃO 2: GRÁFICOS ===
+    tab1, tab2 = st.tabs(["📈 Evolução", "📉 Drawdown"])
+
+    with tab1:
+        criar_grafico_curvas(resultado.curva * 100, 'Evolução do Patrimônio (Base 100)', 'Valor')
+
+    with tab2:
+        criar_grafico_curvas(resultado.drawdown(), 'Queda em Relação ao Pico', 'Drawdown (%)')
+
+    # === SEÇÃO 3: CARTEIRAS ===
+    with st.expander("📋 Carteiras por Rebalanceamento", expanded=False):
+        carteiras = pd.DataFrame({
+            'Data': [data.strftime('%d/%m/%Y') for data in resultado.carteiras],
+            'Giro': formatar_percentual_coluna(resultado.giro.to_numpy() * 100),
+            'Ativos': [', '.join(tickers) for tickers in resultado.carteiras.values()]
+        })
+        st.dataframe(carteiras.iloc[::-1], use_container_width=True, hide_index=True, height=400)
+
+
+def mostrar_tabela_metricas(metricas):
+    """Mostra a tabela de métricas da estratégia e do benchmark."""
+    tabela = pd.DataFrame({
+        'Curva': metricas.index,
+        'Retorno Total': formatar_percentual_coluna(metricas['retorno_total'].to_numpy()),
+        'CAGR': formatar_percentual_coluna(metricas['cagr'].to_numpy()),
+        'Volatilidade': formatar_percentual_coluna(metricas['volatilidade'].to_numpy()),
+        'Sharpe': formatar_decimal_coluna(metricas['sharpe'].to_numpy()),
+        'Drawdown Máx': formatar_percentual_coluna(metricas['max_drawdown'].to_numpy()),
+        'Giro Médio': formatar_percentual_coluna(metricas['giro_medio'].to_numpy())
+    })
+    st.dataframe(tabela, use_container_width=True, hide_index=True)
+
+
+@medido('grafico.backtest')
+def criar_grafico_curvas(curvas, titulo, eixo_y):
+    """Cria gráfico de linhas com a estratégia e o benchmark."""
+    fig = go.Figure()
+
+    cores = ['#667eea', '#f59e0b']
+    webgl = usar_webgl(curvas.count().sum())
+
+    for i, nome in enumerate(curvas.columns):
+        serie = downsample_series(curvas[nome])
+        fig.add_trace(criar_linha(
+            serie.index,
+            serie.values,
+            webgl=webgl,
+            mode='lines',
+            name=nome,
+            line=dict(color=cores[i % len(cores)], width=3)
+        ))
+
+    fig.update_layout(
+        title=titulo,
+        yaxis_title=eixo_y,
+        xaxis_title='Data',
+        height=500,
+        hovermode='x unified',
+        template='plotly_white',
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        )
+    )
+
+    st.plotly_chart(fig, use_container_width=True)
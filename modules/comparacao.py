@@ -5,7 +5,12 @@ import plotly.graph_objects as go
 import pandas as pd
 from config import Config
 from utils.data_fetcher import fetch_multiple_stocks, normalize_prices
-from utils.formatters import formatar_moeda, formatar_percentual, obter_simbolo_moeda
+from utils.busca_async import buscar_varios
+from utils.formatters import (
+    obter_simbolo_moeda, formatar_moeda_coluna, formatar_percentual_coluna, formatar_decimal_coluna
+)
+from utils.charts import downsample_series, usar_webgl, criar_linha
+from utils.perf import medido
 
 
 def show():
@@ -83,13 +88,12 @@ def show():
                 # Barra de progresso
                 progresso_bar = st.progress(0)
                 
-                dados_dict = {}
-                for i, ticker in enumerate(tickers):
-                    from utils.data_fetcher import fetch_stock_data
-                    dados = fetch_stock_data(ticker, periodo)
-                    if dados is not None and not dados.empty:
-                        dados_dict[ticker] = dados
-                    progresso_bar.progress((i + 1) / len(tickers))
+                resultados = buscar_varios(
+                    tickers, periodo,
+                    progresso_callback=lambda atual, total, _: progresso_bar.progress(atual / total)
+                )
+                # Manter a ordem informada pelo usuário
+                dados_dict = {t: resultados[t] for t in tickers if t in resultados}
                 
                 progresso_bar.empty()
                 
@@ -156,17 +160,24 @@ def mostrar_metricas(dados_dict):
         
         metricas_lista.append({
             'Código': ticker,
-            'Preço Inicial': formatar_moeda(preco_inicial, moeda),
-            'Preço Atual': formatar_moeda(preco_final, moeda),
-            'Variação': formatar_percentual(variacao),
-            'Volatilidade': formatar_percentual(volatilidade)
+            'moeda': moeda,
+            'Preço Inicial': preco_inicial,
+            'Preço Atual': preco_final,
+            'Variação': variacao,
+            'Volatilidade': volatilidade
         })
     
     if metricas_lista:
+        # Formatação por coluna, não por célula
         df_metricas = pd.DataFrame(metricas_lista)
-        st.dataframe(df_metricas, use_container_width=True, hide_index=True)
+        for coluna in ('Preço Inicial', 'Preço Atual'):
+            df_metricas[coluna] = formatar_moeda_coluna(df_metricas[coluna], df_metricas['moeda'])
+        for coluna in ('Variação', 'Volatilidade'):
+            df_metricas[coluna] = formatar_percentual_coluna(df_metricas[coluna])
+        st.dataframe(df_metricas.drop(columns='moeda'), use_container_width=True, hide_index=True)
 
 
+@medido('grafico.normalizado')
 def criar_grafico_normalizado(dados_dict):
     """Cria gráfico com preços normalizados."""
     
@@ -179,11 +190,14 @@ def criar_grafico_normalizado(dados_dict):
     fig = go.Figure()
     
     cores = ['#667eea', '#f59e0b', '#10b981', '#ef4444', '#8b5cf6']
+    webgl = usar_webgl(dados_norm.count().sum())
     
     for i, ticker in enumerate(dados_norm.columns):
-        fig.add_trace(go.Scatter(
-            x=dados_norm.index,
-            y=dados_norm[ticker],
+        serie = downsample_series(dados_norm[ticker])
+        fig.add_trace(criar_linha(
+            serie.index,
+            serie.values,
+            webgl=webgl,
             mode='lines',
             name=ticker,
             line=dict(color=cores[i % len(cores)], width=3)
@@ -208,20 +222,24 @@ def criar_grafico_normalizado(dados_dict):
     st.plotly_chart(fig, use_container_width=True)
 
 
+@medido('grafico.absoluto')
 def criar_grafico_absoluto(dados_dict):
     """Cria gráfico com preços absolutos."""
     
     fig = go.Figure()
     
     cores = ['#667eea', '#f59e0b', '#10b981', '#ef4444', '#8b5cf6']
+    webgl = usar_webgl(sum(len(dados) for dados in dados_dict.values()))
     
     for i, (ticker, dados) in enumerate(dados_dict.items()):
         if dados.empty:
             continue
         
-        fig.add_trace(go.Scatter(
-            x=dados.index,
-            y=dados['Close'],
+        serie = downsample_series(dados['Close'])
+        fig.add_trace(criar_linha(
+            serie.index,
+            serie.values,
+            webgl=webgl,
             mode='lines',
             name=ticker,
             line=dict(color=cores[i % len(cores)], width=3)
@@ -246,6 +264,7 @@ def criar_grafico_absoluto(dados_dict):
     st.plotly_chart(fig, use_container_width=True)
 
 
+@medido('grafico.retornos')
 def criar_grafico_retornos(dados_dict):
     """Cria gráfico de barras com retornos."""
     
@@ -272,7 +291,7 @@ def criar_grafico_retornos(dados_dict):
         x=tickers,
         y=retornos,
         marker_color=cores,
-        text=[formatar_percentual(r) for r in retornos],
+        text=formatar_percentual_coluna(retornos),
         textposition='outside'
     ))
     
@@ -318,17 +337,27 @@ def mostrar_tabela_detalhada(dados_dict):
         
         comparacao.append({
             'Código': ticker,
-            f'Preço Inicial ({moeda})': f"{preco_inicial:.2f}",
-            f'Preço Final ({moeda})': f"{preco_final:.2f}",
-            'Variação (%)': formatar_percentual(variacao),
-            'Retorno Anual (%)': formatar_percentual(retorno_medio),
-            'Volatilidade (%)': formatar_percentual(volatilidade),
-            'Sharpe Ratio': f"{sharpe:.2f}",
-            'Drawdown Máx (%)': formatar_percentual(max_drawdown)
+            f'Preço Inicial ({moeda})': preco_inicial,
+            f'Preço Final ({moeda})': preco_final,
+            'Variação (%)': variacao,
+            'Retorno Anual (%)': retorno_medio,
+            'Volatilidade (%)': volatilidade,
+            'Sharpe Ratio': sharpe,
+            'Drawdown Máx (%)': max_drawdown
         })
     
     if comparacao:
+        # Formatação por coluna, não por célula
         df_comparacao = pd.DataFrame(comparacao)
+        for coluna in df_comparacao.columns[1:]:
+            if '(%)' in coluna:
+                df_comparacao[coluna] = formatar_percentual_coluna(df_comparacao[coluna])
+            elif coluna.startswith('Preço'):
+                # Com moedas diferentes, cada ativo só tem as colunas da sua moeda
+                valores = df_comparacao[coluna]
+                df_comparacao[coluna] = formatar_decimal_coluna(valores).where(valores.notna(), None)
+            else:
+                df_comparacao[coluna] = formatar_decimal_coluna(df_comparacao[coluna])
         st.dataframe(df_comparacao, use_container_width=True, hide_index=True)
     else:
         st.warning("Não há dados para exibir na tabela.")
@@ -1,12 +1,19 @@
 """Módulo de ranking de ações."""
 
+import time
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-import plotly.express as px
 from config import Config
-from utils.scoring import rankear_ativos
-from utils.formatters import formatar_moeda, formatar_percentual, traduzir_setor
+from utils.scoring import rankear_ativos, IndiceRanking
+from utils.historico import registrar_ranking, maiores_variacoes
+from utils.data_fetcher import idade_dados
+from utils.resiliencia import relatorio_falhas
+from utils.formatters import (
+    formatar_moeda, formatar_percentual, traduzir_setor, formatar_idade,
+    formatar_percentual_coluna, formatar_decimal_coluna
+)
+from utils.perf import medido
 
 
 def show():
@@ -71,12 +78,15 @@ def show():
     if mercado == "🇧🇷 Brasil":
         lista_acoes = Config.ACOES_BRASILEIRAS
         titulo_mercado = "Mercado Brasileiro"
+        universo = 'brasil'
     elif mercado == "🌎 Internacional":
         lista_acoes = Config.ACOES_INTERNACIONAIS
         titulo_mercado = "Mercado Internacional"
+        universo = 'internacional'
     else:
         lista_acoes = Config.ACOES_BRASILEIRAS + Config.ACOES_INTERNACIONAIS
         titulo_mercado = "Mercado Global"
+        universo = 'global'
     
     # Executar análise
     if analisar or 'df_ranking' not in st.session_state:
@@ -101,21 +111,35 @@ def show():
                 return
             
             st.session_state.df_ranking = df_ranking
+            st.session_state.df_ranking_dados_em = time.time() - (idade_dados(df_ranking['ticker'].tolist(), periodo) or 0)
+            st.session_state.df_ranking_universo = (universo, periodo)
+            registrar_ranking(df_ranking, universo, periodo)
             st.success(f"✅ Análise concluída! {len(df_ranking)} ações analisadas.")
     
+    # Ativos que falham de forma recorrente
+    falhas = relatorio_falhas(lista_acoes)
+    if not falhas.empty:
+        with st.expander(f"⚠️ {len(falhas)} ativos sem dados recorrentemente (ignorados temporariamente)"):
+            st.dataframe(falhas, use_container_width=True, hide_index=True)
+    
     # Recuperar dados
     if 'df_ranking' not in st.session_state:
         st.info("👆 Clique em 'Analisar Ações' para começar a análise.")
         return
     
-    df = st.session_state.df_ranking.copy()
+    # Índices de filtro e a tabela formatada são calculados uma vez por ranking
+    indice = st.session_state.get('indice_ranking')
+    if indice is None or indice.df is not st.session_state.df_ranking:
+        indice = IndiceRanking(st.session_state.df_ranking, preparar_tabela)
+        st.session_state.indice_ranking = indice
     
     # Aplicar filtros
-    df = df[df['score_total'] >= score_minimo]
-    
+    setores = None
     if "Todos" not in filtrar_setor:
-        setores_filtrados = [k for k, v in Config.SETORES_PORTUGUES.items() if v in filtrar_setor]
-        df = df[df['setor'].isin(setores_filtrados + filtrar_setor)]
+        setores = [k for k, v in Config.SETORES_PORTUGUES.items() if v in filtrar_setor] + filtrar_setor
+    
+    posicoes = indice.filtrar(score_minimo, setores)
+    df = indice.selecionar(posicoes)
     
     if df.empty:
         st.warning("⚠️ Nenhuma ação encontrada com os filtros aplicados.")
@@ -141,6 +165,9 @@ def show():
         melhor_acao = df.iloc[0]['ticker'] if len(df) > 0 else "N/A"
         st.metric("Melhor Ação", melhor_acao)
     
+    if 'df_ranking_dados_em' in st.session_state:
+        st.caption(f"🕒 Dados de mercado atualizados {formatar_idade(time.time() - st.session_state.df_ranking_dados_em)}")
+    
     st.markdown("<br>", unsafe_allow_html=True)
     
     # === SEÇÃO 2: TOP 10 ===
@@ -185,25 +212,14 @@ def show():
     
     # === SEÇÃO 3: TABELA COMPLETA ===
     with st.expander("📋 Ver Tabela Completa", expanded=False):
-        # Preparar dados para exibição
-        df_display = df[['ranking', 'ticker', 'nome', 'setor', 'score_total', 
-                        'retorno', 'volatilidade', 'sharpe', 'tendencia', 'classificacao']].copy()
-        
-        df_display.columns = ['#', 'Código', 'Nome', 'Setor', 'Score', 
-                             'Retorno %', 'Volatilidade %', 'Sharpe', 'Tendência', 'Classificação']
-        
-        # Formatar valores
-        df_display['Retorno %'] = df_display['Retorno %'].apply(lambda x: f"{x:.2f}%")
-        df_display['Volatilidade %'] = df_display['Volatilidade %'].apply(lambda x: f"{x:.2f}%")
-        df_display['Sharpe'] = df_display['Sharpe'].apply(lambda x: f"{x:.2f}")
-        df_display['Score'] = df_display['Score'].apply(lambda x: f"{x:.1f}")
-        
-        st.dataframe(df_display, use_container_width=True, hide_index=True, height=400)
+        st.dataframe(indice.tabela(posicoes), use_container_width=True, hide_index=True, height=400)
     
     # === SEÇÃO 4: GRÁFICOS ===
     st.markdown("### 📈 Análise Visual")
     
-    tab1, tab2, tab3 = st.tabs(["📊 Distribuição de Scores", "🎯 Retorno vs Volatilidade", "🏢 Por Setor"])
+    tab1, tab2, tab3, tab4 = st.tabs([
+        "📊 Distribuição de Scores", "🎯 Retorno vs Volatilidade", "🏢 Por Setor", "🔀 Variações no Ranking"
+    ])
     
     with tab1:
         criar_grafico_distribuicao(df)
@@ -213,8 +229,67 @@ def show():
     
     with tab3:
         criar_grafico_setores(df)
+    
+    with tab4:
+        mostrar_variacoes(*st.session_state.get('df_ranking_universo', (universo, periodo)))
+
+
+def preparar_tabela(df):
+    """Monta a tabela completa formatada (uma vez por ranking, ver IndiceRanking)."""
+    df_display = df[['ranking', 'ticker', 'nome', 'setor', 'score_total', 
+                    'retorno', 'volatilidade', 'sharpe', 'tendencia', 'classificacao']].copy()
+    
+    df_display.columns = ['#', 'Código', 'Nome', 'Setor', 'Score', 
+                         'Retorno %', 'Volatilidade %', 'Sharpe', 'Tendência', 'Classificação']
+    
+    # Formatar valores
+    df_display['Retorno %'] = formatar_percentual_coluna(df_display['Retorno %'])
+    df_display['Volatilidade %'] = formatar_percentual_coluna(df_display['Volatilidade %'])
+    df_display['Sharpe'] = formatar_decimal_coluna(df_display['Sharpe'])
+    df_display['Score'] = formatar_decimal_coluna(df_display['Score'], 1)
+    
+    return df_display
+
+
+def mostrar_variacoes(universo, periodo):
+    """Mostra as ações que mais subiram e caíram no ranking (histórico em disco)."""
+    intervalos = {'1 semana': 7, '1 mês': 30, '3 meses': 91}
+    intervalo = st.radio("Comparar com:", list(intervalos.keys()), horizontal=True,
+                         key="radio_variacoes_intervalo")
+    
+    variacoes = maiores_variacoes(universo, periodo, intervalos[intervalo])
+    if variacoes.empty:
+        st.info("🕒 O histórico ainda não tem dois dias de ranking deste mercado para comparar. "
+                "Cada análise concluída grava o ranking do dia.")
+        return
+    
+    anterior, atual = variacoes.attrs['datas']
+    st.caption(f"Posições em {atual.strftime('%d/%m/%Y')} comparadas com {anterior.strftime('%d/%m/%Y')}")
+    
+    def tabela(linhas):
+        return pd.DataFrame({
+            'Código': linhas['ticker'],
+            'Nome': linhas['nome'],
+            'Antes': linhas['ranking_anterior'],
+            'Agora': linhas['ranking'],
+            'Variação': [f"{v:+d}" for v in linhas['variacao']],
+            'Score': formatar_decimal_coluna(linhas['score_total'], 1)
+        })
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("#### ⬆️ Subiram")
+        subiram = variacoes[variacoes['variacao'] > 0].head(10)
+        st.dataframe(tabela(subiram), use_container_width=True, hide_index=True)
+    
+    with col2:
+        st.markdown("#### ⬇️ Caíram")
+        cairam = variacoes[variacoes['variacao'] < 0].iloc[::-1].head(10)
+        st.dataframe(tabela(cairam), use_container_width=True, hide_index=True)
 
 
+@medido('grafico.distribuicao')
 def criar_grafico_distribuicao(df):
     """Cria gráfico de distribuição de scores."""
     fig = go.Figure()
@@ -238,8 +313,12 @@ def criar_grafico_distribuicao(df):
     st.plotly_chart(fig, use_container_width=True)
 
 
+@medido('grafico.scatter')
 def criar_grafico_scatter(df):
     """Cria gráfico de dispersão retorno vs volatilidade."""
+    # Importado aqui: plotly.express é pesado e só este gráfico o usa
+    import plotly.express as px
+
     fig = px.scatter(
         df,
         x='volatilidade',
@@ -261,16 +340,18 @@ def criar_grafico_scatter(df):
     st.plotly_chart(fig, use_container_width=True)
 
 
+@medido('grafico.setores')
 def criar_grafico_setores(df):
     """Cria gráfico de performance por setor."""
-    # Traduzir setores
+    # Traduzir setores ('setor' é categórica e guarda os setores filtrados
+    # como categorias sem linhas; em texto, só os setores presentes aparecem)
     df_setores = df.copy()
-    df_setores['setor_pt'] = df_setores['setor'].apply(
+    df_setores['setor_pt'] = df_setores['setor'].astype(str).map(
         lambda x: Config.SETORES_PORTUGUES.get(x, x)
     )
     
     # Agrupar por setor
-    setores_agrupados = df_setores.groupby('setor_pt').agg({
+    setores_agrupados = df_setores.groupby('setor_pt', observed=True).agg({
         'score_total': 'mean',
         'retorno': 'mean',
         'ticker': 'count'
@@ -285,7 +366,7 @@ def criar_grafico_setores(df):
         x=setores_agrupados['Setor'],
         y=setores_agrupados['Score Médio'],
         marker_color='#667eea',
-        text=setores_agrupados['Score Médio'].apply(lambda x: f"{x:.1f}"),
+        text=formatar_decimal_coluna(setores_agrupados['Score Médio'], 1),
         textposition='outside'
     ))
     
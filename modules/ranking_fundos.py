@@ -1,12 +1,18 @@
 """Módulo de ranking de fundos de investimento e ETFs."""
 
+import time
 import streamlit as st
-import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
-import plotly.express as px
 from config import Config
-from utils.scoring import rankear_ativos
-from utils.formatters import formatar_moeda, formatar_percentual, formatar_numero_grande
+from utils.scoring import rankear_ativos, IndiceRanking
+from utils.data_fetcher import idade_dados
+from utils.resiliencia import relatorio_falhas
+from utils.formatters import (
+    formatar_moeda, formatar_percentual, formatar_numero_grande, formatar_idade,
+    formatar_percentual_coluna, formatar_decimal_coluna
+)
+from utils.perf import medido
 
 
 def show():
@@ -120,30 +126,36 @@ def show():
                 return
             
             st.session_state.df_ranking_fundos = df_ranking
+            st.session_state.df_ranking_fundos_dados_em = time.time() - (idade_dados(df_ranking['ticker'].tolist(), periodo) or 0)
             st.success(f"✅ Análise concluída! {len(df_ranking)} fundos analisados.")
     
+    # Ativos que falham de forma recorrente
+    falhas = relatorio_falhas(lista_fundos)
+    if not falhas.empty:
+        with st.expander(f"⚠️ {len(falhas)} ativos sem dados recorrentemente (ignorados temporariamente)"):
+            st.dataframe(falhas, use_container_width=True, hide_index=True)
+    
     # Recuperar dados
     if 'df_ranking_fundos' not in st.session_state:
         st.info("👆 Clique em 'Analisar Fundos' para começar a análise.")
         return
     
-    df = st.session_state.df_ranking_fundos.copy()
-    
-    # Aplicar filtros
-    df = df[df['score_total'] >= score_minimo]
+    # Ordenações e filtros usam índices calculados uma vez por ranking
+    indice = st.session_state.get('indice_ranking_fundos')
+    if indice is None or indice.df is not st.session_state.df_ranking_fundos:
+        indice = IndiceRanking(st.session_state.df_ranking_fundos)
+        st.session_state.indice_ranking_fundos = indice
     
-    # Ordenar
-    if ordenar_por == "Retorno":
-        df = df.sort_values('retorno', ascending=False)
-    elif ordenar_por == "Sharpe Ratio":
-        df = df.sort_values('sharpe', ascending=False)
-    elif ordenar_por == "Menor Volatilidade":
-        df = df.sort_values('volatilidade', ascending=True)
-    else:
-        df = df.sort_values('score_total', ascending=False)
+    # Aplicar filtros e ordenar
+    ordenacoes = {"Retorno": 'retorno', "Sharpe Ratio": 'sharpe', "Menor Volatilidade": 'volatilidade'}
+    posicoes = indice.filtrar(score_minimo, ordenar_por=ordenacoes.get(ordenar_por, 'score_total'))
+    df = indice.selecionar(posicoes)
     
-    df = df.reset_index(drop=True)
-    df['ranking'] = range(1, len(df) + 1)
+    # Por score, o ranking original já é a posição na lista filtrada; nas
+    # outras ordens, o ranking é renumerado em uma cópia (se a ordem coincidir
+    # com a original, ``selecionar`` devolve o DataFrame guardado na sessão)
+    if ordenar_por in ordenacoes:
+        df = df.assign(ranking=np.arange(1, len(df) + 1))
     
     if df.empty:
         st.warning("⚠️ Nenhum fundo encontrado com os filtros aplicados.")
@@ -169,6 +181,9 @@ def show():
         menor_vol = df['volatilidade'].min()
         st.metric("Menor Volatilidade", formatar_percentual(menor_vol))
     
+    if 'df_ranking_fundos_dados_em' in st.session_state:
+        st.caption(f"🕒 Dados de mercado atualizados {formatar_idade(time.time() - st.session_state.df_ranking_fundos_dados_em)}")
+    
     st.markdown("<br>", unsafe_allow_html=True)
     
     # === SEÇÃO 2: PÓDIO ===
@@ -194,8 +209,12 @@ def show():
     # === SEÇÃO 3: LISTA COMPLETA ===
     st.markdown("### 📋 Lista Completa de Fundos")
     
-    for idx, row in df.iterrows():
-        criar_card_fundo(row)
+    # Mudar filtros ou ordenação volta para a primeira página
+    if st.session_state.get('filtros_lista_fundos') != (score_minimo, ordenar_por):
+        st.session_state.filtros_lista_fundos = (score_minimo, ordenar_por)
+        st.session_state.pagina_lista_fundos = 1
+    
+    mostrar_lista_fundos(df)
     
     # === SEÇÃO 4: COMPARAÇÃO VISUAL ===
     st.markdown("### 📊 Comparação Visual")
@@ -289,6 +308,56 @@ def criar_card_podio(row, posicao, emoji, cor):
     """, unsafe_allow_html=True)
 
 
+def _ir_para_pagina(pagina):
+    st.session_state.pagina_lista_fundos = pagina
+
+
+@st.fragment
+def mostrar_lista_fundos(df):
+    """
+    Lista de fundos paginada (Config.FUNDOS_POR_PAGINA cards por página).
+
+    Só a página atual é renderizada, então o número de elementos enviados ao
+    navegador não depende do tamanho do universo. A navegação reexecuta
+    apenas este fragmento, não a página inteira.
+
+    Args:
+        df: Ranking filtrado e ordenado
+    """
+    por_pagina = Config.FUNDOS_POR_PAGINA
+    total_paginas = max(1, -(-len(df) // por_pagina))
+    
+    # Filtros mais restritivos podem reduzir o número de páginas
+    pagina = min(st.session_state.get('pagina_lista_fundos', 1), total_paginas)
+    
+    inicio = (pagina - 1) * por_pagina
+    for _, row in df.iloc[inicio:inicio + por_pagina].iterrows():
+        criar_card_fundo(row)
+    
+    if total_paginas == 1:
+        return
+    
+    col1, col2, col3 = st.columns([1, 2, 1])
+    
+    with col1:
+        st.button("◀ Anterior", key="btn_fundos_pagina_anterior", disabled=pagina == 1,
+                  on_click=_ir_para_pagina, args=(pagina - 1,), use_container_width=True)
+    
+    with col2:
+        st.markdown(
+            f"<div style='text-align: center; color: #64748b; padding-top: 0.4rem;'>"
+            f"Página {pagina} de {total_paginas} · fundos {inicio + 1}–{min(inicio + por_pagina, len(df))} "
+            f"de {len(df)}</div>",
+            unsafe_allow_html=True
+        )
+    
+    with col3:
+        st.button("Próxima ▶", key="btn_fundos_pagina_proxima", disabled=pagina == total_paginas,
+                  on_click=_ir_para_pagina, args=(pagina + 1,), use_container_width=True)
+    
+    st.markdown("<br>", unsafe_allow_html=True)
+
+
 def criar_card_fundo(row):
     """Cria card de fundo na lista."""
     with st.container():
@@ -333,6 +402,7 @@ def criar_card_fundo(row):
 
 
 
+@medido('grafico.retornos')
 def criar_grafico_retornos(df):
     """Cria gráfico de barras com retornos."""
     fig = go.Figure()
@@ -343,7 +413,7 @@ def criar_grafico_retornos(df):
         x=df['ticker'],
         y=df['retorno'],
         marker_color=colors,
-        text=df['retorno'].apply(lambda x: f"{x:.2f}%"),
+        text=formatar_percentual_coluna(df['retorno']),
         textposition='outside',
         hovertemplate='<b>%{x}</b><br>Retorno: %{y:.2f}%<extra></extra>'
     ))
@@ -360,6 +430,7 @@ def criar_grafico_retornos(df):
     st.plotly_chart(fig, use_container_width=True)
 
 
+@medido('grafico.sharpe')
 def criar_grafico_sharpe(df):
     """Cria gráfico do Sharpe Ratio."""
     fig = go.Figure()
@@ -370,7 +441,7 @@ def criar_grafico_sharpe(df):
         x=df['ticker'],
         y=df['sharpe'],
         marker_color=colors,
-        text=df['sharpe'].apply(lambda x: f"{x:.2f}"),
+        text=formatar_decimal_coluna(df['sharpe']),
         textposition='outside',
         hovertemplate='<b>%{x}</b><br>Sharpe: %{y:.2f}<extra></extra>'
     ))
@@ -398,8 +469,12 @@ def criar_grafico_sharpe(df):
     """)
 
 
+@medido('grafico.volatilidade')
 def criar_grafico_volatilidade(df):
     """Cria gráfico de volatilidade."""
+    # Importado aqui: plotly.express é pesado e só este gráfico o usa
+    import plotly.express as px
+
     fig = px.scatter(
         df,
         x='volatilidade',
@@ -429,9 +504,10 @@ def criar_grafico_volatilidade(df):
     """)
 
 
+@medido('grafico.correlacao')
 def criar_grafico_correlacao(df):
     """Cria matriz de correlação entre fundos."""
-    from utils.data_fetcher import fetch_multiple_stocks
+    from utils.data_fetcher import fetch_multiple_stocks, calcular_correlacao
     
     st.info("🔄 Calculando correlação entre os fundos...")
     
@@ -443,19 +519,13 @@ def criar_grafico_correlacao(df):
         st.warning("Não foi possível calcular a correlação.")
         return
     
-    # Criar DataFrame com preços de fechamento
-    df_precos = pd.DataFrame()
-    for ticker, dados in dados_fundos.items():
-        if not dados.empty:
-            df_precos[ticker] = dados['Close']
+    # Calcular correlação
+    correlacao = calcular_correlacao(dados_fundos)
     
-    if df_precos.empty or len(df_precos.columns) < 2:
+    if correlacao.empty:
         st.warning("Dados insuficientes para calcular correlação.")
         return
     
-    # Calcular correlação
-    correlacao = df_precos.corr()
-    
     # Criar heatmap
     fig = go.Figure(data=go.Heatmap(
         z=correlacao.values,
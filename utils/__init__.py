@@ -1,50 +1,104 @@
 """
 Utilitários do Dashboard de Investimentos - Sistema de Ranking.
-"""
-
-from .data_fetcher import (
-    fetch_stock_data,
-    fetch_multiple_stocks,
-    get_stock_info,
-    normalize_prices
-)
 
-from .indicators import (
-    calculate_all_indicators,
-    calculate_rsi,
-    calculate_macd,
-    calculate_bollinger_bands,
-    calculate_sma,
-    calculate_ema,
-    get_signal_interpretation,
-    calculate_volatility,
-    calculate_sharpe_ratio,
-    calculate_max_drawdown
-)
+Os nomes exportados são importados sob demanda (PEP 562): importar um
+submódulo, como ``utils.perf``, não carrega os demais.
+"""
 
-from .formatters import (
-    formatar_moeda,
-    formatar_percentual,
-    traduzir_setor,
-    formatar_numero_grande,
-    obter_simbolo_moeda
-)
+import importlib
 
-from .scoring import (
-    calcular_score_ativo,
-    normalizar_score,
-    rankear_ativos
-)
+# Nome exportado -> submódulo que o define
+_EXPORTACOES = {
+    # data_fetcher
+    'fetch_stock_data': 'data_fetcher',
+    'fetch_multiple_stocks': 'data_fetcher',
+    'get_stock_info': 'data_fetcher',
+    'idade_dados': 'data_fetcher',
+    'normalize_prices': 'data_fetcher',
+    'calcular_correlacao': 'data_fetcher',
+    # indicators
+    'calculate_all_indicators': 'indicators',
+    'get_indicator_bundle': 'indicators',
+    'calculate_rsi': 'indicators',
+    'calculate_macd': 'indicators',
+    'calculate_bollinger_bands': 'indicators',
+    'calculate_sma': 'indicators',
+    'calculate_ema': 'indicators',
+    'get_signal_interpretation': 'indicators',
+    'calculate_volatility': 'indicators',
+    'calculate_sharpe_ratio': 'indicators',
+    'calculate_max_drawdown': 'indicators',
+    # formatters
+    'formatar_moeda': 'formatters',
+    'formatar_percentual': 'formatters',
+    'traduzir_setor': 'formatters',
+    'formatar_numero_grande': 'formatters',
+    'formatar_idade': 'formatters',
+    'formatar_bytes': 'formatters',
+    'formatar_moeda_coluna': 'formatters',
+    'formatar_percentual_coluna': 'formatters',
+    'formatar_numero_grande_coluna': 'formatters',
+    'formatar_decimal_coluna': 'formatters',
+    'obter_simbolo_moeda': 'formatters',
+    # charts
+    'lttb_indices': 'charts',
+    'downsample_series': 'charts',
+    'usar_webgl': 'charts',
+    'criar_linha': 'charts',
+    'reamostrar_ohlc': 'charts',
+    # cache
+    'VERSAO_DADOS': 'cache',
+    'marcar_dados': 'cache',
+    'chave_dados': 'cache',
+    'cache_por_dados': 'cache',
+    'cache_por_argumentos': 'cache',
+    'estimar_bytes': 'cache',
+    'estatisticas_cache': 'cache',
+    # resiliencia
+    'relatorio_falhas': 'resiliencia',
+    # fontes
+    'FonteDados': 'fontes',
+    'FonteYFinance': 'fontes',
+    'FonteGravadora': 'fontes',
+    'FonteReproducao': 'fontes',
+    'obter_fonte': 'fontes',
+    'definir_fonte': 'fontes',
+    # sintetico
+    'FonteSintetica': 'sintetico',
+    'universo_sintetico': 'sintetico',
+    # scoring
+    'calcular_score_ativo': 'scoring',
+    'normalizar_score': 'scoring',
+    'rankear_ativos': 'scoring',
+    'IndiceRanking': 'scoring',
+    'indices_topo': 'scoring',
+    'serie_score': 'scoring',
+    'serie_score_ativo': 'scoring',
+    # backtest
+    'montar_painel': 'backtest',
+    'painel_scores': 'backtest',
+    'backtest_painel': 'backtest',
+    'executar_backtest': 'backtest',
+    'ResultadoBacktest': 'backtest',
+    # historico
+    'registrar_ranking': 'historico',
+    'carregar_historico': 'historico',
+    'historico_ativo': 'historico',
+    'maiores_variacoes': 'historico'
+}
 
 __all__ = [
     # Data fetching
     'fetch_stock_data',
     'fetch_multiple_stocks',
     'get_stock_info',
+    'idade_dados',
     'normalize_prices',
+    'calcular_correlacao',
     
     # Indicators
     'calculate_all_indicators',
+    'get_indicator_bundle',
     'calculate_rsi',
     'calculate_macd',
     'calculate_bollinger_bands',
@@ -60,12 +114,76 @@ __all__ = [
     'formatar_percentual',
     'traduzir_setor',
     'formatar_numero_grande',
+    'formatar_idade',
+    'formatar_bytes',
+    'formatar_moeda_coluna',
+    'formatar_percentual_coluna',
+    'formatar_numero_grande_coluna',
+    'formatar_decimal_coluna',
     'obter_simbolo_moeda',
     
+    # Charts
+    'lttb_indices',
+    'downsample_series',
+    'usar_webgl',
+    'criar_linha',
+    'reamostrar_ohlc',
+    
+    # Cache
+    'VERSAO_DADOS',
+    'marcar_dados',
+    'chave_dados',
+    'cache_por_dados',
+    'cache_por_argumentos',
+    'estimar_bytes',
+    'estatisticas_cache',
+    
+    # Resiliência
+    'relatorio_falhas',
+    
+    # Fontes de dados
+    'FonteDados',
+    'FonteYFinance',
+    'FonteGravadora',
+    'FonteReproducao',
+    'obter_fonte',
+    'definir_fonte',
+    'FonteSintetica',
+    'universo_sintetico',
+    
     # Scoring
     'calcular_score_ativo',
     'normalizar_score',
-    'rankear_ativos'
+    'rankear_ativos',
+    'IndiceRanking',
+    'indices_topo',
+    'serie_score',
+    'serie_score_ativo',
+    
+    # Backtest
+    'montar_painel',
+    'painel_scores',
+    'backtest_painel',
+    'executar_backtest',
+    'ResultadoBacktest',
+    
+    # Histórico dos rankings
+    'registrar_ranking',
+    'carregar_historico',
+    'historico_ativo',
+    'maiores_variacoes'
 ]
 
 __version__ = '3.0.0'
+
+
+def __getattr__(nome):
+    if nome in _EXPORTACOES:
+        valor = getattr(importlib.import_module(f'.{_EXPORTACOES[nome]}', __name__), nome)
+        globals()[nome] = valor
+        return valor
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,448 @@
+"""Backtest da estratégia de ranking: comprar os melhores por score e rebalancear.
+
+Os scores de todas as datas de rebalanceamento são calculados de uma vez
+sobre o painel de preços (datas × ativos), com as mesmas fórmulas de
+``utils.scoring._calcular_score``. As janelas móveis (retorno médio, desvio,
+médias móveis e RSI) são diferenças de somas acumuladas, então o custo é
+O(datas × ativos) qualquer que seja o tamanho da janela.
+
+Cada janela usa as últimas linhas do painel; em universos de uma só bolsa
+isso equivale às últimas linhas de cada ativo, como no score da página.
+"""
+
+import logging
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from config import Config
+from utils.perf import medir
+from utils.scoring import indices_topo
+
+logger = logging.getLogger(__name__)
+
+# A mesma taxa livre de risco do Sharpe em _calcular_score
+_TAXA_LIVRE = 0.10
+
+# Componentes do score, na ordem de Config.PESOS_RANKING
+COMPONENTES = ('retorno', 'volatilidade', 'sharpe', 'tendencia', 'momento')
+
+
+def montar_painel(dados: Dict[str, pd.DataFrame], coluna: str = 'Close') -> pd.DataFrame:
+    """
+    Monta o painel de preços (datas × ativos).
+
+    Datas com fuso horário são convertidas para a data local, para que
+    ativos de bolsas diferentes fiquem na mesma linha. As colunas ficam em
+    ordem alfabética (a busca devolve os ativos na ordem de conclusão).
+
+    Args:
+        dados: Dicionário ticker -> DataFrame de preços
+        coluna: Coluna de preço
+
+    Returns:
+        DataFrame com NaN nos dias em que o ativo não negociou
+    """
+    series = {}
+    for ticker, df in sorted(dados.items()):
+        if df is None or df.empty or coluna not in df.columns:
+            continue
+        indice = df.index
+        if getattr(indice, 'tz', None) is not None:
+            indice = indice.tz_localize(None)
+        serie = pd.Series(pd.to_numeric(df[coluna], errors='coerce').to_numpy(), index=indice.normalize())
+        series[ticker] = serie[~serie.index.duplicated(keep='last')]
+
+    if not series:
+        return pd.DataFrame()
+    return pd.concat(series, axis=1).sort_index()
+
+
+def datas_rebalanceamento(indice: pd.DatetimeIndex, inicio: int = 0,
+                          frequencia: str = 'M') -> np.ndarray:
+    """
+    Posições dos rebalanceamentos: o último pregão de cada período.
+
+    O último dia do painel nunca é um rebalanceamento (não haveria período
+    de carteira depois dele).
+
+    Args:
+        indice: Datas do painel
+        inicio: Primeira posição permitida (ex: janela - 1)
+        frequencia: 'W' (semanal), 'M' (mensal) ou 'Q' (trimestral)
+
+    Returns:
+        Array de posições no painel
+    """
+    periodos = indice.to_period(frequencia)
+    ultimo = np.r_[periodos[1:] != periodos[:-1], False]
+    posicoes = np.flatnonzero(ultimo)
+    return posicoes[posicoes >= inicio]
+
+
+def _somas_janela(valores: np.ndarray, posicoes: np.ndarray, janela: int) -> np.ndarray:
+    """Soma de cada coluna nas ``janela`` linhas que terminam em cada posição."""
+    acumulado = np.zeros((valores.shape[0] + 1, valores.shape[1]))
+    np.cumsum(valores, axis=0, out=acumulado[1:])
+    return acumulado[posicoes + 1] - acumulado[np.maximum(posicoes + 1 - janela, 0)]
+
+
+def _normalizar(valores: np.ndarray, minimo: float, maximo: float) -> np.ndarray:
+    """Versão vetorizada de ``normalizar_score``."""
+    return np.clip((valores - minimo) / (maximo - minimo) * 100, 0, 100)
+
+
+def componentes_score(painel: pd.DataFrame, posicoes: np.ndarray,
+                      janela: int = 252) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Scores parciais (0-100) de cada ativo em cada posição, sobre as ``janela`` linhas anteriores.
+
+    Um ativo só é elegível se negociou na data e já tinha preço no início da
+    janela (sem histórico parcial, que favoreceria listagens recentes).
+
+    Args:
+        painel: Painel de preços de ``montar_painel``
+        posicoes: Posições das datas a avaliar
+        janela: Linhas de histórico por score (como o período '1y' ≈ 252)
+
+    Returns:
+        Tupla (componentes, elegivel): array (COMPONENTES × datas × ativos)
+        e máscara (datas × ativos)
+    """
+    posicoes = np.asarray(posicoes)
+    bruto = painel.to_numpy(dtype=float)
+    negociado = ~np.isnan(bruto)
+    precos = painel.ffill().to_numpy(dtype=float)
+    negociado_f = negociado.astype(float)
+
+    # Variações diárias nos dias negociados (um pregão perdido entra no seguinte)
+    variacoes = np.zeros_like(precos)
+    variacoes[1:] = precos[1:] - precos[:-1]
+    valida = negociado.copy()
+    valida[0] = False
+    valida &= ~np.isnan(variacoes)
+    variacoes = np.where(valida, variacoes, 0.0)
+    retornos = np.zeros_like(precos)
+    np.divide(variacoes, precos - variacoes, out=retornos, where=valida)
+    valida_f = valida.astype(float)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        atual = precos[posicoes]
+        inicial = precos[np.maximum(posicoes + 1 - janela, 0)]
+
+        # 1. Retorno no período
+        retorno = (atual / inicial - 1) * 100
+
+        # 2. Volatilidade (desvio amostral dos retornos da janela)
+        n = _somas_janela(valida_f, posicoes, janela - 1)
+        soma = _somas_janela(retornos, posicoes, janela - 1)
+        soma_quadrados = _somas_janela(retornos ** 2, posicoes, janela - 1)
+        media = soma / n
+        variancia = np.maximum(soma_quadrados - soma * media, 0) / (n - 1)
+        volatilidade = np.sqrt(variancia) * np.sqrt(252) * 100
+
+        # 3. Sharpe
+        sharpe = np.where(
+            volatilidade > 0,
+            (media * 252 - _TAXA_LIVRE) / (volatilidade / 100),
+            0.0
+        )
+
+        # 4. Tendência (médias móveis de 20 e 50 pregões)
+        def media_movel(tamanho):
+            return _somas_janela(np.where(negociado, bruto, 0.0), posicoes, tamanho) / \
+                _somas_janela(negociado_f, posicoes, tamanho)
+
+        sma_20 = media_movel(20)
+        sma_50 = media_movel(50) if janela >= 50 else sma_20
+        tendencia = 50.0 * (atual > sma_20) + 50.0 * (atual > sma_50)
+
+        # 5. Momento (RSI de 14 pregões com médias simples)
+        dias_rsi = _somas_janela(valida_f, posicoes, 14)
+        ganho = _somas_janela(np.maximum(variacoes, 0), posicoes, 14) / dias_rsi
+        perda = _somas_janela(np.maximum(-variacoes, 0), posicoes, 14) / dias_rsi
+        rsi = 100 - 100 / (1 + ganho / perda)
+        momento = np.select(
+            [(rsi >= 40) & (rsi <= 60),
+             ((rsi >= 30) & (rsi < 40)) | ((rsi > 60) & (rsi <= 70)),
+             (rsi < 30) | (rsi > 70)],
+            [100.0, 70.0, 40.0],
+            50.0
+        )
+
+    componentes = np.stack([
+        _normalizar(retorno, -50, 100),
+        100 - _normalizar(volatilidade, 0, 100),
+        _normalizar(sharpe, -2, 4),
+        tendencia,
+        momento
+    ])
+    elegivel = negociado[posicoes] & ~np.isnan(inicial) & (posicoes + 1 >= janela)[:, None] & (n >= 19)
+    return componentes, elegivel
+
+
+def painel_scores(painel: pd.DataFrame, posicoes: np.ndarray, janela: int = 252,
+                  pesos: Optional[Dict[str, float]] = None) -> pd.DataFrame:
+    """
+    Score total de cada ativo em cada posição (ver ``componentes_score``).
+
+    Args:
+        painel: Painel de preços de ``montar_painel``
+        posicoes: Posições das datas a avaliar
+        janela: Linhas de histórico por score
+        pesos: Pesos dos componentes (padrão: Config.PESOS_RANKING)
+
+    Returns:
+        DataFrame (datas × ativos) com o score total ou NaN
+    """
+    componentes, elegivel = componentes_score(painel, posicoes, janela)
+    pesos = pesos or Config.PESOS_RANKING
+
+    # Mesma ordem de soma de _calcular_score
+    total = componentes[0] * pesos[COMPONENTES[0]]
+    for componente, nome in zip(componentes[1:], COMPONENTES[1:]):
+        total = total + componente * pesos[nome]
+
+    total = np.where(elegivel, np.round(total, 2), np.nan)
+    return pd.DataFrame(total, index=painel.index[np.asarray(posicoes)], columns=painel.columns)
+
+
+def retornos_futuros(painel: pd.DataFrame, posicoes: np.ndarray) -> np.ndarray:
+    """
+    Retorno de cada ativo de cada posição até a seguinte (a última vai até o fim do painel).
+
+    Args:
+        painel: Painel de preços de ``montar_painel``
+        posicoes: Posições dos rebalanceamentos
+
+    Returns:
+        Array (datas × ativos), NaN onde não há preço na posição
+    """
+    precos = painel.ffill().to_numpy(dtype=float)
+    posicoes = np.asarray(posicoes)
+    seguintes = np.r_[posicoes[1:], len(painel) - 1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return precos[seguintes] / precos[posicoes] - 1
+
+
+def simular_carteira(painel: pd.DataFrame, scores: pd.DataFrame, top: int = 10,
+                     custo: float = 0.001) -> Dict:
+    """
+    Simula a carteira com os ``top`` melhores scores, em pesos iguais.
+
+    Em cada data de ``scores`` a carteira é refeita; entre duas datas os
+    pesos variam com os preços. O custo incide sobre o giro (soma das
+    variações absolutas de peso, compras e vendas). Um ativo que deixa de
+    negociar fica com o último preço até o próximo rebalanceamento.
+
+    Args:
+        painel: Painel de preços de ``montar_painel``
+        scores: Scores por data de rebalanceamento (``painel_scores``)
+        top: Quantidade de ativos na carteira
+        custo: Custo por unidade de giro (0.001 = 0,1% do valor negociado)
+
+    Returns:
+        Dicionário com 'valores' (Series diária, base 1), 'giro' (Series por
+        rebalanceamento) e 'carteiras' (ticker(s) escolhidos por data)
+    """
+    precos = painel.ffill().to_numpy(dtype=float)
+    posicoes = painel.index.get_indexer(scores.index)
+    matriz_scores = scores.to_numpy(dtype=float)
+    tickers = np.asarray(painel.columns)
+
+    valores = np.full(len(painel), np.nan)
+    giros = np.zeros(len(posicoes))
+    carteiras = {}
+    pesos_atuais = np.zeros(painel.shape[1])
+    valor = 1.0
+
+    for j, posicao in enumerate(posicoes):
+        linha = matriz_scores[j]
+        escolhidos = indices_topo(np.where(np.isnan(linha), -np.inf, linha),
+                                  min(top, int((~np.isnan(linha)).sum())))
+        novos = np.zeros_like(pesos_atuais)
+        novos[escolhidos] = 1 / len(escolhidos) if len(escolhidos) else 0.0
+
+        giros[j] = np.abs(novos - pesos_atuais).sum()
+        valor *= 1 - custo * giros[j]
+        carteiras[scores.index[j]] = tickers[escolhidos].tolist()
+
+        # Evolução até o próximo rebalanceamento (ou o fim do painel)
+        fim = posicoes[j + 1] if j + 1 < len(posicoes) else len(painel) - 1
+        if len(escolhidos):
+            relativos = precos[posicao:fim + 1, escolhidos] / precos[posicao, escolhidos]
+            curva = relativos @ novos[escolhidos]
+        else:
+            relativos, curva = None, np.ones(fim + 1 - posicao)
+
+        valores[posicao:fim + 1] = valor * curva
+        pesos_atuais = np.zeros_like(pesos_atuais)
+        if relativos is not None:
+            pesos_atuais[escolhidos] = novos[escolhidos] * relativos[-1] / curva[-1]
+        valor *= curva[-1]
+
+    return {
+        'valores': pd.Series(valores, index=painel.index).dropna(),
+        'giro': pd.Series(giros, index=scores.index),
+        'carteiras': carteiras
+    }
+
+
+def calcular_metricas(valores: pd.Series, taxa_livre: float = _TAXA_LIVRE) -> Dict[str, float]:
+    """
+    Métricas de desempenho de uma curva de valor.
+
+    Args:
+        valores: Valor da carteira (ou preço) por data
+        taxa_livre: Taxa livre de risco anual para o Sharpe
+
+    Returns:
+        Dicionário com retorno total, CAGR, volatilidade e drawdown máximo
+        (em %) e Sharpe
+    """
+    valores = valores.dropna()
+    if len(valores) < 2:
+        return {'retorno_total': np.nan, 'cagr': np.nan, 'volatilidade': np.nan,
+                'sharpe': np.nan, 'max_drawdown': np.nan}
+
+    retornos = valores.pct_change().dropna()
+    anos = (valores.index[-1] - valores.index[0]).days / 365.25
+    crescimento = valores.iloc[-1] / valores.iloc[0]
+    volatilidade = retornos.std() * np.sqrt(252)
+
+    return {
+        'retorno_total': (crescimento - 1) * 100,
+        'cagr': (crescimento ** (1 / anos) - 1) * 100 if anos > 0 else np.nan,
+        'volatilidade': volatilidade * 100,
+        'sharpe': (retornos.mean() * 252 - taxa_livre) / volatilidade if volatilidade > 0 else 0.0,
+        'max_drawdown': (valores / valores.cummax() - 1).min() * 100
+    }
+
+
+class ResultadoBacktest:
+    """Resultado de um backtest: curvas, métricas, giro e carteiras."""
+
+    def __init__(self, curva: pd.DataFrame, metricas: pd.DataFrame, giro: pd.Series,
+                 carteiras: Dict, parametros: Dict, duracao: float):
+        self.curva = curva                  # Valor (base 1) da estratégia e do benchmark
+        self.metricas = metricas            # Uma linha por curva
+        self.giro = giro                    # Giro por rebalanceamento
+        self.carteiras = carteiras          # Data -> tickers escolhidos
+        self.parametros = parametros
+        self.duracao = duracao
+
+    def __sizeof__(self):
+        tamanho = object.__sizeof__(self)
+        tamanho += int(self.curva.memory_usage(index=True, deep=True).sum())
+        tamanho += int(self.metricas.memory_usage(index=True, deep=True).sum())
+        tamanho += int(self.giro.memory_usage(index=True, deep=True))
+        tamanho += sum(len(tickers) * 8 + 64 for tickers in self.carteiras.values())
+        return tamanho
+
+    def drawdown(self) -> pd.DataFrame:
+        """Queda em relação ao pico anterior de cada curva (em %)."""
+        return (self.curva / self.curva.cummax() - 1) * 100
+
+
+def backtest_painel(painel: pd.DataFrame, top: Optional[int] = None, janela: Optional[int] = None,
+                    custo: Optional[float] = None, frequencia: Optional[str] = None,
+                    benchmark: Optional[pd.Series] = None,
+                    nome_benchmark: str = 'Benchmark') -> Optional[ResultadoBacktest]:
+    """
+    Executa o backtest sobre um painel de preços já montado.
+
+    Args:
+        painel: Painel de preços de ``montar_painel``
+        top: Ativos na carteira (padrão: Config.BACKTEST_TOP)
+        janela: Pregões de histórico por score (padrão: Config.BACKTEST_JANELA)
+        custo: Custo por unidade de giro (padrão: Config.BACKTEST_CUSTO)
+        frequencia: Rebalanceamento 'W', 'M' ou 'Q' (padrão: Config.BACKTEST_FREQUENCIA)
+        benchmark: Preços do benchmark (opcional)
+        nome_benchmark: Nome da curva do benchmark
+
+    Returns:
+        ResultadoBacktest ou None se o histórico não cobrir a janela
+    """
+    top = top or Config.BACKTEST_TOP
+    janela = janela or Config.BACKTEST_JANELA
+    custo = Config.BACKTEST_CUSTO if custo is None else custo
+    frequencia = frequencia or Config.BACKTEST_FREQUENCIA
+    inicio = time.perf_counter()
+
+    posicoes = datas_rebalanceamento(painel.index, janela - 1, frequencia) if not painel.empty else []
+    if len(posicoes) == 0:
+        logger.warning(f"Backtest: histórico de {len(painel)} pregões não cobre a janela de {janela}")
+        return None
+
+    with medir('backtest.scores'):
+        scores = painel_scores(painel, posicoes, janela)
+
+    with medir('backtest.simulacao'):
+        simulacao = simular_carteira(painel, scores, top, custo)
+
+    curvas = {'Estratégia': simulacao['valores']}
+    if benchmark is not None and not benchmark.dropna().empty:
+        referencia = montar_painel({nome_benchmark: benchmark.to_frame('Close')})[nome_benchmark]
+        referencia = referencia.reindex(simulacao['valores'].index).ffill().dropna()
+        if not referencia.empty:
+            curvas[nome_benchmark] = referencia / referencia.iloc[0]
+    curva = pd.DataFrame(curvas)
+
+    metricas = pd.DataFrame({nome: calcular_metricas(serie) for nome, serie in curva.items()}).T
+    metricas['giro_medio'] = np.nan
+    metricas.loc['Estratégia', 'giro_medio'] = simulacao['giro'].iloc[1:].mean() * 100
+
+    return ResultadoBacktest(
+        curva=curva,
+        metricas=metricas,
+        giro=simulacao['giro'],
+        carteiras=simulacao['carteiras'],
+        parametros={'top': top, 'janela': janela, 'custo': custo, 'frequencia': frequencia,
+                    'ativos': painel.shape[1], 'pregoes': painel.shape[0]},
+        duracao=time.perf_counter() - inicio
+    )
+
+
+def benchmark_padrao(tickers: Iterable[str]) -> str:
+    """BOVA11 para universos majoritariamente da B3, SPY para os demais."""
+    tickers = list(tickers)
+    brasileiros = sum(ticker.endswith('.SA') for ticker in tickers)
+    return Config.BACKTEST_BENCHMARK_BR if brasileiros * 2 >= len(tickers) else Config.BACKTEST_BENCHMARK_EUA
+
+
+def executar_backtest(tickers: Iterable[str], period: Optional[str] = None,
+                      benchmark: Optional[str] = None, progresso_callback=None,
+                      **parametros) -> Optional[ResultadoBacktest]:
+    """
+    Busca os preços do universo e do benchmark e executa o backtest.
+
+    Args:
+        tickers: Universo de ativos
+        period: Histórico buscado (padrão: Config.BACKTEST_PERIODO)
+        benchmark: Ticker do benchmark (padrão: ``benchmark_padrao``)
+        progresso_callback: Função (atual, total, ticker) das buscas
+        **parametros: top, janela, custo e frequencia (ver ``backtest_painel``)
+
+    Returns:
+        ResultadoBacktest ou None se não houver dados suficientes
+    """
+    from utils.busca_async import buscar_varios
+
+    tickers = list(dict.fromkeys(tickers))
+    period = period or Config.BACKTEST_PERIODO
+    benchmark = benchmark or benchmark_padrao(tickers)
+
+    with medir('backtest.dados'):
+        dados = buscar_varios(tickers + [benchmark], period, progresso_callback=progresso_callback)
+        referencia = dados.get(benchmark)
+        if benchmark not in tickers:
+            dados.pop(benchmark, None)
+        painel = montar_painel(dados)
+
+    return backtest_painel(
+        painel,
+        benchmark=referencia['Close'] if referencia is not None else None,
+        nome_benchmark=benchmark,
+        **parametros
+    )
@@ -0,0 +1,294 @@
+"""Pipeline assíncrono de busca de dados com prazos, hedge e cancelamento.
+
+As funções da fonte são bloqueantes (yfinance), então cada chamada roda em
+um pool de threads dedicado e é aguardada com ``asyncio``. Isso permite:
+
+- prazo por requisição (um ticker travado não segura o lote inteiro);
+- hedge: se uma chamada à fonte passar do p95 das latências recentes, uma
+  segunda tentativa é disparada e vale a que terminar primeiro (o tempo na
+  fila do limitador ou aguardando uma busca coalescida não conta, e não há
+  hedge com o limitador saturado);
+- concorrência limitada por semáforo;
+- cancelamento do lote (por ``threading.Event`` ou por exceção no callback
+  de progresso, como o Streamlit faz quando o usuário sai da página).
+
+``executar_lote`` e ``buscar_varios`` são os wrappers síncronos usados pelas páginas.
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(
+    max_workers=Config.ASYNC_CONCORRENCIA * 2,
+    thread_name_prefix='busca-async'
+)
+
+# Latências recentes da fonte (sem a fila do limitador), usadas no prazo do hedge
+_latencias = deque(maxlen=200)
+_lock_latencias = threading.Lock()
+
+# Resultado de um item do lote que terminou com erro
+_FALHA = object()
+
+
+def _no_pool(loop: asyncio.AbstractEventLoop, func: Callable, *args) -> asyncio.Future:
+    """Agenda ``func`` no pool preservando o contexto (execução de ``utils.perf``)."""
+    contexto = contextvars.copy_context()
+    return loop.run_in_executor(_executor, functools.partial(contexto.run, func, *args))
+
+
+def _prazo_hedge() -> float:
+    """Tempo de espera antes de disparar a segunda tentativa (p95 recente)."""
+    with _lock_latencias:
+        amostras = list(_latencias)
+    if len(amostras) < 20:
+        return Config.ASYNC_HEDGE_MIN
+    return max(Config.ASYNC_HEDGE_MIN, float(np.percentile(amostras, 95)))
+
+
+async def executar_bloqueante(func: Callable, *args, prazo: Optional[float] = None) -> Any:
+    """
+    Executa uma função bloqueante no pool com prazo.
+
+    Args:
+        func: Função bloqueante
+        *args: Argumentos da função
+        prazo: Prazo em segundos (padrão: Config.ASYNC_PRAZO)
+
+    Returns:
+        Resultado da função ou None se o prazo estourar
+    """
+    prazo = Config.ASYNC_PRAZO if prazo is None else prazo
+    loop = asyncio.get_running_loop()
+    try:
+        return await asyncio.wait_for(_no_pool(loop, func, *args), prazo)
+    except asyncio.TimeoutError:
+        logger.warning(f"Prazo de {prazo:.0f}s esgotado em {getattr(func, '__name__', func)}{args}")
+        return None
+
+
+class _InicioBusca:
+    """Registra quando a busca chegou à fonte (chamado na thread da busca)."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.evento = asyncio.Event()
+        self.inicio: Optional[float] = None
+
+    def __call__(self) -> None:
+        if self.inicio is None:
+            self.inicio = time.monotonic()
+            self.loop.call_soon_threadsafe(self.evento.set)
+
+
+def _busca_hedge(ticker: str, period: str) -> Optional[pd.DataFrame]:
+    """
+    Segunda tentativa, gravada no cache.
+
+    Não pode ser coalescida com a primeira (seria a mesma chamada), mas tem
+    uma chave de coalescência própria: no máximo um hedge por ticker em
+    andamento. Passa pelo limitador como qualquer chamada à fonte.
+    """
+    from utils.cache import chamada_unica
+    from utils.data_fetcher import fetch_stock_data
+
+    def buscar():
+        data = fetch_stock_data.__wrapped__(ticker, period)
+        if data is not None:
+            fetch_stock_data.gravar_cache(data, ticker, period)
+        return data
+
+    return chamada_unica.executar(('hedge', ticker, period), buscar)
+
+
+async def buscar_dados_async(ticker: str, period: str = '1y',
+                             prazo: Optional[float] = None) -> Optional[pd.DataFrame]:
+    """
+    Busca dados históricos de uma ação com prazo e hedge.
+
+    Args:
+        ticker: Símbolo da ação
+        period: Período dos dados
+        prazo: Prazo total em segundos (padrão: Config.ASYNC_PRAZO)
+
+    Returns:
+        DataFrame com dados históricos ou None (erro ou prazo esgotado)
+    """
+    from utils.data_fetcher import fetch_stock_data, inicio_busca
+    from utils.limitador import limitador_fonte
+
+    prazo = Config.ASYNC_PRAZO if prazo is None else prazo
+    loop = asyncio.get_running_loop()
+    limite = time.monotonic() + prazo
+
+    # O contexto é copiado para a thread: só esta busca sinaliza este marcador
+    # (acertos de cache e buscas coalescidas com outra nunca o sinalizam)
+    marcador = _InicioBusca(loop)
+    token = inicio_busca.set(marcador)
+    try:
+        primeira = _no_pool(loop, fetch_stock_data, ticker, period)
+    finally:
+        inicio_busca.reset(token)
+    tentativas = {primeira}
+    chegou_na_fonte = asyncio.ensure_future(marcador.evento.wait())
+
+    try:
+        # O prazo do hedge conta a partir da chamada à fonte
+        await asyncio.wait({primeira, chegou_na_fonte}, timeout=prazo,
+                           return_when=asyncio.FIRST_COMPLETED)
+        if not primeira.done() and marcador.inicio is not None:
+            espera = min(marcador.inicio + _prazo_hedge(), limite) - time.monotonic()
+            concluidas, _ = await asyncio.wait(tentativas, timeout=max(espera, 0))
+            if not concluidas and time.monotonic() < limite:
+                if limitador_fonte.saturado():
+                    logger.info(f"Busca lenta para {ticker}, sem segunda tentativa (limitador saturado)")
+                else:
+                    logger.info(f"Busca lenta para {ticker}, disparando segunda tentativa")
+                    tentativas.add(_no_pool(loop, _busca_hedge, ticker, period))
+
+        while tentativas:
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                logger.warning(f"Prazo de {prazo:.0f}s esgotado para {ticker}")
+                return None
+            concluidas, tentativas = await asyncio.wait(
+                tentativas, timeout=restante, return_when=asyncio.FIRST_COMPLETED
+            )
+            for tentativa in concluidas:
+                if tentativa.exception() is None and tentativa.result() is not None:
+                    if marcador.inicio is not None:
+                        with _lock_latencias:
+                            _latencias.append(time.monotonic() - marcador.inicio)
+                    return tentativa.result()
+        return None
+    finally:
+        chegou_na_fonte.cancel()
+        for tentativa in tentativas:
+            tentativa.cancel()
+
+
+async def executar_lote_async(corrotina: Callable[[Any], Awaitable[Any]],
+                              itens: Iterable[Any],
+                              concorrencia: Optional[int] = None,
+                              progresso_callback: Optional[Callable] = None,
+                              cancelar: Optional[threading.Event] = None,
+                              coletar: Optional[Callable[[Any, Any], None]] = None) -> Dict[Any, Any]:
+    """
+    Executa uma corrotina para cada item com concorrência limitada.
+
+    Args:
+        corrotina: Função assíncrona que recebe um item
+        itens: Itens a processar
+        concorrencia: Máximo de itens em andamento (padrão: Config.ASYNC_CONCORRENCIA)
+        progresso_callback: Função (atual, total, item) chamada a cada conclusão,
+            inclusive de itens com erro
+        cancelar: Evento que, quando sinalizado, cancela os itens pendentes
+        coletar: Função (item, resultado) chamada a cada conclusão; com ela,
+            os resultados não são guardados (memória limitada ao que a
+            função mantiver)
+
+    Returns:
+        Dicionário item -> resultado (itens cancelados ou com erro ficam de
+        fora; com ``coletar``, os valores são None)
+    """
+    itens = list(dict.fromkeys(itens))
+    semaforo = asyncio.Semaphore(concorrencia or Config.ASYNC_CONCORRENCIA)
+
+    async def processar(item):
+        try:
+            async with semaforo:
+                if cancelar is not None and cancelar.is_set():
+                    raise asyncio.CancelledError()
+                resultado = await corrotina(item)
+            # Coletado aqui, a tarefa concluída não segura o resultado até o fim
+            if coletar is not None:
+                coletar(item, resultado)
+                return item, None
+            return item, resultado
+        except Exception as e:
+            # O item volta com a falha para o progresso contar também os erros
+            logger.error(f"Erro no processamento em lote ({item}): {str(e)}")
+            return item, _FALHA
+
+    tarefas = [asyncio.ensure_future(processar(item)) for item in itens]
+    resultados = {}
+
+    try:
+        for i, proxima in enumerate(asyncio.as_completed(tarefas)):
+            try:
+                item, resultado = await proxima
+            except asyncio.CancelledError:
+                break
+
+            if resultado is not _FALHA:
+                resultados[item] = resultado
+            if progresso_callback:
+                progresso_callback(i + 1, len(itens), item)
+            if cancelar is not None and cancelar.is_set():
+                break
+    finally:
+        # Cancela o restante (navegação, evento ou exceção no callback)
+        for tarefa in tarefas:
+            tarefa.cancel()
+        await asyncio.gather(*tarefas, return_exceptions=True)
+
+    return resultados
+
+
+def executar_lote(corrotina: Callable[[Any], Awaitable[Any]], itens: Iterable[Any],
+                  concorrencia: Optional[int] = None,
+                  progresso_callback: Optional[Callable] = None,
+                  cancelar: Optional[threading.Event] = None,
+                  coletar: Optional[Callable[[Any, Any], None]] = None) -> Dict[Any, Any]:
+    """
+    Versão síncrona de ``executar_lote_async`` para as páginas.
+
+    Os callbacks de progresso e de coleta rodam na thread chamadora; se o de
+    progresso lançar exceção (como o Streamlit faz ao interromper o script),
+    os itens pendentes são cancelados e a exceção é propagada.
+    """
+    return asyncio.run(executar_lote_async(
+        corrotina, itens, concorrencia, progresso_callback, cancelar, coletar
+    ))
+
+
+def buscar_varios(tickers: Iterable[str], period: str = '1y',
+                  prazo: Optional[float] = None,
+                  progresso_callback: Optional[Callable] = None,
+                  cancelar: Optional[threading.Event] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Busca dados de múltiplas ações pelo pipeline assíncrono.
+
+    Args:
+        tickers: Símbolos das ações
+        period: Período dos dados
+        prazo: Prazo por ticker em segundos
+        progresso_callback: Função (atual, total, ticker)
+        cancelar: Evento de cancelamento
+
+    Returns:
+        Dicionário ticker -> DataFrame (apenas tickers com dados)
+    """
+    resultados = executar_lote(
+        lambda ticker: buscar_dados_async(ticker, period, prazo),
+        tickers,
+        progresso_callback=progresso_callback,
+        cancelar=cancelar
+    )
+    return {
+        ticker: data for ticker, data in resultados.items()
+        if data is not None and not data.empty
+    }
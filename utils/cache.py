@@ -0,0 +1,528 @@
+"""Camada de cache em memória com chaves explícitas.
+
+Os DataFrames de preços são identificados pela chave
+(ticker, período, timestamp da última barra, nº de barras, versão dos dados),
+gravada em ``data.attrs`` por ``fetch_stock_data``. Assim, funções que
+recebem um DataFrame não precisam hashear o conteúdo para achar o cache.
+
+O cache é limitado em bytes (orçamento total e cotas por namespace em
+``Config``), remove entradas por LRU/LFU e mantém estatísticas de uso.
+Namespaces de rede (preços, info) usam stale-while-revalidate: uma entrada
+expirada é servida na hora enquanto uma única atualização por chave roda
+em segundo plano. Chamadas concorrentes para a mesma chave ausente são
+coalescidas (single-flight): apenas uma executa e as demais aguardam.
+"""
+
+import functools
+import inspect
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional, Set, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from config import Config
+
+# Incrementar quando o formato dos dados baixados mudar para invalidar o cache
+VERSAO_DADOS = 1
+
+_AUSENTE = object()
+
+logger = logging.getLogger(__name__)
+
+
+def marcar_dados(data: pd.DataFrame, ticker: str, period: str) -> pd.DataFrame:
+    """
+    Grava a identificação do DataFrame em ``data.attrs``.
+
+    Args:
+        data: DataFrame com dados históricos
+        ticker: Símbolo da ação
+        period: Período dos dados
+
+    Returns:
+        O próprio DataFrame, marcado
+    """
+    data.attrs['ticker'] = ticker
+    data.attrs['periodo'] = period
+    data.attrs['versao'] = VERSAO_DADOS
+    return data
+
+
+def chave_dados(data: pd.DataFrame) -> Optional[Tuple]:
+    """
+    Monta a chave de cache de um DataFrame marcado por ``marcar_dados``.
+
+    Args:
+        data: DataFrame com dados históricos
+
+    Returns:
+        Tupla (ticker, período, última barra, nº de barras, versão) ou None
+        se o DataFrame não estiver marcado ou estiver vazio
+    """
+    attrs = getattr(data, 'attrs', None)
+    if not attrs or 'ticker' not in attrs or len(data) == 0:
+        return None
+
+    ultima_barra = data.index[-1]
+    if isinstance(ultima_barra, pd.Timestamp):
+        ultima_barra = ultima_barra.value
+
+    return (
+        attrs['ticker'],
+        attrs.get('periodo'),
+        ultima_barra,
+        len(data),
+        attrs.get('versao', VERSAO_DADOS)
+    )
+
+
+def estimar_bytes(obj: Any) -> int:
+    """
+    Estima a memória ocupada por um valor cacheado.
+
+    Args:
+        obj: DataFrame, Series, array, figura Plotly, dict, lista ou escalar
+
+    Returns:
+        Tamanho aproximado em bytes
+    """
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(index=True, deep=True))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(
+            estimar_bytes(k) + estimar_bytes(v) for k, v in obj.items()
+        )
+    if isinstance(obj, (list, tuple, set)):
+        return sys.getsizeof(obj) + sum(estimar_bytes(v) for v in obj)
+    if hasattr(obj, 'to_plotly_json'):
+        return estimar_bytes(obj.to_plotly_json())
+    return sys.getsizeof(obj)
+
+
+class _Entrada:
+    """Valor cacheado com metadados de expiração, tamanho e uso."""
+
+    __slots__ = ('valor', 'criado_em', 'expira_em', 'bytes', 'acessos', 'ultimo_acesso')
+
+    def __init__(self, valor: Any, expira_em: float, tamanho: int):
+        self.valor = valor
+        self.criado_em = time.time()
+        self.expira_em = expira_em
+        self.bytes = tamanho
+        self.acessos = 0
+        self.ultimo_acesso = time.monotonic()
+
+    def expirada(self) -> bool:
+        return self.expira_em < time.time()
+
+
+class CacheMemoria:
+    """
+    Cache em memória, compartilhado entre sessões, separado por namespace.
+
+    Respeita um orçamento total de bytes e cotas por namespace. Quando um
+    limite é atingido, remove entradas pela política configurada:
+    'lru' (menos recentemente usada) ou 'lfu' (menos frequentemente usada).
+    """
+
+    def __init__(self, orcamento_bytes: Optional[int] = None,
+                 cotas: Optional[Dict[str, int]] = None,
+                 politica: Optional[str] = None):
+        self.orcamento_bytes = orcamento_bytes or Config.CACHE_ORCAMENTO_BYTES
+        self.cotas = dict(Config.CACHE_COTAS if cotas is None else cotas)
+        self.politica = politica or Config.CACHE_POLITICA
+        self._entradas: Dict[str, OrderedDict] = {}
+        self._bytes: Dict[str, int] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.RLock()
+
+    def _namespace(self, namespace: str) -> OrderedDict:
+        if namespace not in self._entradas:
+            self._entradas[namespace] = OrderedDict()
+            self._bytes[namespace] = 0
+            self._stats[namespace] = {
+                'acertos': 0, 'obsoletas': 0, 'falhas': 0, 'remocoes': 0,
+                'expiradas': 0, 'rejeitadas': 0
+            }
+        return self._entradas[namespace]
+
+    def _remover(self, namespace: str, chave: Hashable) -> None:
+        entrada = self._entradas[namespace].pop(chave)
+        self._bytes[namespace] -= entrada.bytes
+
+    def _vitima(self, namespace: str) -> Hashable:
+        entradas = self._entradas[namespace]
+        if self.politica == 'lfu':
+            return min(entradas, key=lambda k: (entradas[k].acessos, entradas[k].ultimo_acesso))
+        return next(iter(entradas))
+
+    def _liberar(self, namespace: str, necessario: int) -> None:
+        """Remove entradas até caber ``necessario`` bytes no namespace e no total."""
+        cota = self.cotas.get(namespace)
+        if cota is not None:
+            while self._entradas[namespace] and self._bytes[namespace] + necessario > cota:
+                self._remover(namespace, self._vitima(namespace))
+                self._stats[namespace]['remocoes'] += 1
+
+        while sum(self._bytes.values()) + necessario > self.orcamento_bytes:
+            candidatos = [ns for ns, entradas in self._entradas.items() if entradas]
+            if not candidatos:
+                break
+            if self.politica == 'lfu':
+                vitimas = {ns: self._vitima(ns) for ns in candidatos}
+                ns = min(candidatos, key=lambda n: (
+                    self._entradas[n][vitimas[n]].acessos,
+                    self._entradas[n][vitimas[n]].ultimo_acesso
+                ))
+                chave = vitimas[ns]
+            else:
+                ns = min(candidatos, key=lambda n: next(iter(self._entradas[n].values())).ultimo_acesso)
+                chave = next(iter(self._entradas[ns]))
+            self._remover(ns, chave)
+            self._stats[ns]['remocoes'] += 1
+
+    def obter_entrada(self, namespace: str, chave: Hashable,
+                      max_obsoleto: float = 0) -> Optional[_Entrada]:
+        """
+        Retorna a entrada armazenada, aceitando entradas expiradas há até
+        ``max_obsoleto`` segundos (o chamador verifica ``entrada.expirada()``).
+        """
+        with self._lock:
+            entradas = self._namespace(namespace)
+            entrada = entradas.get(chave)
+            if entrada is None:
+                self._stats[namespace]['falhas'] += 1
+                return None
+            if entrada.expirada():
+                if entrada.expira_em + max_obsoleto < time.time():
+                    self._remover(namespace, chave)
+                    self._stats[namespace]['expiradas'] += 1
+                    self._stats[namespace]['falhas'] += 1
+                    return None
+                self._stats[namespace]['obsoletas'] += 1
+            else:
+                self._stats[namespace]['acertos'] += 1
+            entrada.acessos += 1
+            entrada.ultimo_acesso = time.monotonic()
+            entradas.move_to_end(chave)
+            return entrada
+
+    def espiar(self, namespace: str, chave: Hashable) -> Optional[_Entrada]:
+        """Retorna a entrada se existir e estiver válida, sem contar estatísticas."""
+        with self._lock:
+            entrada = self._entradas.get(namespace, {}).get(chave)
+            if entrada is None or entrada.expirada():
+                return None
+            return entrada
+
+    def obter(self, namespace: str, chave: Hashable, padrao: Any = None) -> Any:
+        """Retorna o valor armazenado ou ``padrao`` se ausente/expirado."""
+        entrada = self.obter_entrada(namespace, chave)
+        return padrao if entrada is None else entrada.valor
+
+    def idade(self, namespace: str, chave: Hashable) -> Optional[float]:
+        """Retorna há quantos segundos a entrada foi gravada (None se ausente)."""
+        with self._lock:
+            entrada = self._entradas.get(namespace, {}).get(chave)
+            return None if entrada is None else time.time() - entrada.criado_em
+
+    def definir(self, namespace: str, chave: Hashable, valor: Any, ttl: float) -> None:
+        """Armazena um valor por ``ttl`` segundos, removendo outros se necessário."""
+        tamanho = estimar_bytes(valor)
+        with self._lock:
+            entradas = self._namespace(namespace)
+            if chave in entradas:
+                self._remover(namespace, chave)
+
+            cota = self.cotas.get(namespace, self.orcamento_bytes)
+            if tamanho > min(cota, self.orcamento_bytes):
+                self._stats[namespace]['rejeitadas'] += 1
+                return
+
+            self._liberar(namespace, tamanho)
+            entradas[chave] = _Entrada(valor, time.time() + ttl, tamanho)
+            self._bytes[namespace] += tamanho
+
+    def limpar(self, namespace: Optional[str] = None) -> None:
+        """Remove todas as entradas (ou apenas as de um namespace)."""
+        with self._lock:
+            for ns in list(self._entradas) if namespace is None else [namespace]:
+                if ns in self._entradas:
+                    self._entradas[ns].clear()
+                    self._bytes[ns] = 0
+
+    def estatisticas(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Retorna estatísticas por namespace.
+
+        Returns:
+            Dicionário namespace -> entradas, bytes, cota, acertos, obsoletas,
+            falhas, remocoes, expiradas, rejeitadas e taxa_acerto (0-1,
+            contando entradas obsoletas servidas como acerto)
+        """
+        with self._lock:
+            resultado = {}
+            for ns, entradas in self._entradas.items():
+                stats = dict(self._stats[ns])
+                servidas = stats['acertos'] + stats['obsoletas']
+                consultas = servidas + stats['falhas']
+                stats.update({
+                    'entradas': len(entradas),
+                    'bytes': self._bytes[ns],
+                    'cota': self.cotas.get(ns),
+                    'taxa_acerto': servidas / consultas if consultas else 0.0
+                })
+                resultado[ns] = stats
+            return resultado
+
+    def total_bytes(self) -> int:
+        """Retorna o total de bytes ocupados por todos os namespaces."""
+        with self._lock:
+            return sum(self._bytes.values())
+
+    def ids_valores(self) -> Set[int]:
+        """Retorna os ``id`` dos valores em cache (para detectar objetos compartilhados)."""
+        with self._lock:
+            return {
+                id(entrada.valor)
+                for entradas in self._entradas.values()
+                for entrada in entradas.values()
+            }
+
+
+class ChamadaUnica:
+    """
+    Coalesce chamadas concorrentes para a mesma chave (single-flight).
+
+    A primeira chamada executa a função; as que chegarem enquanto ela está
+    em andamento aguardam e recebem o mesmo resultado (ou a mesma exceção).
+    """
+
+    def __init__(self):
+        self._em_andamento: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.execucoes = 0
+        self.coalescidas = 0
+
+    def executar(self, chave: Hashable, func: Callable[[], Any]) -> Any:
+        """
+        Executa ``func`` ou aguarda a execução em andamento para ``chave``.
+
+        Args:
+            chave: Identificador da chamada
+            func: Função sem argumentos
+
+        Returns:
+            Resultado de ``func``
+        """
+        with self._lock:
+            futuro = self._em_andamento.get(chave)
+            lider = futuro is None
+            if lider:
+                futuro = Future()
+                self._em_andamento[chave] = futuro
+                self.execucoes += 1
+            else:
+                self.coalescidas += 1
+
+        if not lider:
+            return futuro.result()
+
+        try:
+            valor = func()
+            futuro.set_result(valor)
+            return valor
+        except BaseException as e:
+            futuro.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._em_andamento[chave]
+
+
+cache_global = CacheMemoria()
+chamada_unica = ChamadaUnica()
+
+_executor_revalidacao = ThreadPoolExecutor(
+    max_workers=Config.CACHE_SWR_WORKERS,
+    thread_name_prefix='revalidar-cache'
+)
+_revalidando = set()
+_lock_revalidacao = threading.Lock()
+
+
+def revalidar_em_segundo_plano(namespace: str, chave: Hashable,
+                               carregar: Callable[[], Any], ttl: float,
+                               cachear: Optional[Callable[[Any], bool]] = None) -> bool:
+    """
+    Agenda a atualização de uma entrada, no máximo uma por chave ao mesmo tempo.
+
+    Se ``carregar`` retornar None, falhar ou ``cachear`` recusar o valor,
+    a entrada obsoleta é mantida.
+
+    Args:
+        namespace: Namespace do cache
+        chave: Chave da entrada
+        carregar: Função sem argumentos que busca o valor atualizado
+        ttl: Tempo de vida do novo valor em segundos
+        cachear: Função que decide se o novo valor deve ser armazenado
+            (padrão: armazena qualquer valor diferente de None)
+
+    Returns:
+        True se a atualização foi agendada, False se já havia uma em andamento
+    """
+    identificador = (namespace, chave)
+    with _lock_revalidacao:
+        if identificador in _revalidando:
+            return False
+        _revalidando.add(identificador)
+
+    def tarefa():
+        try:
+            valor = chamada_unica.executar(identificador, carregar)
+            if valor is not None and (cachear is None or cachear(valor)):
+                cache_global.definir(namespace, chave, valor, ttl)
+        except Exception as e:
+            logger.error(f"Erro ao revalidar {namespace} {chave}: {str(e)}")
+        finally:
+            with _lock_revalidacao:
+                _revalidando.discard(identificador)
+
+    _executor_revalidacao.submit(tarefa)
+    return True
+
+
+def cache_por_dados(namespace: str, ttl: float = 3600) -> Callable:
+    """
+    Decorador que cacheia uma função cujo primeiro argumento é um DataFrame.
+
+    A chave é ``chave_dados(data)`` mais os demais argumentos (que precisam
+    ser hasheáveis). DataFrames não marcados são calculados sem cache.
+
+    Args:
+        namespace: Namespace do cache (ex: 'indicadores', 'scores')
+        ttl: Tempo de vida das entradas em segundos
+
+    Returns:
+        Decorador
+    """
+    def decorador(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(data, *args, **kwargs):
+            chave = chave_dados(data)
+            if chave is None:
+                return func(data, *args, **kwargs)
+
+            chave = (func.__qualname__, chave, args, tuple(sorted(kwargs.items())))
+            valor = cache_global.obter(namespace, chave, _AUSENTE)
+            if valor is _AUSENTE:
+                valor = func(data, *args, **kwargs)
+                cache_global.definir(namespace, chave, valor, ttl)
+            return valor
+
+        wrapper.limpar_cache = lambda: cache_global.limpar(namespace)
+        return wrapper
+
+    return decorador
+
+
+def cache_por_argumentos(namespace: str, ttl: Union[float, Callable[..., float]] = 3600,
+                         revalidar: bool = False,
+                         atualizar: Optional[Callable] = None,
+                         cachear: Optional[Callable[[Any], bool]] = None) -> Callable:
+    """
+    Decorador que cacheia uma função pelos seus argumentos (hasheáveis).
+
+    Os argumentos omitidos são preenchidos com os valores padrão, então
+    ``f('X')`` e ``f('X', '1y')`` compartilham a mesma entrada.
+
+    Com ``revalidar=True``, uma entrada expirada há menos de
+    ``Config.CACHE_MAX_OBSOLETO`` segundos é retornada imediatamente e
+    atualizada em segundo plano (stale-while-revalidate). Se ``atualizar``
+    for informado, a atualização chama ``atualizar(valor_antigo, *args,
+    **kwargs)`` em vez da função completa, permitindo atualizações
+    incrementais.
+
+    A função decorada ganha ``idade_cache(*args, **kwargs)``, que retorna
+    a idade em segundos da entrada correspondente (ou None), e
+    ``gravar_cache(valor, *args, **kwargs)``, que grava um valor obtido por
+    fora do cache (a função original fica em ``__wrapped__``).
+
+    Args:
+        namespace: Namespace do cache (ex: 'precos', 'info')
+        ttl: Tempo de vida das entradas em segundos, ou função que recebe
+            os mesmos argumentos da função decorada e retorna o TTL
+        revalidar: Se True, aplica stale-while-revalidate
+        atualizar: Função de atualização incremental (opcional)
+        cachear: Função que decide se um resultado deve ser armazenado
+            (padrão: armazena todos)
+
+    Returns:
+        Decorador
+    """
+    max_obsoleto = Config.CACHE_MAX_OBSOLETO if revalidar else 0
+
+    def decorador(func: Callable) -> Callable:
+        assinatura = inspect.signature(func)
+
+        def montar_chave(args, kwargs):
+            argumentos = assinatura.bind(*args, **kwargs)
+            argumentos.apply_defaults()
+            return (func.__qualname__, tuple(argumentos.arguments.items()))
+
+        def calcular_ttl(args, kwargs):
+            return ttl(*args, **kwargs) if callable(ttl) else ttl
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            chave = montar_chave(args, kwargs)
+
+            entrada = cache_global.obter_entrada(namespace, chave, max_obsoleto)
+            if entrada is not None:
+                if entrada.expirada():
+                    anterior = entrada.valor
+                    if atualizar is not None and anterior is not None:
+                        carregar = lambda: atualizar(anterior, *args, **kwargs)
+                    else:
+                        carregar = lambda: func(*args, **kwargs)
+                    revalidar_em_segundo_plano(
+                        namespace, chave, carregar, calcular_ttl(args, kwargs), cachear
+                    )
+                return entrada.valor
+
+            def carregar():
+                # Outra chamada pode ter gravado a entrada enquanto esta esperava
+                recente = cache_global.espiar(namespace, chave)
+                if recente is not None:
+                    return recente.valor
+                valor = func(*args, **kwargs)
+                if cachear is None or cachear(valor):
+                    cache_global.definir(namespace, chave, valor, calcular_ttl(args, kwargs))
+                return valor
+
+            return chamada_unica.executar((namespace, chave), carregar)
+
+        wrapper.limpar_cache = lambda: cache_global.limpar(namespace)
+        wrapper.idade_cache = lambda *args, **kwargs: cache_global.idade(
+            namespace, montar_chave(args, kwargs)
+        )
+        wrapper.gravar_cache = lambda valor, *args, **kwargs: cache_global.definir(
+            namespace, montar_chave(args, kwargs), valor, calcular_ttl(args, kwargs)
+        )
+        return wrapper
+
+    return decorador
+
+
+def estatisticas_cache() -> Dict[str, Dict[str, Any]]:
+    """Retorna as estatísticas do cache global por namespace."""
+    return cache_global.estatisticas()
@@ -0,0 +1,149 @@
+"""Utilitários de desempenho para gráficos (downsampling e WebGL)."""
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from typing import Optional
+from config import Config
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Seleciona pontos pelo algoritmo Largest-Triangle-Three-Buckets.
+
+    Mantém o primeiro e o último ponto e, em cada bucket intermediário,
+    escolhe o ponto que forma o maior triângulo com o ponto anterior
+    selecionado e a média do bucket seguinte, preservando picos e vales.
+
+    Args:
+        x: Eixo X numérico e crescente
+        y: Valores da série (sem NaN)
+        n_out: Quantidade de pontos desejada
+
+    Returns:
+        Array com os índices dos pontos selecionados (ordenado)
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = x.astype(np.float64)
+    y = y.astype(np.float64)
+
+    # Limites dos n_out - 2 buckets intermediários
+    bordas = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    anterior = 0
+    for i in range(n_out - 2):
+        inicio, fim = bordas[i], bordas[i + 1]
+
+        # Média do próximo bucket (ou o último ponto no último bucket)
+        prox_inicio = fim
+        prox_fim = bordas[i + 2] if i + 2 < len(bordas) else n
+        media_x = x[prox_inicio:prox_fim].mean()
+        media_y = y[prox_inicio:prox_fim].mean()
+
+        ax, ay = x[anterior], y[anterior]
+        areas = np.abs(
+            (ax - media_x) * (y[inicio:fim] - ay) -
+            (ax - x[inicio:fim]) * (media_y - ay)
+        )
+
+        anterior = inicio + int(np.argmax(areas))
+        indices[i + 1] = anterior
+
+    return indices
+
+
+def downsample_series(series: pd.Series, n_out: Optional[int] = None) -> pd.Series:
+    """
+    Reduz uma série temporal para um número máximo de pontos.
+
+    Args:
+        series: Série indexada por data
+        n_out: Quantidade máxima de pontos (padrão: Config.GRAFICO_MAX_PONTOS)
+
+    Returns:
+        Série reduzida (a própria série se já estiver dentro do limite)
+    """
+    if n_out is None:
+        n_out = Config.GRAFICO_MAX_PONTOS
+
+    series = series.dropna()
+    if len(series) <= n_out:
+        return series
+
+    if isinstance(series.index, pd.DatetimeIndex):
+        x = series.index.asi8
+    else:
+        x = np.arange(len(series))
+
+    indices = lttb_indices(x, series.to_numpy(dtype=np.float64), n_out)
+    return series.iloc[indices]
+
+
+def usar_webgl(total_pontos: int) -> bool:
+    """
+    Indica se o gráfico deve usar traces WebGL.
+
+    Args:
+        total_pontos: Total de pontos originais somando todas as séries
+
+    Returns:
+        True se o total ultrapassar Config.GRAFICO_LIMIAR_WEBGL
+    """
+    return total_pontos > Config.GRAFICO_LIMIAR_WEBGL
+
+
+def criar_linha(x, y, webgl: bool = False, **kwargs):
+    """
+    Cria um trace de linha, usando Scattergl quando solicitado.
+
+    Args:
+        x: Valores do eixo X
+        y: Valores do eixo Y
+        webgl: Se True, usa go.Scattergl
+        **kwargs: Demais argumentos repassados ao trace
+
+    Returns:
+        go.Scatter ou go.Scattergl
+    """
+    trace = go.Scattergl if webgl else go.Scatter
+    return trace(x=x, y=y, **kwargs)
+
+
+def reamostrar_ohlc(dados: pd.DataFrame, max_barras: Optional[int] = None) -> pd.DataFrame:
+    """
+    Agrega candles consecutivos para limitar a quantidade de barras.
+
+    Cada grupo de k barras vira uma só (abertura da primeira, máxima e
+    mínima do grupo, fechamento e data da última, volume somado).
+
+    Args:
+        dados: DataFrame OHLCV indexado por data
+        max_barras: Quantidade máxima de barras (padrão: Config.GRAFICO_MAX_CANDLES)
+
+    Returns:
+        DataFrame OHLCV agregado (o próprio DataFrame se já estiver dentro do limite)
+    """
+    if max_barras is None:
+        max_barras = Config.GRAFICO_MAX_CANDLES
+
+    n = len(dados)
+    if n <= max_barras:
+        return dados
+
+    tamanho = int(np.ceil(n / max_barras))
+    grupos = np.arange(n) // tamanho
+
+    agregacoes = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last'}
+    if 'Volume' in dados.columns:
+        agregacoes['Volume'] = 'sum'
+
+    agregado = dados[list(agregacoes)].groupby(grupos).agg(agregacoes)
+    agregado.index = dados.index[np.minimum((agregado.index + 1) * tamanho, n) - 1]
+    return agregado
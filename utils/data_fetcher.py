@@ -1,61 +1,185 @@
 """Módulo para busca e processamento de dados financeiros."""
 
-import streamlit as st
-import yfinance as yf
+import contextvars
 import pandas as pd
+import numpy as np
 from typing import Dict, List, Optional
 import logging
+from config import Config
+from utils.cache import marcar_dados, cache_por_argumentos
+from utils.mercado import ttl_precos, ttl_info
+from utils.resiliencia import falhas_precos, falhas_info, disjuntor_fonte
+from utils.limitador import limitador_fonte
+from utils.fontes import obter_fonte
+from utils.perf import medir
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-@st.cache_data(ttl=3600, show_spinner=False)
-def fetch_stock_data(ticker: str, period: str = '1y') -> Optional[pd.DataFrame]:
+# Janela de cada período, usada para descartar barras antigas após atualizar a cauda
+_JANELAS_PERIODO = {
+    '1mo': pd.DateOffset(months=1),
+    '3mo': pd.DateOffset(months=3),
+    '6mo': pd.DateOffset(months=6),
+    '1y': pd.DateOffset(years=1),
+    '2y': pd.DateOffset(years=2),
+    '5y': pd.DateOffset(years=5)
+}
+
+
+def _baixar_dados(ticker: str, period: str) -> Optional[pd.DataFrame]:
     """
-    Busca dados históricos de uma ação.
+    Baixa os dados históricos de uma ação pela fonte ativa (sem cache).
     
     Args:
         ticker: Símbolo da ação
-        period: Período dos dados (1mo, 3mo, 6mo, 1y, 2y, 5y, max)
+        period: Período dos dados
         
     Returns:
-        DataFrame com dados históricos ou None em caso de erro
+        DataFrame com dados históricos ou None se não houver dados
+        
+    Raises:
+        ErroFonteDados: Se a fonte falhar por motivo transitório
+    """
+    data = obter_fonte().baixar_barras(ticker, period)
+    
+    if data is None or data.empty:
+        logger.warning(f"Nenhum dado encontrado para {ticker}")
+        return None
+    
+    return data
+
+
+# Função chamada quando a busca chega à fonte, depois da fila do limitador
+# (usada pelo hedge de utils.busca_async para não contar o tempo de espera)
+inicio_busca = contextvars.ContextVar('inicio_busca', default=None)
+
+
+def _executar_na_fonte(func):
+    """Executa uma chamada à fonte, pelo limitador se a fonte for remota."""
+    def chamar():
+        sinalizar = inicio_busca.get()
+        if sinalizar is not None:
+            sinalizar()
+        return func()
+    
+    if obter_fonte().limitada:
+        return limitador_fonte.executar(chamar)
+    return chamar()
+
+
+def _baixar_protegido(ticker: str, period: str) -> Optional[pd.DataFrame]:
+    """
+    Baixa dados respeitando o cache negativo e o disjuntor da fonte.
+    
+    Tickers em espera após falhas e chamadas com o disjuntor aberto retornam
+    None sem acessar a rede. As chamadas a fontes remotas passam pelo
+    limitador adaptativo.
+    
+    Args:
+        ticker: Símbolo da ação
+        period: Período dos dados
+        
+    Returns:
+        DataFrame com dados históricos ou None
+    """
+    if falhas_precos.bloqueado(ticker) or not disjuntor_fonte.permitir():
+        return None
+    
+    try:
+        with medir('busca', ticker):
+            data = _executar_na_fonte(lambda: _baixar_dados(ticker, period))
+    except Exception as e:
+        disjuntor_fonte.registrar(False)
+        falhas_precos.registrar_falha(ticker, str(e))
+        logger.error(f"Erro ao buscar dados para {ticker}: {str(e)}")
+        return None
+    
+    disjuntor_fonte.registrar(True)
+    
+    if data is None:
+        falhas_precos.registrar_falha(ticker, "Sem dados (ticker inválido ou deslistado)")
+        return None
+    
+    falhas_precos.registrar_sucesso(ticker)
+    return data
+
+
+def _atualizar_dados(anterior: pd.DataFrame, ticker: str, period: str = '1y') -> Optional[pd.DataFrame]:
+    """
+    Atualiza dados em cache baixando apenas as barras recentes.
+    
+    As barras históricas não expiram: só a cauda (Config.CACHE_PERIODO_CAUDA)
+    é baixada e substitui as barras correspondentes. Se os preços ajustados
+    das barras em comum mudaram (dividendo ou desdobramento), baixa o
+    período completo.
+    
+    Args:
+        anterior: DataFrame em cache
+        ticker: Símbolo da ação
+        period: Período dos dados
+        
+    Returns:
+        DataFrame atualizado ou None em caso de erro
     """
     try:
-        # Download com auto_adjust=True para evitar multi-index
-        data = yf.download(
-            ticker, 
-            period=period, 
-            progress=False,
-            auto_adjust=True,
-            threads=False
-        )
-        
-        if data.empty:
-            logger.warning(f"Nenhum dado encontrado para {ticker}")
+        cauda = _baixar_protegido(ticker, Config.CACHE_PERIODO_CAUDA)
+        if cauda is None:
             return None
         
-        # Se ainda tiver multi-index, flatten
-        if isinstance(data.columns, pd.MultiIndex):
-            data.columns = data.columns.get_level_values(0)
+        comuns = anterior.index.intersection(cauda.index[:-1])
+        if len(comuns) == 0 or not np.allclose(
+            anterior.loc[comuns, 'Close'], cauda.loc[comuns, 'Close'], rtol=1e-4
+        ):
+            data = _baixar_protegido(ticker, period)
+            return marcar_dados(data, ticker, period) if data is not None else None
         
-        # Garantir que o índice seja datetime
-        if not isinstance(data.index, pd.DatetimeIndex):
-            data.index = pd.to_datetime(data.index)
+        data = pd.concat([anterior[anterior.index < cauda.index[0]], cauda])
         
-        # Adicionar coluna Adj Close se não existir
-        if 'Adj Close' not in data.columns and 'Close' in data.columns:
-            data['Adj Close'] = data['Close']
+        janela = _JANELAS_PERIODO.get(period)
+        if janela is not None:
+            data = data[data.index > data.index[-1] - janela]
         
-        return data
+        return marcar_dados(data, ticker, period)
         
     except Exception as e:
-        logger.error(f"Erro ao buscar dados para {ticker}: {str(e)}")
+        logger.error(f"Erro ao atualizar dados para {ticker}: {str(e)}")
+        return None
+
+
+@cache_por_argumentos(
+    'precos',
+    ttl=lambda ticker, period='1y': ttl_precos(ticker),
+    revalidar=True,
+    atualizar=_atualizar_dados,
+    cachear=lambda data: data is not None
+)
+def fetch_stock_data(ticker: str, period: str = '1y') -> Optional[pd.DataFrame]:
+    """
+    Busca dados históricos de uma ação.
+    
+    O cache expira conforme o pregão da bolsa do ativo (ver utils.mercado)
+    e, ao expirar, é atualizado de forma incremental. Falhas não são
+    cacheadas aqui: o cache negativo (utils.resiliencia) evita novas
+    tentativas com backoff exponencial.
+    O DataFrame retornado é compartilhado pelo cache e não deve ser modificado.
+    
+    Args:
+        ticker: Símbolo da ação
+        period: Período dos dados (1mo, 3mo, 6mo, 1y, 2y, 5y, max)
+        
+    Returns:
+        DataFrame com dados históricos ou None em caso de erro
+    """
+    data = _baixar_protegido(ticker, period)
+    
+    if data is None:
         return None
+    
+    return marcar_dados(data, ticker, period)
 
 
-@st.cache_data(ttl=3600, show_spinner=False)
 def fetch_multiple_stocks(tickers: List[str], period: str = '1y') -> Dict[str, pd.DataFrame]:
     """
     Busca dados de múltiplas ações.
@@ -67,29 +191,46 @@ def fetch_multiple_stocks(tickers: List[str], period: str = '1y') -> Dict[str, p
     Returns:
         Dicionário com ticker como chave e DataFrame como valor
     """
-    from concurrent.futures import ThreadPoolExecutor, as_completed
+    from utils.busca_async import buscar_varios
     
-    results = {}
+    # Prazo por ticker: um ticker travado não segura os demais
+    return buscar_varios(tickers, period)
+
+
+def _baixar_info(ticker: str) -> Optional[Dict]:
+    """
+    Baixa as informações de uma ação (sem cache).
     
-    with ThreadPoolExecutor(max_workers=5) as executor:
-        future_to_ticker = {
-            executor.submit(fetch_stock_data, ticker, period): ticker 
-            for ticker in tickers
-        }
+    Args:
+        ticker: Símbolo da ação
         
-        for future in as_completed(future_to_ticker):
-            ticker = future_to_ticker[future]
-            try:
-                data = future.result()
-                if data is not None and not data.empty:
-                    results[ticker] = data
-            except Exception as e:
-                logger.error(f"Erro ao processar {ticker}: {str(e)}")
-                
-    return results
+    Returns:
+        Dicionário com informações da ação ou None se não houver informações
+        
+    Raises:
+        ErroFonteDados: Se a fonte falhar por motivo transitório
+    """
+    fonte = obter_fonte()
+    info = fonte.obter_info(ticker)
+    
+    if not info:
+        return None
+    
+    # Adicionar dividend yield se não existir
+    if 'dividendYield' not in info or info['dividendYield'] is None:
+        # Tentar calcular manualmente
+        dividends = fonte.obter_dividendos(ticker)
+        if not dividends.empty and 'currentPrice' in info:
+            ultimo_ano = dividends.index > dividends.index[-1] - pd.DateOffset(years=1)
+            ultimo_ano_dividendos = dividends[ultimo_ano].sum()
+            preco_atual = info.get('currentPrice', info.get('regularMarketPrice', 0))
+            if preco_atual > 0:
+                info['dividendYield'] = ultimo_ano_dividendos / preco_atual
+    
+    return info
 
 
-@st.cache_data(ttl=3600, show_spinner=False)
+@cache_por_argumentos('info', ttl=ttl_info, revalidar=True, cachear=lambda info: info is not None)
 def get_stock_info(ticker: str) -> Optional[Dict]:
     """
     Obtém informações detalhadas sobre uma ação.
@@ -100,24 +241,42 @@ def get_stock_info(ticker: str) -> Optional[Dict]:
     Returns:
         Dicionário com informações da ação ou None
     """
+    if falhas_info.bloqueado(ticker) or not disjuntor_fonte.permitir():
+        return None
+    
     try:
-        stock = yf.Ticker(ticker)
-        info = stock.info
-        
-        # Adicionar dividend yield se não existir
-        if 'dividendYield' not in info or info['dividendYield'] is None:
-            # Tentar calcular manualmente
-            dividends = stock.dividends
-            if not dividends.empty and 'currentPrice' in info:
-                ultimo_ano_dividendos = dividends.last('1Y').sum()
-                preco_atual = info.get('currentPrice', info.get('regularMarketPrice', 0))
-                if preco_atual > 0:
-                    info['dividendYield'] = ultimo_ano_dividendos / preco_atual
-        
-        return info
+        with medir('info', ticker):
+            info = _executar_na_fonte(lambda: _baixar_info(ticker))
     except Exception as e:
+        disjuntor_fonte.registrar(False)
+        falhas_info.registrar_falha(ticker, str(e))
         logger.error(f"Erro ao obter informações de {ticker}: {str(e)}")
         return None
+    
+    disjuntor_fonte.registrar(True)
+    
+    if info is None:
+        falhas_info.registrar_falha(ticker, "Sem informações (ticker inválido ou deslistado)")
+        return None
+    
+    falhas_info.registrar_sucesso(ticker)
+    return info
+
+
+def idade_dados(tickers: List[str], period: str = '1y') -> Optional[float]:
+    """
+    Obtém a idade do dado de preços mais antigo em cache para os tickers.
+    
+    Args:
+        tickers: Lista de símbolos de ações
+        period: Período dos dados
+        
+    Returns:
+        Idade em segundos ou None se nenhum ticker estiver em cache
+    """
+    idades = [fetch_stock_data.idade_cache(ticker, period) for ticker in tickers]
+    idades = [idade for idade in idades if idade is not None]
+    return max(idades) if idades else None
 
 
 def normalize_prices(data_dict: Dict[str, pd.DataFrame]) -> pd.DataFrame:
@@ -140,3 +299,24 @@ def normalize_prices(data_dict: Dict[str, pd.DataFrame]) -> pd.DataFrame:
                 normalized[ticker] = (close_series / first_value) * 100
             
     return normalized
+
+
+def calcular_correlacao(data_dict: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """
+    Calcula a matriz de correlação entre os preços de fechamento.
+    
+    Args:
+        data_dict: Dicionário com ticker e DataFrame
+        
+    Returns:
+        DataFrame com a matriz de correlação (vazio se houver menos de 2 ativos)
+    """
+    # Montar todas as colunas de uma vez; inserir uma a uma é quadrático
+    fechamentos = {
+        ticker: data['Close'] for ticker, data in data_dict.items()
+        if not data.empty and 'Close' in data.columns
+    }
+    if len(fechamentos) < 2:
+        return pd.DataFrame()
+    
+    return pd.concat(fechamentos, axis=1).corr()
@@ -0,0 +1,280 @@
+"""Fontes de dados de mercado intercambiáveis.
+
+``utils.data_fetcher`` não acessa o yfinance diretamente: todas as buscas
+passam pela fonte ativa (``obter_fonte``). Além do yfinance há uma fonte de
+gravação, que salva em disco as respostas de outra fonte, e uma de
+reprodução, que as serve offline com latência sintética — útil para
+benchmarks e testes de carga reprodutíveis.
+
+A fonte inicial é escolhida por ``Config.FONTE_DADOS`` (variável de
+ambiente ``FONTE_DADOS``: 'yfinance', 'gravar', 'reproduzir' ou
+'sintetico', ver ``utils.sintetico``).
+"""
+
+import logging
+import os
+import pickle
+import random
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+
+import pandas as pd
+from config import Config
+from utils.limitador import erro_de_limite
+from utils.resiliencia import ErroFonteDados, ErroLimiteRequisicoes
+
+logger = logging.getLogger(__name__)
+
+
+class FonteDados(ABC):
+    """
+    Interface de uma fonte de dados de mercado.
+
+    Os métodos retornam None (ou série vazia) quando o ticker não existe e
+    lançam ``ErroFonteDados`` em falhas transitórias, para que o cache
+    negativo e o disjuntor possam distinguir os dois casos.
+    """
+
+    nome = 'base'
+    # Fontes remotas passam pelo limitador de requisições; fontes locais não
+    limitada = True
+
+    @abstractmethod
+    def baixar_barras(self, ticker: str, period: str) -> Optional[pd.DataFrame]:
+        """Barras diárias OHLCV ajustadas (com 'Adj Close') ou None."""
+
+    @abstractmethod
+    def obter_info(self, ticker: str) -> Optional[Dict]:
+        """Informações cadastrais e fundamentalistas ou None."""
+
+    @abstractmethod
+    def obter_dividendos(self, ticker: str) -> pd.Series:
+        """Dividendos pagos, indexados pela data ex."""
+
+
+class FonteYFinance(FonteDados):
+    """Fonte baseada no yfinance (importado apenas no primeiro uso)."""
+
+    nome = 'yfinance'
+
+    # Mensagens do yfinance que indicam ticker inexistente, e não falha da fonte
+    _ERROS_TICKER_INVALIDO = ('delisted', 'no data found', 'no timezone found', 'not found', 'invalid')
+
+    @staticmethod
+    def _erro_download(ticker: str) -> Optional[str]:
+        """Obtém a mensagem de erro registrada pelo yfinance para o ticker."""
+        try:
+            from yfinance import shared
+            return shared._ERRORS.get(ticker)
+        except Exception:
+            return None
+
+    def baixar_barras(self, ticker: str, period: str) -> Optional[pd.DataFrame]:
+        import yfinance as yf
+
+        # Download com auto_adjust=True para evitar multi-index
+        data = yf.download(
+            ticker,
+            period=period,
+            progress=False,
+            auto_adjust=True,
+            threads=False
+        )
+
+        if data.empty:
+            erro = self._erro_download(ticker)
+            if erro and erro_de_limite(erro):
+                raise ErroLimiteRequisicoes(erro)
+            if erro and not any(m in erro.lower() for m in self._ERROS_TICKER_INVALIDO):
+                raise ErroFonteDados(erro)
+            return None
+
+        # Se ainda tiver multi-index, flatten
+        if isinstance(data.columns, pd.MultiIndex):
+            data.columns = data.columns.get_level_values(0)
+
+        # Garantir que o índice seja datetime
+        if not isinstance(data.index, pd.DatetimeIndex):
+            data.index = pd.to_datetime(data.index)
+
+        # Adicionar coluna Adj Close se não existir
+        if 'Adj Close' not in data.columns and 'Close' in data.columns:
+            data['Adj Close'] = data['Close']
+
+        return data
+
+    def _chamar(self, func):
+        try:
+            return func()
+        except Exception as e:
+            if erro_de_limite(str(e)):
+                raise ErroLimiteRequisicoes(str(e)) from e
+            raise
+
+    def obter_info(self, ticker: str) -> Optional[Dict]:
+        import yfinance as yf
+
+        info = self._chamar(lambda: yf.Ticker(ticker).info)
+        if not info or not (info.get('longName') or info.get('shortName')):
+            return None
+        return info
+
+    def obter_dividendos(self, ticker: str) -> pd.Series:
+        import yfinance as yf
+
+        return self._chamar(lambda: yf.Ticker(ticker).dividends)
+
+
+def _nome_arquivo(*partes: str) -> str:
+    return '_'.join(re.sub(r'[^A-Za-z0-9.\-^=]', '-', p) for p in partes) + '.pkl'
+
+
+class FonteGravadora(FonteDados):
+    """
+    Repassa as chamadas a outra fonte e grava as respostas em disco.
+
+    Respostas vazias (ticker inexistente) também são gravadas, para que a
+    reprodução se comporte igual. Falhas transitórias não são gravadas.
+
+    Args:
+        fonte: Fonte real consultada
+        diretorio: Diretório das gravações
+    """
+
+    nome = 'gravar'
+
+    def __init__(self, fonte: FonteDados, diretorio: str):
+        self.fonte = fonte
+        self.diretorio = diretorio
+
+    def _gravar(self, tipo: str, arquivo: str, valor) -> None:
+        pasta = os.path.join(self.diretorio, tipo)
+        os.makedirs(pasta, exist_ok=True)
+        caminho = os.path.join(pasta, arquivo)
+        temporario = f"{caminho}.{threading.get_ident()}.tmp"
+        with open(temporario, 'wb') as f:
+            pickle.dump(valor, f)
+        os.replace(temporario, caminho)
+
+    def baixar_barras(self, ticker: str, period: str) -> Optional[pd.DataFrame]:
+        data = self.fonte.baixar_barras(ticker, period)
+        self._gravar('barras', _nome_arquivo(ticker, period), data)
+        return data
+
+    def obter_info(self, ticker: str) -> Optional[Dict]:
+        info = self.fonte.obter_info(ticker)
+        self._gravar('info', _nome_arquivo(ticker), info)
+        return info
+
+    def obter_dividendos(self, ticker: str) -> pd.Series:
+        dividendos = self.fonte.obter_dividendos(ticker)
+        self._gravar('dividendos', _nome_arquivo(ticker), dividendos)
+        return dividendos
+
+
+class FonteReproducao(FonteDados):
+    """
+    Serve respostas gravadas por ``FonteGravadora``, sem acesso à rede.
+
+    Cada chamada espera ``latencia`` segundos mais um ruído uniforme de até
+    ``variacao`` segundos (semente fixa), simulando a fonte real.
+    Tickers sem gravação são tratados como inexistentes.
+
+    Args:
+        diretorio: Diretório das gravações
+        latencia: Latência sintética base (s)
+        variacao: Amplitude do ruído de latência (s)
+        semente: Semente do gerador de ruído
+    """
+
+    nome = 'reproduzir'
+    limitada = False
+
+    def __init__(self, diretorio: str, latencia: float = 0.0,
+                 variacao: float = 0.0, semente: int = 0):
+        self.diretorio = diretorio
+        self.latencia = latencia
+        self.variacao = variacao
+        self._aleatorio = random.Random(semente)
+        self._lock = threading.Lock()
+
+    def _ler(self, tipo: str, arquivo: str):
+        with self._lock:
+            espera = self.latencia + self._aleatorio.uniform(0, self.variacao)
+        if espera > 0:
+            time.sleep(espera)
+
+        caminho = os.path.join(self.diretorio, tipo, arquivo)
+        if not os.path.exists(caminho):
+            logger.warning(f"Sem gravação em {caminho}")
+            return None
+        with open(caminho, 'rb') as f:
+            return pickle.load(f)
+
+    def baixar_barras(self, ticker: str, period: str) -> Optional[pd.DataFrame]:
+        return self._ler('barras', _nome_arquivo(ticker, period))
+
+    def obter_info(self, ticker: str) -> Optional[Dict]:
+        return self._ler('info', _nome_arquivo(ticker))
+
+    def obter_dividendos(self, ticker: str) -> pd.Series:
+        dividendos = self._ler('dividendos', _nome_arquivo(ticker))
+        return dividendos if dividendos is not None else pd.Series(dtype=float)
+
+
+def criar_fonte(nome: str) -> FonteDados:
+    """
+    Cria uma fonte pelo nome usado em ``Config.FONTE_DADOS``.
+
+    Args:
+        nome: 'yfinance', 'gravar', 'reproduzir' ou 'sintetico'
+
+    Returns:
+        Instância da fonte configurada
+    """
+    if nome == 'yfinance':
+        return FonteYFinance()
+    if nome == 'gravar':
+        return FonteGravadora(FonteYFinance(), Config.FONTE_DIRETORIO_GRAVACOES)
+    if nome == 'reproduzir':
+        return FonteReproducao(
+            Config.FONTE_DIRETORIO_GRAVACOES,
+            latencia=Config.FONTE_LATENCIA_REPRODUCAO,
+            variacao=Config.FONTE_VARIACAO_REPRODUCAO
+        )
+    if nome == 'sintetico':
+        from utils.sintetico import FonteSintetica
+        return FonteSintetica(Config.SINTETICO_SEMENTE, Config.SINTETICO_ANOS)
+    raise ValueError(f"Fonte de dados desconhecida: {nome}")
+
+
+_fonte_ativa: Optional[FonteDados] = None
+_lock_fonte = threading.Lock()
+
+
+def obter_fonte() -> FonteDados:
+    """Retorna a fonte ativa, criando-a a partir da configuração no primeiro uso."""
+    global _fonte_ativa
+    with _lock_fonte:
+        if _fonte_ativa is None:
+            _fonte_ativa = criar_fonte(Config.FONTE_DADOS)
+        return _fonte_ativa
+
+
+def definir_fonte(fonte: FonteDados) -> None:
+    """
+    Troca a fonte ativa e limpa os caches de preços e informações.
+
+    Args:
+        fonte: Nova fonte de dados
+    """
+    global _fonte_ativa
+    from utils.cache import cache_global
+
+    with _lock_fonte:
+        _fonte_ativa = fonte
+    for namespace in ('precos', 'info', 'indicadores', 'scores'):
+        cache_global.limpar(namespace)
@@ -1,5 +1,7 @@
 """Funções de formatação e tradução."""
 
+import numpy as np
+import pandas as pd
 from config import Config
 
 
@@ -72,6 +74,163 @@ def formatar_numero_grande(valor):
         return "N/A"
 
 
+def formatar_idade(segundos):
+    """
+    Formata a idade de um dado de forma legível.
+    
+    Args:
+        segundos: Idade em segundos
+        
+    Returns:
+        String formatada (ex: "há 5 min")
+    """
+    try:
+        segundos = float(segundos)
+        if segundos < 60:
+            return "agora"
+        elif segundos < 3600:
+            return f"há {segundos/60:.0f} min"
+        elif segundos < 86400:
+            return f"há {segundos/3600:.1f} h"
+        else:
+            return f"há {segundos/86400:.1f} dias"
+    except (ValueError, TypeError):
+        return "N/A"
+
+
+def formatar_bytes(valor):
+    """
+    Formata um tamanho em bytes de forma legível.
+    
+    Args:
+        valor: Tamanho em bytes
+        
+    Returns:
+        String formatada (ex: "12.3 MB")
+    """
+    try:
+        valor = float(valor)
+        for unidade in ('B', 'KB', 'MB'):
+            if abs(valor) < 1024:
+                return f"{valor:.1f} {unidade}" if unidade != 'B' else f"{valor:.0f} B"
+            valor /= 1024
+        return f"{valor:.2f} GB"
+    except (ValueError, TypeError):
+        return "N/A"
+
+
+# Limites dos sufixos de números grandes, do maior para o menor
+_SUFIXOS_GRANDES = ((1e12, 'T'), (1e9, 'B'), (1e6, 'M'), (1e3, 'K'))
+
+
+def _formatar_coluna(valores, casas_decimais, prefixo='', sufixo='', limites=()):
+    """
+    Formata uma coluna inteira de números.
+    
+    A conversão, a detecção de valores inválidos e a escolha do sufixo de
+    grandeza são feitas em arrays. Os valores são agrupados por combinação
+    de prefixo e sufixo, e cada grupo é formatado com um único formato
+    (``map`` sobre floats nativos, mais rápido que ``Series.apply`` e que as
+    funções de string do NumPy).
+    
+    Args:
+        valores: Series, array ou lista; valores não numéricos viram "N/A"
+        casas_decimais: Número de casas decimais
+        prefixo: Texto antes do número (escalar ou um por valor)
+        sufixo: Texto depois do número e do sufixo de grandeza
+        limites: Pares (limite, sufixo) do maior para o menor
+        
+    Returns:
+        Series de strings (com o índice da entrada, se for uma Series)
+    """
+    serie = valores if isinstance(valores, pd.Series) else pd.Series(valores)
+    numeros = pd.to_numeric(serie, errors='coerce').to_numpy(dtype=float)
+    validos = np.isfinite(numeros)
+    
+    # Grandeza: índice em limites (len(limites) = sem sufixo)
+    divisores = np.ones_like(numeros)
+    grandezas = np.full(len(numeros), len(limites))
+    absolutos = np.abs(numeros)
+    for i, (limite, _) in reversed(list(enumerate(limites))):
+        acima = absolutos >= limite
+        divisores[acima] = limite
+        grandezas[acima] = i
+    sufixos = [s for _, s in limites] + ['']
+    
+    if np.ndim(prefixo) == 0:
+        codigos_prefixo, prefixos = np.zeros(len(numeros), dtype=int), [prefixo]
+    else:
+        codigos_prefixo, prefixos = pd.factorize(np.asarray(prefixo, dtype=object))
+    
+    escalados = numeros / divisores
+    grupos = grandezas * len(prefixos) + codigos_prefixo
+    textos = np.full(len(numeros), "N/A", dtype=object)
+    
+    for grupo in np.unique(grupos[validos]):
+        posicoes = np.flatnonzero((grupos == grupo) & validos)
+        grandeza, codigo = divmod(int(grupo), len(prefixos))
+        formato = f"{prefixos[codigo]}{{:.{casas_decimais}f}}{sufixos[grandeza]}{sufixo}".format
+        textos[posicoes] = list(map(formato, escalados[posicoes].tolist()))
+    
+    return pd.Series(textos, index=serie.index, dtype=object)
+
+
+def formatar_moeda_coluna(valores, moeda='R$'):
+    """
+    Versão vetorizada de ``formatar_moeda`` para colunas.
+    
+    Args:
+        valores: Series, array ou lista de valores
+        moeda: Símbolo da moeda (um para todos ou um por valor)
+        
+    Returns:
+        Series de strings
+    """
+    prefixo = f"{moeda} " if np.ndim(moeda) == 0 else [f"{m} " for m in moeda]
+    return _formatar_coluna(valores, 2, prefixo=prefixo, limites=_SUFIXOS_GRANDES[1:])
+
+
+def formatar_percentual_coluna(valores, casas_decimais=2):
+    """
+    Versão vetorizada de ``formatar_percentual`` para colunas.
+    
+    Args:
+        valores: Series, array ou lista de valores
+        casas_decimais: Número de casas decimais
+        
+    Returns:
+        Series de strings
+    """
+    return _formatar_coluna(valores, casas_decimais, sufixo='%')
+
+
+def formatar_numero_grande_coluna(valores):
+    """
+    Versão vetorizada de ``formatar_numero_grande`` para colunas.
+    
+    Args:
+        valores: Series, array ou lista de valores
+        
+    Returns:
+        Series de strings
+    """
+    return _formatar_coluna(valores, 2, limites=_SUFIXOS_GRANDES)
+
+
+def formatar_decimal_coluna(valores, casas_decimais=2):
+    """
+    Formata uma coluna de números com casas decimais fixas.
+    
+    Args:
+        valores: Series, array ou lista de valores
+        casas_decimais: Número de casas decimais
+        
+    Returns:
+        Series de strings
+    """
+    return _formatar_coluna(valores, casas_decimais)
+
+
 def traduzir_setor(setor_ingles):
     """
     Traduz nome do setor de inglês para português.
@@ -0,0 +1,280 @@
+"""Histórico dos rankings: um snapshot por dia, em Parquet.
+
+Os snapshots são gravados em
+``<diretório>/universo=<u>/periodo=<p>/mes=<AAAA-MM>/ranking.parquet``
+(particionamento no estilo Hive), um arquivo por mês com a coluna 'data':
+um arquivo por dia tornaria a abertura dos arquivos o custo dominante das
+consultas de um ano. Um novo ranking no mesmo dia substitui o anterior.
+As consultas só abrem os meses do intervalo pedido e só leem as colunas
+necessárias, sem recalcular nenhum score.
+"""
+
+import logging
+import os
+import threading
+from datetime import date, timedelta
+from typing import Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from config import Config
+from utils.cache import cache_global, cache_por_argumentos
+
+logger = logging.getLogger(__name__)
+
+# Colunas gravadas; 'classificacao' e 'cor' derivam do score e não são gravadas
+COLUNAS_HISTORICO = (
+    'ranking', 'ativos', 'ticker', 'nome', 'setor', 'preco', 'score_total',
+    'retorno', 'volatilidade', 'sharpe', 'tendencia', 'rsi',
+    'score_retorno', 'score_volatilidade', 'score_sharpe', 'score_tendencia', 'score_momento'
+)
+
+_ARQUIVO = 'ranking.parquet'
+
+# Gravações são leitura-modificação-escrita do arquivo do mês
+_lock_gravacao = threading.Lock()
+
+
+def _diretorio(universo: str, periodo: str) -> str:
+    return os.path.join(Config.HISTORICO_DIRETORIO, f"universo={universo}", f"periodo={periodo}")
+
+
+def _arquivo_mes(universo: str, periodo: str, mes: str) -> str:
+    return os.path.join(_diretorio(universo, periodo), f"mes={mes}", _ARQUIVO)
+
+
+def _meses(universo: str, periodo: str) -> List[str]:
+    """Meses com arquivo gravado ('AAAA-MM'), em ordem crescente."""
+    pasta = _diretorio(universo, periodo)
+    if not os.path.isdir(pasta):
+        return []
+    return sorted(
+        nome.split('=', 1)[1] for nome in os.listdir(pasta)
+        if nome.startswith('mes=') and os.path.exists(os.path.join(pasta, nome, _ARQUIVO))
+    )
+
+
+def registrar_ranking(df: pd.DataFrame, universo: str, periodo: str) -> Optional[str]:
+    """
+    Grava o ranking do dia, se o histórico estiver ativo e os dados forem reais.
+
+    Rankings de fontes sintéticas ou reproduzidas não são gravados, para não
+    misturar dados fictícios ao histórico.
+
+    Args:
+        df: Ranking completo de ``rankear_ativos``
+        universo: Universo do ranking (ex: 'brasil')
+        periodo: Período de análise (ex: '1y')
+
+    Returns:
+        Caminho do arquivo gravado ou None
+    """
+    from utils.fontes import obter_fonte
+
+    if not Config.HISTORICO_ATIVO or obter_fonte().nome not in ('yfinance', 'gravar'):
+        return None
+    try:
+        return gravar_ranking(df, universo, periodo)
+    except Exception as e:
+        logger.error(f"Erro ao gravar o histórico do ranking {universo}/{periodo}: {str(e)}")
+        return None
+
+
+def gravar_ranking(df: pd.DataFrame, universo: str, periodo: str,
+                   data: Optional[date] = None) -> str:
+    """
+    Grava o snapshot de um ranking no arquivo do mês.
+
+    Os números são gravados em float32 (os scores têm duas casas decimais),
+    as posições em int16, comprimidos com zstd.
+
+    Args:
+        df: Ranking com as colunas de COLUNAS_RANKING e 'ranking'
+        universo: Universo do ranking
+        periodo: Período de análise
+        data: Data do snapshot (padrão: hoje)
+
+    Returns:
+        Caminho do arquivo gravado
+    """
+    data = data or date.today()
+    colunas = {
+        'data': pa.array([data] * len(df), pa.date32()),
+        'ranking': pa.array(df['ranking'].to_numpy(dtype=np.int16)),
+        'ativos': pa.array(np.full(len(df), len(df), dtype=np.int16))
+    }
+    for coluna in COLUNAS_HISTORICO[2:]:
+        if coluna in ('ticker', 'nome', 'setor', 'tendencia'):
+            colunas[coluna] = pa.array(df[coluna].astype(str).to_numpy(dtype=object), pa.string())
+        else:
+            colunas[coluna] = pa.array(df[coluna].to_numpy(dtype=np.float32))
+    snapshot = pa.table(colunas)
+
+    caminho = _arquivo_mes(universo, periodo, data.strftime('%Y-%m'))
+    with _lock_gravacao:
+        if os.path.exists(caminho):
+            existente = pq.read_table(caminho)
+            existente = existente.filter(pc.not_equal(existente['data'], pa.scalar(data, pa.date32())))
+            tabela = pa.concat_tables([existente, snapshot.cast(existente.schema)])
+        else:
+            os.makedirs(os.path.dirname(caminho), exist_ok=True)
+            tabela = snapshot
+        tabela = tabela.sort_by([('data', 'ascending'), ('ranking', 'ascending')])
+
+        temporario = f"{caminho}.{threading.get_ident()}.tmp"
+        pq.write_table(tabela, temporario, compression='zstd')
+        os.replace(temporario, caminho)
+
+    cache_global.limpar('historico')
+    return caminho
+
+
+def universos_historico() -> List[str]:
+    """Universos com algum snapshot gravado."""
+    if not os.path.isdir(Config.HISTORICO_DIRETORIO):
+        return []
+    return sorted(
+        nome.split('=', 1)[1] for nome in os.listdir(Config.HISTORICO_DIRETORIO)
+        if nome.startswith('universo=')
+    )
+
+
+def datas_ranking(universo: str, periodo: str) -> List[date]:
+    """
+    Datas com snapshot, em ordem crescente (lê apenas a coluna 'data').
+
+    Args:
+        universo: Universo do ranking
+        periodo: Período de análise
+
+    Returns:
+        Lista de datas
+    """
+    arquivos = [_arquivo_mes(universo, periodo, mes) for mes in _meses(universo, periodo)]
+    if not arquivos:
+        return []
+    datas = ds.dataset(arquivos, format='parquet').to_table(columns=['data'])['data']
+    return sorted(pc.unique(datas).to_pylist())
+
+
+def carregar_historico(universo: str, periodo: str,
+                       inicio: Optional[date] = None, fim: Optional[date] = None,
+                       tickers: Optional[Iterable[str]] = None,
+                       colunas: Optional[Sequence[str]] = None,
+                       datas: Optional[Iterable[date]] = None) -> pd.DataFrame:
+    """
+    Lê os snapshots de um intervalo de datas.
+
+    Args:
+        universo: Universo do ranking
+        periodo: Período de análise
+        inicio: Primeira data (inclusive)
+        fim: Última data (inclusive)
+        tickers: Apenas estes ativos (filtro aplicado na leitura)
+        colunas: Colunas de COLUNAS_HISTORICO a ler (padrão: todas)
+        datas: Apenas estas datas (em vez de ``inicio``/``fim``)
+
+    Returns:
+        DataFrame com a coluna 'data' e as colunas pedidas, ordenado por data e ranking
+    """
+    colunas = ['data'] + [c for c in (colunas or COLUNAS_HISTORICO) if c != 'data']
+    filtros = []
+    if datas is not None:
+        datas = sorted(set(datas))
+        meses = {d.strftime('%Y-%m') for d in datas}
+        filtros.append(ds.field('data').isin(pa.array(datas, pa.date32())))
+    else:
+        meses = None
+        if inicio is not None:
+            filtros.append(ds.field('data') >= pa.scalar(inicio, pa.date32()))
+        if fim is not None:
+            filtros.append(ds.field('data') <= pa.scalar(fim, pa.date32()))
+    if tickers is not None:
+        filtros.append(ds.field('ticker').isin(list(tickers)))
+
+    # Só os meses do intervalo são abertos
+    arquivos = [
+        _arquivo_mes(universo, periodo, mes) for mes in _meses(universo, periodo)
+        if (meses is None or mes in meses)
+        and (inicio is None or mes >= inicio.strftime('%Y-%m'))
+        and (fim is None or mes <= fim.strftime('%Y-%m'))
+    ]
+    if not arquivos:
+        return pd.DataFrame(columns=colunas)
+
+    filtro = None
+    for condicao in filtros:
+        filtro = condicao if filtro is None else filtro & condicao
+    tabela = ds.dataset(arquivos, format='parquet').to_table(columns=colunas, filter=filtro)
+
+    df = tabela.to_pandas(date_as_object=False)
+    df['data'] = pd.to_datetime(df['data'])
+    return df
+
+
+@cache_por_argumentos('historico', ttl=3600)
+def historico_ativo(ticker: str, universo: str, periodo: str, dias: int = 365) -> pd.DataFrame:
+    """
+    Posição e scores de um ativo nos snapshots dos últimos ``dias`` dias.
+
+    Args:
+        ticker: Símbolo do ativo
+        universo: Universo do ranking
+        periodo: Período de análise
+        dias: Dias de histórico, contados a partir de hoje
+
+    Returns:
+        DataFrame indexado pela data (ranking, ativos, score_total e scores parciais)
+    """
+    colunas = ['ranking', 'ativos', 'score_total', 'score_retorno', 'score_volatilidade',
+               'score_sharpe', 'score_tendencia', 'score_momento']
+    df = carregar_historico(universo, periodo, inicio=date.today() - timedelta(days=dias),
+                            tickers=[ticker], colunas=colunas)
+    return df.set_index('data')
+
+
+@cache_por_argumentos('historico', ttl=3600)
+def maiores_variacoes(universo: str, periodo: str, dias: int = 7) -> pd.DataFrame:
+    """
+    Variação de posição entre o último snapshot e o de ``dias`` dias antes.
+
+    A referência é o último snapshot até ``dias`` dias antes do mais recente
+    (ou o mais antigo, se o histórico for mais curto). Ativos que entraram ou
+    saíram do ranking no intervalo não aparecem.
+
+    Args:
+        universo: Universo do ranking
+        periodo: Período de análise
+        dias: Intervalo em dias
+
+    Returns:
+        DataFrame com ticker, nome, setor, posições, scores e 'variacao'
+        (positiva = subiu), da maior subida para a maior queda; as datas
+        comparadas ficam em ``attrs['datas']``. Vazio com menos de dois snapshots.
+    """
+    datas = datas_ranking(universo, periodo)
+    if len(datas) < 2:
+        return pd.DataFrame(columns=['ticker', 'nome', 'setor', 'ranking_anterior', 'ranking',
+                                     'variacao', 'score_anterior', 'score_total'])
+
+    atual = datas[-1]
+    anteriores = [d for d in datas[:-1] if d <= atual - timedelta(days=dias)]
+    anterior = anteriores[-1] if anteriores else datas[0]
+
+    df = carregar_historico(universo, periodo, datas=[anterior, atual],
+                            colunas=['ticker', 'nome', 'setor', 'ranking', 'score_total'])
+    recente = df[df['data'] == pd.Timestamp(atual)].drop(columns='data')
+    antigo = df[df['data'] == pd.Timestamp(anterior)][['ticker', 'ranking', 'score_total']]
+    variacoes = recente.merge(antigo, on='ticker', suffixes=('', '_anterior'))
+    variacoes['variacao'] = variacoes['ranking_anterior'] - variacoes['ranking']
+    variacoes = variacoes.rename(columns={'score_total_anterior': 'score_anterior'})[
+        ['ticker', 'nome', 'setor', 'ranking_anterior', 'ranking', 'variacao', 'score_anterior', 'score_total']
+    ]
+    variacoes = variacoes.sort_values(['variacao', 'ranking'], ascending=[False, True],
+                                      kind='stable').reset_index(drop=True)
+    variacoes.attrs['datas'] = (anterior, atual)
+    return variacoes
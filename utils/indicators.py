@@ -4,13 +4,19 @@ import pandas as pd
 import numpy as np
 import streamlit as st
 from typing import Dict, Optional
+from utils.cache import cache_por_dados
+from utils.perf import medido, ticker_dos_dados
 
 
-@st.cache_data(ttl=3600, show_spinner=False)
+@cache_por_dados('indicadores', ttl=3600)
+@medido('indicadores', ticker=ticker_dos_dados)
 def calculate_all_indicators(data: pd.DataFrame) -> Dict[str, pd.Series]:
     """
     Calcula todos os indicadores técnicos.
     
+    O cache é indexado pela chave do DataFrame (ver ``utils.cache.chave_dados``),
+    sem hashear o conteúdo.
+    
     Args:
         data: DataFrame com dados OHLCV
         
@@ -57,6 +63,33 @@ def calculate_all_indicators(data: pd.DataFrame) -> Dict[str, pd.Series]:
     return indicators
 
 
+def get_indicator_bundle(ticker: str, period: str = '1y') -> Optional[Dict]:
+    """
+    Obtém dados e indicadores de um ativo, calculados uma única vez por (ticker, período).
+    
+    Os dados vêm do cache de preços e os indicadores do cache por chave dos
+    dados, então reruns da página reaproveitam ambos sem recalcular.
+    
+    Args:
+        ticker: Símbolo da ação
+        period: Período dos dados
+        
+    Returns:
+        Dicionário com 'dados' (OHLCV) e 'indicadores' ou None se não houver dados
+    """
+    from utils.data_fetcher import fetch_stock_data
+    
+    dados = fetch_stock_data(ticker, period)
+    
+    if dados is None or dados.empty:
+        return None
+    
+    return {
+        'dados': dados,
+        'indicadores': calculate_all_indicators(dados)
+    }
+
+
 def calculate_rsi(data: pd.DataFrame, length: int = 14) -> Optional[pd.Series]:
     """
     Calcula o RSI (Relative Strength Index).
@@ -0,0 +1,182 @@
+"""Limitação adaptativa de requisições à fonte de dados.
+
+Combina um balde de tokens (requisições por segundo) com um limite de
+concorrência AIMD: cada sucesso aumenta os limites aditivamente e cada
+resposta de limitação (HTTP 429) ou erro os reduz multiplicativamente.
+Todas as buscas da fonte passam pelo mesmo ``limitador_fonte``.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict
+
+from config import Config
+from utils.resiliencia import ErroLimiteRequisicoes
+
+
+class BaldeTokens:
+    """Balde de tokens thread-safe com taxa ajustável."""
+
+    def __init__(self, taxa: float, capacidade: float):
+        self.taxa = taxa
+        self.capacidade = capacidade
+        self._tokens = capacidade
+        self._atualizado_em = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reabastecer(self) -> None:
+        agora = time.monotonic()
+        self._tokens = min(self.capacidade, self._tokens + (agora - self._atualizado_em) * self.taxa)
+        self._atualizado_em = agora
+
+    def adquirir(self) -> None:
+        """Aguarda até haver um token disponível e o consome."""
+        while True:
+            with self._lock:
+                self._reabastecer()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                espera = (1 - self._tokens) / self.taxa
+            time.sleep(espera)
+
+    def vazio(self) -> bool:
+        """Indica se não há token disponível agora."""
+        with self._lock:
+            self._reabastecer()
+            return self._tokens < 1
+
+    def ajustar_taxa(self, taxa: float) -> None:
+        """Altera a taxa de reposição (tokens por segundo)."""
+        with self._lock:
+            self._reabastecer()
+            self.taxa = taxa
+
+
+class ConcorrenciaAdaptativa:
+    """Semáforo cujo limite cresce aditivamente e cai multiplicativamente (AIMD)."""
+
+    def __init__(self, inicial: float, minimo: float, maximo: float):
+        self.limite = float(inicial)
+        self.minimo = float(minimo)
+        self.maximo = float(maximo)
+        self._em_uso = 0
+        self._condicao = threading.Condition()
+
+    def adquirir(self) -> None:
+        """Aguarda uma vaga dentro do limite atual."""
+        with self._condicao:
+            while self._em_uso >= max(1, int(self.limite)):
+                self._condicao.wait()
+            self._em_uso += 1
+
+    def cheia(self) -> bool:
+        """Indica se todas as vagas do limite atual estão ocupadas."""
+        with self._condicao:
+            return self._em_uso >= max(1, int(self.limite))
+
+    def liberar(self) -> None:
+        """Libera a vaga ocupada."""
+        with self._condicao:
+            self._em_uso -= 1
+            self._condicao.notify()
+
+    def aumentar(self) -> None:
+        """Aumento aditivo: +1 vaga a cada ``limite`` sucessos."""
+        with self._condicao:
+            self.limite = min(self.maximo, self.limite + 1 / self.limite)
+            self._condicao.notify_all()
+
+    def reduzir(self, fator: float) -> None:
+        """Redução multiplicativa do limite."""
+        with self._condicao:
+            self.limite = max(self.minimo, self.limite * fator)
+
+
+class LimitadorFonte:
+    """Aplica balde de tokens e concorrência adaptativa às chamadas da fonte."""
+
+    def __init__(self):
+        self.balde = BaldeTokens(Config.LIMITADOR_TAXA_INICIAL, Config.LIMITADOR_RAJADA)
+        self.concorrencia = ConcorrenciaAdaptativa(
+            Config.LIMITADOR_CONCORRENCIA_INICIAL,
+            Config.LIMITADOR_CONCORRENCIA_MIN,
+            Config.LIMITADOR_CONCORRENCIA_MAX
+        )
+        self._ultima_reducao = 0.0
+        self._lock = threading.Lock()
+        self.chamadas = 0
+        self.limitadas = 0
+        self.erros = 0
+
+    def _sucesso(self) -> None:
+        self.concorrencia.aumentar()
+        with self._lock:
+            self.chamadas += 1
+            taxa = min(Config.LIMITADOR_TAXA_MAX, self.balde.taxa + Config.LIMITADOR_INCREMENTO_TAXA)
+        self.balde.ajustar_taxa(taxa)
+
+    def _reduzir(self, fator: float) -> None:
+        # Uma rajada de erros simultâneos conta como um único sinal de sobrecarga
+        with self._lock:
+            agora = time.monotonic()
+            if agora - self._ultima_reducao < Config.LIMITADOR_INTERVALO_REDUCAO:
+                return
+            self._ultima_reducao = agora
+            taxa = max(Config.LIMITADOR_TAXA_MIN, self.balde.taxa * fator)
+        self.balde.ajustar_taxa(taxa)
+        self.concorrencia.reduzir(fator)
+
+    def executar(self, func: Callable[[], Any]) -> Any:
+        """
+        Executa uma chamada à fonte respeitando os limites atuais.
+
+        Args:
+            func: Função sem argumentos que acessa a fonte
+
+        Returns:
+            Resultado de ``func`` (exceções são propagadas)
+        """
+        self.concorrencia.adquirir()
+        try:
+            self.balde.adquirir()
+            resultado = func()
+        except ErroLimiteRequisicoes:
+            with self._lock:
+                self.limitadas += 1
+            self._reduzir(Config.LIMITADOR_FATOR_LIMITADO)
+            raise
+        except Exception:
+            with self._lock:
+                self.erros += 1
+            self._reduzir(Config.LIMITADOR_FATOR_ERRO)
+            raise
+        finally:
+            self.concorrencia.liberar()
+
+        self._sucesso()
+        return resultado
+
+    def saturado(self) -> bool:
+        """Indica se uma nova chamada esperaria na fila (sem vaga ou sem token)."""
+        return self.concorrencia.cheia() or self.balde.vazio()
+
+    def estatisticas(self) -> Dict[str, float]:
+        """Retorna limites atuais e contadores de chamadas."""
+        with self._lock:
+            return {
+                'taxa': self.balde.taxa,
+                'concorrencia': self.concorrencia.limite,
+                'chamadas': self.chamadas,
+                'limitadas': self.limitadas,
+                'erros': self.erros
+            }
+
+
+def erro_de_limite(mensagem: str) -> bool:
+    """Indica se a mensagem de erro corresponde a limitação de requisições."""
+    mensagem = mensagem.lower()
+    return any(m in mensagem for m in ('429', 'too many requests', 'rate limit'))
+
+
+limitador_fonte = LimitadorFonte()
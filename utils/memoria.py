@@ -0,0 +1,165 @@
+"""Contabilidade de memória: cache, estado das sessões e alocações por renderização.
+
+O cache é compartilhado entre sessões; o estado de sessão (``st.session_state``)
+é por usuário e, sem limite, cresce com rankings, dados de comparação e
+figuras guardados. Este módulo não depende do Streamlit: as funções recebem
+o estado como um mapeamento.
+"""
+
+import logging
+import tracemalloc
+from typing import Dict, Iterable, List, Mapping, MutableMapping, Optional
+
+import pandas as pd
+from config import Config
+from utils.cache import cache_global, estimar_bytes
+
+logger = logging.getLogger(__name__)
+
+
+def bytes_cache() -> pd.DataFrame:
+    """
+    Memória ocupada pelo cache global por namespace.
+
+    Returns:
+        DataFrame com namespace, entradas, bytes e cota
+    """
+    linhas = [
+        {'namespace': ns, 'entradas': stats['entradas'], 'bytes': stats['bytes'], 'cota': stats['cota']}
+        for ns, stats in cache_global.estatisticas().items()
+    ]
+    return pd.DataFrame(linhas, columns=['namespace', 'entradas', 'bytes', 'cota'])
+
+
+def _bytes_exclusivos(valor, compartilhados: set) -> int:
+    """Bytes de um valor, sem contar objetos que também estão no cache."""
+    if id(valor) in compartilhados:
+        return 0
+    if isinstance(valor, dict):
+        return sum(_bytes_exclusivos(v, compartilhados) for v in valor.values())
+    if isinstance(valor, (list, tuple)):
+        return sum(_bytes_exclusivos(v, compartilhados) for v in valor)
+    return estimar_bytes(valor)
+
+
+def bytes_sessao(estado: Mapping) -> pd.DataFrame:
+    """
+    Memória ocupada por chave do estado de sessão.
+
+    Objetos que são os mesmos do cache (ex: DataFrames de preços guardados
+    em ``dados_comparacao``) não ocupam memória extra e aparecem em
+    ``bytes_exclusivos`` como zero.
+
+    Args:
+        estado: Estado da sessão (ex: ``st.session_state``)
+
+    Returns:
+        DataFrame com chave, tipo, bytes e bytes exclusivos, do maior para o menor
+    """
+    compartilhados = cache_global.ids_valores()
+    linhas = []
+    for chave in list(estado.keys()):
+        valor = estado[chave]
+        linhas.append({
+            'chave': chave,
+            'tipo': type(valor).__name__,
+            'bytes': estimar_bytes(valor),
+            'bytes_exclusivos': _bytes_exclusivos(valor, compartilhados)
+        })
+    tabela = pd.DataFrame(linhas, columns=['chave', 'tipo', 'bytes', 'bytes_exclusivos'])
+    return tabela.sort_values('bytes_exclusivos', ascending=False).reset_index(drop=True)
+
+
+def aplicar_orcamento_sessao(estado: MutableMapping, pagina_atual: Optional[str] = None,
+                             orcamento: Optional[int] = None) -> List[str]:
+    """
+    Descarta estado de sessão recalculável até caber no orçamento.
+
+    O estado é descartado em grupos por página (``Config.SESSAO_ESTADO_PAGINAS``),
+    do maior para o menor. O grupo da página atual nunca é descartado, para
+    não forçar um novo cálculo a cada renderização.
+
+    Args:
+        estado: Estado da sessão
+        pagina_atual: Página em exibição
+        orcamento: Limite em bytes (padrão: Config.SESSAO_ORCAMENTO_BYTES)
+
+    Returns:
+        Chaves removidas
+    """
+    orcamento = orcamento or Config.SESSAO_ORCAMENTO_BYTES
+    tamanhos = bytes_sessao(estado).set_index('chave')['bytes_exclusivos']
+    total = int(tamanhos.sum())
+    if total <= orcamento:
+        return []
+
+    grupos = [
+        (int(sum(tamanhos.get(chave, 0) for chave in chaves)), pagina, chaves)
+        for pagina, chaves in Config.SESSAO_ESTADO_PAGINAS.items()
+        if pagina != pagina_atual and any(chave in estado for chave in chaves)
+    ]
+
+    removidas = []
+    for tamanho, pagina, chaves in sorted(grupos, key=lambda g: g[0], reverse=True):
+        if total <= orcamento:
+            break
+        for chave in chaves:
+            if chave in estado:
+                del estado[chave]
+                removidas.append(chave)
+        total -= tamanho
+
+    if total > orcamento:
+        logger.warning(f"Estado da sessão ({total / 2 ** 20:.1f} MB) acima do orçamento "
+                       f"mesmo após descartar {removidas}")
+    return removidas
+
+
+class RastreadorAlocacoes:
+    """
+    Maiores alocações feitas durante uma renderização (``tracemalloc``).
+
+    O ``tracemalloc`` fica ligado a partir do primeiro uso, o que deixa o
+    processo mais lento: use apenas para diagnóstico. Com várias sessões
+    simultâneas, alocações de outras sessões entram na diferença.
+
+    Args:
+        quadros: Profundidade da pilha guardada por alocação
+    """
+
+    def __init__(self, quadros: int = 1):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(quadros)
+        self._inicial = tracemalloc.take_snapshot()
+        self._final = None
+
+    def finalizar(self) -> None:
+        """Tira o snapshot final da renderização."""
+        self._final = tracemalloc.take_snapshot()
+
+    def maiores(self, n: int = 15, ignorar: Iterable[str] = ('tracemalloc',)) -> pd.DataFrame:
+        """
+        Linhas de código com maior crescimento de memória na renderização.
+
+        Args:
+            n: Quantidade de linhas
+            ignorar: Trechos de caminho de arquivo a ignorar
+
+        Returns:
+            DataFrame com local, diferença e total em bytes e número de blocos
+        """
+        final = self._final or tracemalloc.take_snapshot()
+        filtros = [tracemalloc.Filter(False, f"*{trecho}*") for trecho in ignorar]
+        diferencas = final.filter_traces(filtros).compare_to(
+            self._inicial.filter_traces(filtros), 'lineno'
+        )
+        linhas: List[Dict] = [
+            {
+                'local': f"{d.traceback[0].filename}:{d.traceback[0].lineno}",
+                'diferenca_bytes': d.size_diff,
+                'total_bytes': d.size,
+                'blocos': d.count
+            }
+            for d in diferencas[:n]
+        ]
+        return pd.DataFrame(linhas, columns=['local', 'diferenca_bytes', 'total_bytes', 'blocos'])
@@ -0,0 +1,114 @@
+"""Calendário de pregões para expiração do cache de preços."""
+
+from datetime import datetime, time, timedelta, timezone
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from config import Config
+
+
+def bolsa_do_ticker(ticker: str) -> str:
+    """
+    Identifica a bolsa em que o ativo é negociado.
+
+    Args:
+        ticker: Símbolo da ação
+
+    Returns:
+        'B3' para tickers .SA, 'NYSE' (NYSE/Nasdaq) para os demais
+    """
+    return 'B3' if ticker.upper().endswith('.SA') else 'NYSE'
+
+
+def _sessao(bolsa: str):
+    fuso, abertura, fechamento = Config.PREGOES[bolsa]
+    return ZoneInfo(fuso), time.fromisoformat(abertura), time.fromisoformat(fechamento)
+
+
+def _agora_local(bolsa: str, agora: Optional[datetime]) -> datetime:
+    fuso, _, _ = _sessao(bolsa)
+    agora = agora or datetime.now(timezone.utc)
+    return agora.astimezone(fuso)
+
+
+def pregao_aberto(bolsa: str, agora: Optional[datetime] = None) -> bool:
+    """
+    Indica se o pregão está aberto (dias úteis, sem considerar feriados).
+
+    Args:
+        bolsa: 'B3' ou 'NYSE'
+        agora: Instante de referência com fuso (padrão: agora)
+
+    Returns:
+        True se o instante estiver dentro do horário de negociação
+    """
+    _, abertura, fechamento = _sessao(bolsa)
+    local = _agora_local(bolsa, agora)
+    return local.weekday() < 5 and abertura <= local.time() < fechamento
+
+
+def proxima_abertura(bolsa: str, agora: Optional[datetime] = None) -> datetime:
+    """
+    Calcula o próximo início de pregão após o instante informado.
+
+    Args:
+        bolsa: 'B3' ou 'NYSE'
+        agora: Instante de referência com fuso (padrão: agora)
+
+    Returns:
+        Data/hora (no fuso da bolsa) da próxima abertura
+    """
+    fuso, abertura, _ = _sessao(bolsa)
+    local = _agora_local(bolsa, agora)
+
+    dia = local.date()
+    if local.time() >= abertura:
+        dia += timedelta(days=1)
+    while dia.weekday() >= 5:
+        dia += timedelta(days=1)
+
+    return datetime.combine(dia, abertura, tzinfo=fuso)
+
+
+def ttl_precos(ticker: str, agora: Optional[datetime] = None) -> float:
+    """
+    Calcula por quanto tempo os preços diários de um ativo podem ficar em cache.
+
+    Com o pregão aberto (ou logo após o fechamento, enquanto a barra final
+    se estabiliza) a última barra muda, então o TTL é curto. Fora disso nada
+    muda até a próxima abertura, e o cache vale até lá.
+
+    Args:
+        ticker: Símbolo da ação
+        agora: Instante de referência com fuso (padrão: agora)
+
+    Returns:
+        TTL em segundos
+    """
+    bolsa = bolsa_do_ticker(ticker)
+    _, abertura, fechamento = _sessao(bolsa)
+    local = _agora_local(bolsa, agora)
+
+    fim_instavel = datetime.combine(local.date(), fechamento, tzinfo=local.tzinfo) + \
+        timedelta(seconds=Config.CACHE_ATRASO_FECHAMENTO)
+    inicio = datetime.combine(local.date(), abertura, tzinfo=local.tzinfo)
+
+    if local.weekday() < 5 and inicio <= local < fim_instavel:
+        return Config.CACHE_TTL_PREGAO
+
+    restante = (proxima_abertura(bolsa, local) - local).total_seconds()
+    return max(restante, Config.CACHE_TTL_PREGAO)
+
+
+def ttl_info(ticker: str, agora: Optional[datetime] = None) -> float:
+    """
+    Calcula o TTL das informações cadastrais/fundamentalistas de um ativo.
+
+    Args:
+        ticker: Símbolo da ação
+        agora: Instante de referência com fuso (padrão: agora)
+
+    Returns:
+        TTL em segundos (nunca menor que Config.CACHE_TTL_INFO)
+    """
+    return max(ttl_precos(ticker, agora), Config.CACHE_TTL_INFO)
@@ -0,0 +1,311 @@
+"""Busca em grade dos pesos do score (``python -m utils.otimizacao --help``).
+
+Os scores parciais de todas as datas de rebalanceamento são calculados uma
+vez (``utils.backtest.componentes_score``); avaliar um vetor de pesos é
+então um produto do tensor de componentes pelos pesos, seguido da seleção
+dos ``top`` melhores em cada data e do retorno até o rebalanceamento
+seguinte. Os vetores são avaliados em lotes, distribuídos entre processos.
+
+Os pesos são escolhidos pelo Sharpe no período de treino (as primeiras
+datas); o período de validação (as últimas) só é usado para reportar o
+desempenho fora da amostra. O progresso é gravado em um arquivo de estado
+e uma execução interrompida pode ser retomada com ``--retomar``.
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+import numpy as np
+from config import Config
+from utils.backtest import (
+    COMPONENTES, componentes_score, datas_rebalanceamento, montar_painel, retornos_futuros
+)
+
+logger = logging.getLogger(__name__)
+
+# Colunas do resultado de cada vetor de pesos
+METRICAS = ('sharpe_treino', 'retorno_treino', 'sharpe_validacao', 'retorno_validacao')
+
+# Rebalanceamentos por ano para anualizar as métricas
+_PERIODOS_ANO = {'W': 52, 'M': 12, 'Q': 4}
+
+
+def grade_pesos(passo: float = 0.05, componentes: int = len(COMPONENTES)) -> np.ndarray:
+    """
+    Todos os vetores de pesos não negativos, múltiplos de ``passo``, com soma 1.
+
+    Args:
+        passo: Incremento dos pesos (0.05 gera 10.626 vetores para 5 componentes)
+        componentes: Número de componentes
+
+    Returns:
+        Array (vetores × componentes)
+    """
+    unidades = int(round(1 / passo))
+    # Composições de 'unidades' em 'componentes' partes (estrelas e barras)
+    vetores = [
+        np.diff(np.r_[-1, barras, unidades + componentes - 1]) - 1
+        for barras in itertools.combinations(range(unidades + componentes - 1), componentes - 1)
+    ]
+    return np.array(vetores, dtype=float) / unidades
+
+
+def avaliar_pesos(pesos: np.ndarray, componentes: np.ndarray, elegivel: np.ndarray,
+                  futuros: np.ndarray, top: int, corte: int, periodos_ano: int,
+                  taxa_livre: float = 0.10) -> np.ndarray:
+    """
+    Avalia um lote de vetores de pesos.
+
+    Para cada vetor, a carteira de cada data são os ``top`` ativos elegíveis
+    de maior score, em pesos iguais, e o retorno do período é a média dos
+    retornos futuros deles (sem custos).
+
+    Args:
+        pesos: Array (vetores × componentes)
+        componentes: Tensor (componentes × datas × ativos)
+        elegivel: Máscara (datas × ativos)
+        futuros: Retornos até o rebalanceamento seguinte (datas × ativos)
+        top: Ativos por carteira
+        corte: Primeira data do período de validação
+        periodos_ano: Rebalanceamentos por ano
+        taxa_livre: Taxa livre de risco anual
+
+    Returns:
+        Array (vetores × METRICAS)
+    """
+    scores = np.tensordot(pesos, componentes, axes=1)                 # vetores × datas × ativos
+    scores[:, ~elegivel] = -np.inf
+    k = min(top, scores.shape[2])
+    escolhidos = np.argpartition(-scores, k - 1, axis=2)[..., :k]
+
+    validos = np.take_along_axis(np.broadcast_to(elegivel, scores.shape), escolhidos, axis=2)
+    retornos = np.take_along_axis(np.broadcast_to(futuros, scores.shape), escolhidos, axis=2)
+    quantidade = validos.sum(axis=2)
+    periodos = np.where(validos, retornos, 0.0).sum(axis=2) / np.maximum(quantidade, 1)
+
+    excesso = periodos - ((1 + taxa_livre) ** (1 / periodos_ano) - 1)
+    resultado = np.empty((len(pesos), len(METRICAS)))
+    for i, trecho in enumerate((slice(None, corte), slice(corte, None))):
+        media = excesso[:, trecho].mean(axis=1)
+        desvio = excesso[:, trecho].std(axis=1, ddof=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            resultado[:, 2 * i] = np.where(desvio > 0, media / desvio * np.sqrt(periodos_ano), 0.0)
+        resultado[:, 2 * i + 1] = ((1 + periodos[:, trecho]).prod(axis=1) **
+                                   (periodos_ano / periodos[:, trecho].shape[1]) - 1) * 100
+    return resultado
+
+
+def corte_validacao(datas: int, fracao_validacao: float) -> int:
+    """Primeira data da validação, com ao menos dois períodos em cada trecho."""
+    return min(max(int(round(datas * (1 - fracao_validacao))), 2), datas - 2)
+
+
+# Dados compartilhados pelos processos (enviados uma vez, no initializer)
+_dados_processo: Dict = {}
+
+
+def _iniciar_processo(componentes, elegivel, futuros, top, corte, periodos_ano):
+    _dados_processo.update(componentes=componentes, elegivel=elegivel, futuros=futuros,
+                           top=top, corte=corte, periodos_ano=periodos_ano)
+
+
+def _avaliar_lote(lote: int, pesos: np.ndarray):
+    return lote, avaliar_pesos(pesos, **_dados_processo)
+
+
+class EstadoBusca:
+    """
+    Progresso da busca gravado em disco (JSON), para retomar execuções.
+
+    Args:
+        caminho: Arquivo de estado
+        parametros: Parâmetros da busca; um estado gravado com outros
+            parâmetros (ou outros dados) não é reaproveitado
+    """
+
+    def __init__(self, caminho: str, parametros: Dict):
+        self.caminho = caminho
+        self.parametros = parametros
+        self.resultados: Dict[int, List[List[float]]] = {}
+        self._gravado_em = 0.0
+
+    def carregar(self) -> bool:
+        """Carrega os lotes já avaliados; retorna False se o estado não servir."""
+        if not os.path.exists(self.caminho):
+            return False
+        with open(self.caminho, encoding='utf-8') as f:
+            estado = json.load(f)
+        if estado.get('parametros') != self.parametros:
+            logger.warning(f"Estado em {self.caminho} é de outra busca; recomeçando")
+            return False
+        self.resultados = {int(lote): valores for lote, valores in estado['resultados'].items()}
+        return True
+
+    def registrar(self, lote: int, valores: np.ndarray) -> None:
+        self.resultados[lote] = valores.tolist()
+
+    def gravar(self, intervalo: float = 0.0) -> None:
+        """Grava o estado (no máximo a cada ``intervalo`` segundos)."""
+        if time.monotonic() - self._gravado_em < intervalo:
+            return
+        temporario = f"{self.caminho}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump({'parametros': self.parametros, 'resultados': self.resultados}, f)
+        os.replace(temporario, self.caminho)
+        self._gravado_em = time.monotonic()
+
+
+def otimizar_pesos(componentes: np.ndarray, elegivel: np.ndarray, futuros: np.ndarray,
+                   grade: np.ndarray, top: int = 10, fracao_validacao: float = 0.3,
+                   periodos_ano: int = 12, processos: Optional[int] = None,
+                   tamanho_lote: int = 64, estado: Optional[EstadoBusca] = None,
+                   progresso_callback=None) -> np.ndarray:
+    """
+    Avalia todos os vetores da grade, em paralelo.
+
+    Args:
+        componentes: Tensor (componentes × datas × ativos)
+        elegivel: Máscara (datas × ativos)
+        futuros: Retornos futuros (datas × ativos)
+        grade: Vetores de pesos (``grade_pesos``)
+        top: Ativos por carteira
+        fracao_validacao: Fração final das datas reservada para validação
+        periodos_ano: Rebalanceamentos por ano
+        processos: Processos (padrão: número de CPUs; 1 = no próprio processo)
+        tamanho_lote: Vetores por tarefa
+        estado: Estado para gravar o progresso e pular lotes já avaliados
+        progresso_callback: Função (lotes concluídos, total de lotes)
+
+    Returns:
+        Array (vetores × METRICAS), na ordem da grade
+    """
+    corte = corte_validacao(componentes.shape[1], fracao_validacao)
+    futuros = np.nan_to_num(futuros)
+    lotes = [grade[i:i + tamanho_lote] for i in range(0, len(grade), tamanho_lote)]
+    feitos = estado.resultados if estado is not None else {}
+    pendentes = [i for i in range(len(lotes)) if i not in feitos]
+    resultados = {i: np.asarray(feitos[i]) for i in range(len(lotes)) if i in feitos}
+    argumentos = (componentes, elegivel, futuros, top, corte, periodos_ano)
+
+    def concluir(lote, valores):
+        resultados[lote] = valores
+        if estado is not None:
+            estado.registrar(lote, valores)
+            estado.gravar(intervalo=2.0)
+        if progresso_callback:
+            progresso_callback(len(resultados), len(lotes))
+
+    if processos == 1:
+        _iniciar_processo(*argumentos)
+        for i in pendentes:
+            concluir(*_avaliar_lote(i, lotes[i]))
+    else:
+        with ProcessPoolExecutor(max_workers=processos, initializer=_iniciar_processo,
+                                 initargs=argumentos) as executor:
+            futuros_lotes = [executor.submit(_avaliar_lote, i, lotes[i]) for i in pendentes]
+            for concluido in as_completed(futuros_lotes):
+                concluir(*concluido.result())
+
+    if estado is not None:
+        estado.gravar()
+    return np.concatenate([resultados[i] for i in range(len(lotes))])
+
+
+def _formatar_pesos(vetor) -> str:
+    return ' '.join(f"{nome[:4]}={peso:.2f}" for nome, peso in zip(COMPONENTES, vetor))
+
+
+def main(argv=None) -> int:
+    from utils.busca_async import buscar_varios
+    from utils.fontes import definir_fonte
+    from utils.sintetico import FonteSintetica, universo_sintetico
+
+    parser = argparse.ArgumentParser(prog='python -m utils.otimizacao', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--universo', default='brasil',
+                        help="brasil, internacional, global ou sintetico:N (padrão: brasil)")
+    parser.add_argument('--historico', default=Config.BACKTEST_PERIODO)
+    parser.add_argument('--passo', type=float, default=0.05, help='Incremento dos pesos (padrão: 0.05)')
+    parser.add_argument('--top', type=int, default=Config.BACKTEST_TOP)
+    parser.add_argument('--janela', type=int, default=Config.BACKTEST_JANELA)
+    parser.add_argument('--frequencia', default=Config.BACKTEST_FREQUENCIA, choices=sorted(_PERIODOS_ANO))
+    parser.add_argument('--validacao', type=float, default=0.3,
+                        help='Fração final das datas usada só para validação (padrão: 0.3)')
+    parser.add_argument('--processos', type=int, default=None)
+    parser.add_argument('--semente', type=int, default=Config.SINTETICO_SEMENTE,
+                        help='Semente do universo sintético')
+    parser.add_argument('--estado', default='otimizacao_pesos.json', help='Arquivo de estado')
+    parser.add_argument('--retomar', action='store_true', help='Continuar a partir do arquivo de estado')
+    parser.add_argument('--melhores', type=int, default=10, help='Vetores listados no relatório')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+
+    if args.universo.startswith('sintetico:'):
+        tickers = universo_sintetico(int(args.universo.split(':')[1]))
+        definir_fonte(FonteSintetica(args.semente))
+    else:
+        universos = {
+            'brasil': Config.ACOES_BRASILEIRAS,
+            'internacional': Config.ACOES_INTERNACIONAIS,
+            'global': Config.ACOES_BRASILEIRAS + Config.ACOES_INTERNACIONAIS
+        }
+        tickers = universos[args.universo]
+
+    inicio = time.time()
+    painel = montar_painel(buscar_varios(tickers, args.historico))
+    posicoes = datas_rebalanceamento(painel.index, args.janela - 1, args.frequencia) if not painel.empty else []
+    if len(posicoes) < 4:
+        print(f"Histórico insuficiente: {len(posicoes)} rebalanceamentos")
+        return 1
+    componentes, elegivel = componentes_score(painel, posicoes, args.janela)
+    futuros = retornos_futuros(painel, posicoes)
+    print(f"{painel.shape[1]} ativos, {len(posicoes)} rebalanceamentos "
+          f"({time.time() - inicio:.1f} s para dados e componentes)")
+
+    grade = grade_pesos(args.passo)
+    assinatura = hashlib.sha1(np.nan_to_num(componentes).tobytes() + futuros.tobytes()).hexdigest()[:16]
+    parametros = {
+        'universo': args.universo, 'historico': args.historico, 'passo': args.passo,
+        'top': args.top, 'janela': args.janela, 'frequencia': args.frequencia,
+        'validacao': args.validacao, 'dados': assinatura
+    }
+    estado = EstadoBusca(args.estado, parametros)
+    if args.retomar and estado.carregar():
+        print(f"Retomando: {len(estado.resultados)} lotes já avaliados")
+
+    def progresso(feitos, total):
+        print(f"\r{feitos}/{total} lotes", end='', flush=True)
+
+    inicio = time.time()
+    resultados = otimizar_pesos(
+        componentes, elegivel, futuros, grade, args.top, args.validacao,
+        _PERIODOS_ANO[args.frequencia], args.processos, estado=estado,
+        progresso_callback=progresso
+    )
+    print(f"\n{len(grade)} vetores avaliados em {time.time() - inicio:.1f} s")
+
+    atuais = np.array([[Config.PESOS_RANKING[nome] for nome in COMPONENTES]])
+    corte = corte_validacao(len(posicoes), args.validacao)
+    referencia = avaliar_pesos(atuais, componentes, elegivel, np.nan_to_num(futuros),
+                               args.top, corte, _PERIODOS_ANO[args.frequencia])[0]
+
+    print(f"\n{'pesos':<52} {'Sharpe treino':>13} {'Sharpe valid.':>13} {'ret. valid.':>11}")
+    for i in np.argsort(-resultados[:, 0], kind='stable')[:args.melhores]:
+        print(f"{_formatar_pesos(grade[i]):<52} {resultados[i, 0]:13.2f} "
+              f"{resultados[i, 2]:13.2f} {resultados[i, 3]:10.1f}%")
+    print(f"{'Config.PESOS_RANKING ' + _formatar_pesos(atuais[0]):<52} {referencia[0]:13.2f} "
+          f"{referencia[2]:13.2f} {referencia[3]:10.1f}%")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,276 @@
+"""Instrumentação de tempo dos caminhos críticos.
+
+Trechos medidos (``medir`` / ``medido``) são registrados na execução ativa
+(uma por renderização de página, ver ``iniciar_execucao``) e em totais
+acumulados do processo, exportáveis em formato Prometheus.
+
+A execução ativa fica em uma ``ContextVar``: trechos que rodam em threads
+do pipeline assíncrono entram na execução certa desde que a chamada seja
+feita com ``contextvars.copy_context().run`` (ver ``utils.busca_async``).
+"""
+
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+from config import Config
+from utils.cache import estatisticas_cache
+
+
+class ExecucaoPerf:
+    """Trechos medidos durante uma execução (renderização de uma página)."""
+
+    def __init__(self, nome: str):
+        self.nome = nome
+        self.inicio = time.time()
+        self._inicio_relogio = time.perf_counter()
+        self.duracao: Optional[float] = None
+        self.trechos: List[tuple] = []          # (etapa, ticker, segundos)
+        self._cache_inicial = estatisticas_cache()
+        self._cache_final: Optional[Dict] = None
+        self._lock = threading.Lock()
+
+    def registrar(self, etapa: str, segundos: float, ticker: Optional[str] = None) -> None:
+        with self._lock:
+            self.trechos.append((etapa, ticker, segundos))
+
+    def finalizar(self) -> None:
+        """Fecha a execução, fixando a duração e as estatísticas de cache."""
+        self.duracao = time.perf_counter() - self._inicio_relogio
+        self._cache_final = estatisticas_cache()
+
+    def _tabela(self) -> pd.DataFrame:
+        with self._lock:
+            return pd.DataFrame(self.trechos, columns=['etapa', 'ticker', 'segundos'])
+
+    def resumo_etapas(self) -> pd.DataFrame:
+        """
+        Totais por etapa.
+
+        Returns:
+            DataFrame com chamadas, total, média e máximo por etapa (o total
+            soma trechos paralelos e pode passar da duração da execução)
+        """
+        tabela = self._tabela()
+        if tabela.empty:
+            return pd.DataFrame(columns=['etapa', 'chamadas', 'total_s', 'media_ms', 'max_ms'])
+        resumo = tabela.groupby('etapa')['segundos'].agg(['count', 'sum', 'mean', 'max'])
+        resumo.columns = ['chamadas', 'total_s', 'media_ms', 'max_ms']
+        resumo[['media_ms', 'max_ms']] *= 1000
+        return resumo.sort_values('total_s', ascending=False).reset_index()
+
+    def mais_lentos(self, n: int = 10) -> pd.DataFrame:
+        """
+        Tickers com maior tempo somado entre todas as etapas.
+
+        Args:
+            n: Quantidade de tickers
+
+        Returns:
+            DataFrame com ticker, total e a etapa mais demorada
+        """
+        tabela = self._tabela().dropna(subset=['ticker'])
+        if tabela.empty:
+            return pd.DataFrame(columns=['ticker', 'total_s', 'etapa_principal'])
+        por_etapa = tabela.groupby(['ticker', 'etapa'])['segundos'].sum().reset_index()
+        principal = por_etapa.loc[por_etapa.groupby('ticker')['segundos'].idxmax()].set_index('ticker')
+        totais = por_etapa.groupby('ticker')['segundos'].sum().nlargest(n)
+        return pd.DataFrame({
+            'ticker': totais.index,
+            'total_s': totais.values,
+            'etapa_principal': principal.loc[totais.index, 'etapa'].values
+        })
+
+    def acertos_cache(self) -> pd.DataFrame:
+        """
+        Acertos e falhas de cache por namespace durante a execução.
+
+        Returns:
+            DataFrame com acertos (inclusive obsoletos), falhas e taxa de acerto
+        """
+        final = self._cache_final or estatisticas_cache()
+        linhas = []
+        for ns, stats in final.items():
+            antes = self._cache_inicial.get(ns, {})
+            servidas = (stats['acertos'] + stats['obsoletas']) - \
+                (antes.get('acertos', 0) + antes.get('obsoletas', 0))
+            falhas = stats['falhas'] - antes.get('falhas', 0)
+            if servidas or falhas:
+                linhas.append({
+                    'namespace': ns,
+                    'acertos': servidas,
+                    'falhas': falhas,
+                    'taxa_acerto': servidas / (servidas + falhas)
+                })
+        return pd.DataFrame(linhas, columns=['namespace', 'acertos', 'falhas', 'taxa_acerto'])
+
+    def para_dict(self) -> Dict[str, Any]:
+        """Representação serializável da execução."""
+        return {
+            'nome': self.nome,
+            'inicio': pd.Timestamp(self.inicio, unit='s').isoformat(),
+            'duracao_s': self.duracao,
+            'etapas': self.resumo_etapas().to_dict(orient='records'),
+            'mais_lentos': self.mais_lentos().to_dict(orient='records'),
+            'cache': self.acertos_cache().to_dict(orient='records')
+        }
+
+
+_execucao_atual: contextvars.ContextVar[Optional[ExecucaoPerf]] = \
+    contextvars.ContextVar('execucao_perf', default=None)
+
+# Totais do processo por etapa: [chamadas, segundos]
+_totais: Dict[str, List[float]] = {}
+_lock_totais = threading.Lock()
+
+
+def registrar(etapa: str, segundos: float, ticker: Optional[str] = None) -> None:
+    """
+    Registra um trecho medido na execução ativa e nos totais do processo.
+
+    Args:
+        etapa: Nome da etapa (ex: 'busca', 'indicadores', 'grafico.radar')
+        segundos: Duração
+        ticker: Ativo relacionado (opcional)
+    """
+    with _lock_totais:
+        total = _totais.setdefault(etapa, [0, 0.0])
+        total[0] += 1
+        total[1] += segundos
+
+    execucao = _execucao_atual.get()
+    if execucao is not None:
+        execucao.registrar(etapa, segundos, ticker)
+
+
+@contextmanager
+def medir(etapa: str, ticker: Optional[str] = None):
+    """
+    Context manager que mede um trecho de código.
+
+    Args:
+        etapa: Nome da etapa
+        ticker: Ativo relacionado (opcional)
+    """
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        registrar(etapa, time.perf_counter() - inicio, ticker)
+
+
+def medido(etapa: str, ticker: Optional[Callable[..., Optional[str]]] = None) -> Callable:
+    """
+    Decorador que mede cada chamada da função.
+
+    Args:
+        etapa: Nome da etapa
+        ticker: Função que extrai o ticker dos argumentos da chamada (opcional)
+
+    Returns:
+        Decorador
+    """
+    def decorador(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                registrar(
+                    etapa, time.perf_counter() - inicio,
+                    ticker(*args, **kwargs) if ticker else None
+                )
+        return wrapper
+    return decorador
+
+
+def ticker_dos_dados(data, *args, **kwargs) -> Optional[str]:
+    """Extrai o ticker dos metadados de um DataFrame marcado (``marcar_dados``)."""
+    return getattr(data, 'attrs', {}).get('ticker')
+
+
+def iniciar_execucao(nome: str) -> ExecucaoPerf:
+    """
+    Inicia uma nova execução e a torna ativa no contexto atual.
+
+    Args:
+        nome: Identificação da execução (ex: nome da página)
+
+    Returns:
+        A execução criada
+    """
+    execucao = ExecucaoPerf(nome)
+    _execucao_atual.set(execucao)
+    return execucao
+
+
+def execucao_atual() -> Optional[ExecucaoPerf]:
+    """Retorna a execução ativa no contexto atual (ou None)."""
+    return _execucao_atual.get()
+
+
+def exportar_json(execucao: ExecucaoPerf) -> str:
+    """Exporta a execução em JSON."""
+    return json.dumps(execucao.para_dict(), indent=2, ensure_ascii=False, default=str)
+
+
+def exportar_prometheus() -> str:
+    """
+    Exporta os totais do processo no formato de texto do Prometheus.
+
+    Returns:
+        Métricas de tempo por etapa e de uso do cache por namespace
+    """
+    with _lock_totais:
+        totais = {etapa: list(valores) for etapa, valores in _totais.items()}
+
+    linhas = [
+        '# HELP dashboard_etapa_segundos_total Tempo acumulado por etapa.',
+        '# TYPE dashboard_etapa_segundos_total counter'
+    ]
+    linhas += [f'dashboard_etapa_segundos_total{{etapa="{e}"}} {v[1]:.6f}' for e, v in sorted(totais.items())]
+    linhas += [
+        '# HELP dashboard_etapa_chamadas_total Trechos medidos por etapa.',
+        '# TYPE dashboard_etapa_chamadas_total counter'
+    ]
+    linhas += [f'dashboard_etapa_chamadas_total{{etapa="{e}"}} {v[0]}' for e, v in sorted(totais.items())]
+
+    metricas_cache = [
+        ('acertos', 'counter', 'Consultas servidas pelo cache (inclui obsoletas).'),
+        ('falhas', 'counter', 'Consultas não encontradas no cache.'),
+        ('remocoes', 'counter', 'Entradas removidas por falta de espaço.'),
+        ('bytes', 'gauge', 'Bytes ocupados pelo cache.')
+    ]
+    estatisticas = estatisticas_cache()
+    for nome, tipo, ajuda in metricas_cache:
+        linhas.append(f'# HELP dashboard_cache_{nome} {ajuda}')
+        linhas.append(f'# TYPE dashboard_cache_{nome} {tipo}')
+        for ns, stats in sorted(estatisticas.items()):
+            valor = stats['acertos'] + stats['obsoletas'] if nome == 'acertos' else stats[nome]
+            linhas.append(f'dashboard_cache_{nome}{{namespace="{ns}"}} {valor}')
+
+    return '\n'.join(linhas) + '\n'
+
+
+def gravar_prometheus(caminho: Optional[str] = None) -> None:
+    """
+    Grava as métricas em arquivo (coletor textfile do node_exporter).
+
+    Args:
+        caminho: Arquivo de destino (padrão: Config.PERF_ARQUIVO_PROMETHEUS;
+            nada é feito se estiver vazio)
+    """
+    caminho = caminho or Config.PERF_ARQUIVO_PROMETHEUS
+    if not caminho:
+        return
+    temporario = f"{caminho}.tmp"
+    with open(temporario, 'w', encoding='utf-8') as f:
+        f.write(exportar_prometheus())
+    os.replace(temporario, caminho)
@@ -0,0 +1,186 @@
+"""Proteções da camada de busca: cache negativo e disjuntor (circuit breaker)."""
+
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterable, Optional
+
+import pandas as pd
+from config import Config
+
+
+class ErroFonteDados(Exception):
+    """Falha transitória da fonte de dados (rede, limite de requisições, etc.)."""
+
+
+class ErroLimiteRequisicoes(ErroFonteDados):
+    """A fonte recusou a requisição por limite de taxa (HTTP 429)."""
+
+
+class CacheNegativo:
+    """
+    Lembra tickers que falharam e os bloqueia por um tempo crescente.
+
+    Cada falha consecutiva dobra o bloqueio, de ``Config.NEGATIVO_BACKOFF_BASE``
+    até ``Config.NEGATIVO_BACKOFF_MAX`` segundos. Um sucesso zera o histórico.
+    """
+
+    def __init__(self, tipo: str):
+        self.tipo = tipo
+        self._falhas: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def bloqueado(self, ticker: str) -> bool:
+        """Indica se o ticker está em período de espera após falhas."""
+        with self._lock:
+            registro = self._falhas.get(ticker)
+            return registro is not None and registro['bloqueado_ate'] > time.time()
+
+    def registrar_falha(self, ticker: str, motivo: str) -> None:
+        """Registra uma falha e calcula o próximo período de bloqueio."""
+        with self._lock:
+            registro = self._falhas.setdefault(ticker, {
+                'consecutivas': 0, 'total': 0, 'motivo': '',
+                'ultima_falha': 0.0, 'bloqueado_ate': 0.0
+            })
+            registro['consecutivas'] += 1
+            registro['total'] += 1
+            registro['motivo'] = motivo
+            registro['ultima_falha'] = time.time()
+            espera = min(
+                Config.NEGATIVO_BACKOFF_BASE * 2 ** (registro['consecutivas'] - 1),
+                Config.NEGATIVO_BACKOFF_MAX
+            )
+            registro['bloqueado_ate'] = registro['ultima_falha'] + espera
+
+    def registrar_sucesso(self, ticker: str) -> None:
+        """Remove o ticker do cache negativo."""
+        with self._lock:
+            self._falhas.pop(ticker, None)
+
+    def relatorio(self, tickers: Optional[Iterable[str]] = None,
+                  apenas_cronicos: bool = True) -> pd.DataFrame:
+        """
+        Lista os tickers com falhas registradas.
+
+        Args:
+            tickers: Restringir a estes tickers (opcional)
+            apenas_cronicos: Se True, só tickers com pelo menos
+                Config.NEGATIVO_FALHAS_CRONICAS falhas consecutivas
+
+        Returns:
+            DataFrame com ticker, tipo, falhas consecutivas/total, motivo e
+            datas da última falha e do fim do bloqueio
+        """
+        filtro = set(tickers) if tickers is not None else None
+        with self._lock:
+            linhas = [
+                {
+                    'ticker': ticker,
+                    'tipo': self.tipo,
+                    'falhas_consecutivas': r['consecutivas'],
+                    'falhas_total': r['total'],
+                    'motivo': r['motivo'],
+                    'ultima_falha': pd.Timestamp(r['ultima_falha'], unit='s'),
+                    'bloqueado_ate': pd.Timestamp(r['bloqueado_ate'], unit='s')
+                }
+                for ticker, r in self._falhas.items()
+                if (filtro is None or ticker in filtro) and
+                   (not apenas_cronicos or r['consecutivas'] >= Config.NEGATIVO_FALHAS_CRONICAS)
+            ]
+        return pd.DataFrame(linhas)
+
+
+class Disjuntor:
+    """
+    Disjuntor que para de chamar a fonte quando a taxa de erro dispara.
+
+    Estados: 'fechado' (normal), 'aberto' (rejeita chamadas por
+    ``Config.DISJUNTOR_TEMPO_ABERTO`` segundos) e 'meio-aberto' (deixa uma
+    chamada de teste passar; sucesso fecha, falha reabre).
+    """
+
+    def __init__(self):
+        self._resultados = deque()
+        self._estado = 'fechado'
+        self._reabrir_em = 0.0
+        self._teste_em_andamento = False
+        self._lock = threading.Lock()
+
+    @property
+    def estado(self) -> str:
+        with self._lock:
+            return self._estado
+
+    def _descartar_antigos(self, agora: float) -> None:
+        limite = agora - Config.DISJUNTOR_JANELA
+        while self._resultados and self._resultados[0][0] < limite:
+            self._resultados.popleft()
+
+    def permitir(self) -> bool:
+        """Indica se uma chamada à fonte pode ser feita agora."""
+        with self._lock:
+            if self._estado == 'fechado':
+                return True
+            if self._estado == 'aberto' and time.time() >= self._reabrir_em:
+                self._estado = 'meio-aberto'
+                self._teste_em_andamento = False
+            if self._estado == 'meio-aberto' and not self._teste_em_andamento:
+                self._teste_em_andamento = True
+                return True
+            return False
+
+    def registrar(self, sucesso: bool) -> None:
+        """Registra o resultado de uma chamada à fonte."""
+        with self._lock:
+            agora = time.time()
+
+            if self._estado == 'meio-aberto':
+                self._teste_em_andamento = False
+                if sucesso:
+                    self._estado = 'fechado'
+                    self._resultados.clear()
+                else:
+                    self._estado = 'aberto'
+                    self._reabrir_em = agora + Config.DISJUNTOR_TEMPO_ABERTO
+                return
+
+            self._resultados.append((agora, sucesso))
+            self._descartar_antigos(agora)
+
+            total = len(self._resultados)
+            erros = sum(1 for _, ok in self._resultados if not ok)
+            if total >= Config.DISJUNTOR_MIN_CHAMADAS and erros / total >= Config.DISJUNTOR_LIMIAR_ERRO:
+                self._estado = 'aberto'
+                self._reabrir_em = agora + Config.DISJUNTOR_TEMPO_ABERTO
+
+
+falhas_precos = CacheNegativo('preços')
+falhas_info = CacheNegativo('info')
+disjuntor_fonte = Disjuntor()
+
+
+def relatorio_falhas(tickers: Optional[Iterable[str]] = None,
+                     apenas_cronicos: bool = True) -> pd.DataFrame:
+    """
+    Relatório dos tickers que falham de forma recorrente (preços e info).
+
+    Args:
+        tickers: Restringir a estes tickers (opcional)
+        apenas_cronicos: Se True, só falhas crônicas
+
+    Returns:
+        DataFrame ordenado por falhas consecutivas (vazio se não houver falhas)
+    """
+    if tickers is not None:
+        tickers = list(tickers)
+    partes = [
+        cache.relatorio(tickers, apenas_cronicos)
+        for cache in (falhas_precos, falhas_info)
+    ]
+    partes = [p for p in partes if not p.empty]
+    if not partes:
+        return pd.DataFrame()
+    return pd.concat(partes, ignore_index=True).sort_values(
+        'falhas_consecutivas', ascending=False
+    ).reset_index(drop=True)
@@ -1,8 +1,12 @@
 """Sistema de pontuação e ranking de ativos."""
 
+import heapq
+
 import pandas as pd
 import numpy as np
 from config import Config
+from utils.cache import cache_por_dados
+from utils.perf import medir, medido, ticker_dos_dados
 
 
 def calcular_score_ativo(dados, info=None):
@@ -16,6 +20,13 @@ def calcular_score_ativo(dados, info=None):
     Returns:
         Dict com scores individuais e score total
     """
+    return _calcular_score(dados)
+
+
+@cache_por_dados('scores', ttl=3600)
+@medido('score', ticker=ticker_dos_dados)
+def _calcular_score(dados):
+    """Calcula o score de um DataFrame (cacheado pela chave dos dados)."""
     if dados.empty or len(dados) < 20:
         return None
     
@@ -109,6 +120,78 @@ def calcular_score_ativo(dados, info=None):
         return None
 
 
+# Histórico buscado para a série do score: o período analisado e mais um
+# período antes dele, para que a série cubra todo o período exibido
+PERIODO_SERIE_SCORE = {
+    '1mo': '3mo', '3mo': '6mo', '6mo': '1y', '1y': '2y', '2y': '5y', '5y': '10y'
+}
+
+
+@cache_por_dados('scores', ttl=3600)
+@medido('score.serie', ticker=ticker_dos_dados)
+def serie_score(dados, janela):
+    """
+    Score de cada dia, sobre os ``janela`` pregões anteriores.
+
+    Cada ponto é o que ``calcular_score_ativo`` daria para os ``janela``
+    pregões terminados naquele dia, mas a série inteira é calculada em O(n)
+    com somas acumuladas (ver ``utils.backtest.componentes_score``), em vez
+    de recalcular o score em cada janela.
+
+    Args:
+        dados: DataFrame com dados históricos
+        janela: Pregões por score (ex: o número de pregões do período analisado)
+
+    Returns:
+        DataFrame indexado pela data com os cinco componentes e 'total'
+        (NaN nos dias sem histórico suficiente)
+    """
+    from utils.backtest import COMPONENTES, componentes_score
+
+    precos = pd.DataFrame({'Close': pd.to_numeric(dados['Close'], errors='coerce').to_numpy()},
+                          index=dados.index)
+    posicoes = np.arange(len(precos))
+    componentes, elegivel = componentes_score(precos, posicoes, janela)
+
+    # Mesma ordem de soma de _calcular_score
+    pesos = Config.PESOS_RANKING
+    total = componentes[0] * pesos[COMPONENTES[0]]
+    for componente, nome in zip(componentes[1:], COMPONENTES[1:]):
+        total = total + componente * pesos[nome]
+
+    valores = np.column_stack([componentes[:, :, 0].T, np.round(total[:, 0], 2)])
+    valores[~elegivel[:, 0]] = np.nan
+    return pd.DataFrame(valores, index=dados.index, columns=list(COMPONENTES) + ['total'])
+
+
+def serie_score_ativo(ticker, periodo='1y'):
+    """
+    Evolução diária do score de um ativo ao longo do período analisado.
+
+    Cada dia usa uma janela com o número de pregões do período (o score do
+    último dia é o de ``calcular_score_ativo``). O histórico anterior ao
+    período vem de uma busca mais longa (PERIODO_SERIE_SCORE).
+
+    Args:
+        ticker: Código do ativo
+        periodo: Período de análise
+
+    Returns:
+        DataFrame de ``serie_score`` restrito ao período, ou None se não houver dados
+    """
+    from utils.data_fetcher import fetch_stock_data
+
+    dados = fetch_stock_data(ticker, periodo)
+    if dados is None or dados.empty:
+        return None
+
+    historico = fetch_stock_data(ticker, PERIODO_SERIE_SCORE.get(periodo, periodo))
+    if historico is None or historico.empty:
+        historico = dados
+
+    return serie_score(historico, len(dados)).loc[dados.index[0]:]
+
+
 def normalizar_score(valor, min_val, max_val):
     """
     Normaliza um valor para escala 0-100.
@@ -129,7 +212,247 @@ def normalizar_score(valor, min_val, max_val):
         return ((valor - min_val) / (max_val - min_val)) * 100
 
 
-def rankear_ativos(lista_tickers, periodo='1y', progresso_callback=None):
+async def _avaliar_ativo(ticker, periodo):
+    """
+    Busca dados (com prazo) e calcula o resultado de ranking de um ativo.
+    
+    Args:
+        ticker: Código do ativo
+        periodo: Período de análise
+        
+    Returns:
+        Tupla com os campos do ranking (COLUNAS_RANKING) ou None se não houver dados suficientes
+    """
+    from utils.busca_async import buscar_dados_async, executar_bloqueante
+    
+    dados = await buscar_dados_async(ticker, periodo)
+    
+    if dados is None or dados.empty:
+        return None
+    
+    return await executar_bloqueante(_resultado_ativo, ticker, dados)
+
+
+# Colunas do ranking, na ordem das tuplas de _resultado_ativo:
+# 'float' (float64), 'texto' (object) ou 'categoria' (pd.Categorical)
+COLUNAS_RANKING = (
+    ('ticker', 'texto'),
+    ('nome', 'texto'),
+    ('setor', 'categoria'),
+    ('preco', 'float'),
+    ('score_total', 'float'),
+    ('classificacao', 'categoria'),
+    ('cor', 'categoria'),
+    ('retorno', 'float'),
+    ('volatilidade', 'float'),
+    ('sharpe', 'float'),
+    ('tendencia', 'categoria'),
+    ('rsi', 'float'),
+    ('score_retorno', 'float'),
+    ('score_volatilidade', 'float'),
+    ('score_sharpe', 'float'),
+    ('score_tendencia', 'float'),
+    ('score_momento', 'float')
+)
+_POSICAO_SCORE = [nome for nome, _ in COLUNAS_RANKING].index('score_total')
+
+# Valor das colunas categóricas quando o dado não existe (categorias não podem ser nulas)
+CATEGORIA_AUSENTE = 'N/A'
+
+
+def indices_topo(valores, k):
+    """
+    Posições dos k maiores valores, do maior para o menor.
+    
+    Usa seleção parcial (``np.argpartition``) e ordena apenas os k
+    escolhidos: O(n + k log k) em vez de O(n log n). Empates são ordenados
+    pela posição; no limite do top k, qual dos empatados entra é arbitrário.
+    
+    Args:
+        valores: Array de valores (NaN fica por último)
+        k: Quantidade de posições
+        
+    Returns:
+        Array de posições
+    """
+    negativos = -np.asarray(valores, dtype=float)
+    if k >= len(negativos):
+        return np.argsort(negativos, kind='stable')
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    candidatos = np.argpartition(negativos, k - 1)[:k]
+    return candidatos[np.lexsort((candidatos, negativos[candidatos]))]
+
+
+def _resultado_ativo(ticker, dados):
+    """
+    Calcula o resultado de ranking de um ativo a partir dos dados históricos.
+    
+    Args:
+        ticker: Código do ativo
+        dados: DataFrame com dados históricos
+        
+    Returns:
+        Tupla com os campos de COLUNAS_RANKING ou None se não houver dados suficientes
+    """
+    from utils.data_fetcher import get_stock_info
+    
+    # Calcular score
+    scores = calcular_score_ativo(dados)
+    
+    if scores is None:
+        return None
+    
+    # Buscar informações adicionais
+    info = get_stock_info(ticker)
+    
+    # Montar resultado (tupla: menor que um dict por ativo)
+    return (
+        ticker,
+        info.get('longName', ticker) if info else ticker,
+        (info.get('sector') if info else None) or CATEGORIA_AUSENTE,
+        float(dados['Close'].iloc[-1]),
+        scores['total'],
+        scores['classificacao'],
+        scores['cor'],
+        scores['retorno_valor'],
+        scores['volatilidade_valor'],
+        scores['sharpe_valor'],
+        scores['tendencia_sinal'],
+        scores['rsi_valor'],
+        scores['retorno'],
+        scores['volatilidade'],
+        scores['sharpe'],
+        scores['tendencia'],
+        scores['momento']
+    )
+
+
+class MontadorRanking:
+    """
+    Monta o DataFrame de ranking em colunas tipadas pré-alocadas.
+    
+    Cada ativo ocupa uma posição em arrays float64 (valores numéricos),
+    object (ticker e nome) e int16 (códigos das colunas categóricas), em vez
+    de um dict por ativo que o pandas teria de converter e inferir no fim.
+    
+    Args:
+        capacidade: Número máximo de ativos
+    """
+    
+    def __init__(self, capacidade):
+        self.tamanho = 0
+        self._colunas = {}
+        self._categorias = {}
+        for nome, tipo in COLUNAS_RANKING:
+            if tipo == 'float':
+                self._colunas[nome] = np.empty(capacidade, dtype=np.float64)
+            elif tipo == 'texto':
+                self._colunas[nome] = np.empty(capacidade, dtype=object)
+            else:
+                self._colunas[nome] = np.empty(capacidade, dtype=np.int16)
+                self._categorias[nome] = {}
+    
+    def adicionar(self, linha):
+        """
+        Grava um ativo na próxima posição.
+        
+        Valores nulos (None ou NaN) das colunas categóricas viram CATEGORIA_AUSENTE.
+        
+        Args:
+            linha: Tupla na ordem de COLUNAS_RANKING
+        """
+        posicao = self.tamanho
+        for (nome, _), valor in zip(COLUNAS_RANKING, linha):
+            categorias = self._categorias.get(nome)
+            if categorias is not None:
+                if valor is None or valor != valor:
+                    valor = CATEGORIA_AUSENTE
+                valor = categorias.setdefault(valor, len(categorias))
+            self._colunas[nome][posicao] = valor
+        self.tamanho += 1
+    
+    def montar(self, top=None):
+        """
+        Cria o DataFrame ordenado por score, com a coluna 'ranking'.
+        
+        A ordenação é uma única indexação por coluna; o DataFrame usa os
+        arrays resultantes sem nova cópia.
+        
+        Args:
+            top: Se informado, apenas os ``top`` ativos de maior score
+                (seleção parcial, sem ordenar o universo inteiro)
+        
+        Returns:
+            DataFrame com as colunas de COLUNAS_RANKING e 'ranking'
+        """
+        if self.tamanho == 0:
+            return pd.DataFrame()
+        
+        scores = self._colunas['score_total'][:self.tamanho]
+        ordem = indices_topo(scores, self.tamanho if top is None else top)
+        
+        colunas = {}
+        for nome, _ in COLUNAS_RANKING:
+            valores = self._colunas[nome][ordem]
+            if nome in self._categorias:
+                valores = pd.Categorical.from_codes(valores, categories=list(self._categorias[nome]))
+            colunas[nome] = valores
+        colunas['ranking'] = np.arange(1, len(ordem) + 1)
+        
+        return pd.DataFrame(colunas, copy=False)
+
+
+class MontadorTopK:
+    """
+    Mantém apenas os k ativos de maior score enquanto o ranking é calculado.
+    
+    Os resultados ficam em um heap de tamanho k: a memória não cresce com o
+    universo. Mesma interface de MontadorRanking.
+    
+    Args:
+        k: Quantidade de ativos mantidos
+    """
+    
+    def __init__(self, k):
+        self.k = k
+        self.tamanho = 0
+        self._heap = []
+    
+    def adicionar(self, linha):
+        """
+        Considera um ativo; ele só é mantido se estiver entre os k melhores.
+        
+        Args:
+            linha: Tupla na ordem de COLUNAS_RANKING
+        """
+        score = linha[_POSICAO_SCORE]
+        if score != score:
+            score = -np.inf
+        
+        # Em empates, o ativo que chegou antes fica
+        entrada = (score, -self.tamanho, linha)
+        self.tamanho += 1
+        
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entrada)
+        elif entrada[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entrada)
+    
+    def montar(self):
+        """
+        Cria o DataFrame dos k melhores, ordenado por score.
+        
+        Returns:
+            DataFrame com as colunas de COLUNAS_RANKING e 'ranking'
+        """
+        montador = MontadorRanking(len(self._heap))
+        for _, _, linha in sorted(self._heap, key=lambda e: e[:2], reverse=True):
+            montador.adicionar(linha)
+        return montador.montar()
+
+
+def rankear_ativos(lista_tickers, periodo='1y', progresso_callback=None, top=None):
     """
     Rankeia uma lista de ativos baseado em seus scores.
     
@@ -137,68 +460,149 @@ def rankear_ativos(lista_tickers, periodo='1y', progresso_callback=None):
         lista_tickers: Lista de códigos de ativos
         periodo: Período de análise
         progresso_callback: Função callback para atualizar progresso
+        top: Se informado, só os ``top`` ativos de maior score são mantidos
+            durante o cálculo (memória limitada a eles)
         
     Returns:
-        DataFrame com ranking completo
+        DataFrame com ranking completo (ou com os ``top`` primeiros)
+    """
+    from utils.busca_async import executar_lote
+    
+    lista_tickers = list(dict.fromkeys(lista_tickers))
+    montador = MontadorTopK(top) if top else MontadorRanking(len(lista_tickers))
+    
+    def coletar(ticker, linha):
+        if linha is not None:
+            montador.adicionar(linha)
+    
+    # Buscas concorrentes com prazo por ativo; o callback roda nesta thread,
+    # pois atualiza elementos do Streamlit. Se a página for interrompida, o
+    # Streamlit lança exceção no callback e os ativos pendentes são cancelados.
+    # Cada resultado vai direto para o montador, sem ficar guardado no lote.
+    executar_lote(
+        lambda ticker: _avaliar_ativo(ticker, periodo),
+        lista_tickers,
+        progresso_callback=progresso_callback,
+        coletar=coletar
+    )
+    
+    # Criar DataFrame e ordenar
+    with medir('montagem'):
+        return montador.montar()
+
+
+class IndiceRanking:
     """
-    from utils.data_fetcher import fetch_stock_data, get_stock_info
+    Ranking com índices pré-calculados para filtros e ordenações.
     
-    resultados = []
-    total = len(lista_tickers)
+    Criado uma vez por ranking (e guardado na sessão junto com ele), evita
+    que cada mudança de filtro copie, reordene e reformate o DataFrame: as
+    ordenações são permutações calculadas na criação, os setores são máscaras
+    booleanas e a tabela de exibição é formatada uma única vez. Um filtro
+    vira a interseção de máscaras aplicada a uma permutação.
     
-    for i, ticker in enumerate(lista_tickers):
-        if progresso_callback:
-            progresso_callback(i + 1, total, ticker)
+    Args:
+        df: Ranking (como retornado por ``rankear_ativos``); não é copiado
+        preparar_exibicao: Função que monta a tabela formatada a partir do
+            ranking (opcional)
+    """
+    
+    # Coluna -> ordem crescente
+    ORDENACOES = {
+        'score_total': False,
+        'retorno': False,
+        'sharpe': False,
+        'volatilidade': True
+    }
+    
+    def __init__(self, df, preparar_exibicao=None):
+        self.df = df
+        self._scores = df['score_total'].to_numpy(dtype=float)
         
-        try:
-            # Buscar dados
-            dados = fetch_stock_data(ticker, periodo)
-            
-            if dados is None or dados.empty:
-                continue
-            
-            # Calcular score
-            scores = calcular_score_ativo(dados)
-            
-            if scores is None:
-                continue
-            
-            # Buscar informações adicionais
-            info = get_stock_info(ticker)
-            
-            # Montar resultado
-            resultado = {
-                'ticker': ticker,
-                'nome': info.get('longName', ticker) if info else ticker,
-                'setor': info.get('sector', 'N/A') if info else 'N/A',
-                'preco': float(dados['Close'].iloc[-1]),
-                'score_total': scores['total'],
-                'classificacao': scores['classificacao'],
-                'cor': scores['cor'],
-                'retorno': scores['retorno_valor'],
-                'volatilidade': scores['volatilidade_valor'],
-                'sharpe': scores['sharpe_valor'],
-                'tendencia': scores['tendencia_sinal'],
-                'rsi': scores['rsi_valor'],
-                'score_retorno': scores['retorno'],
-                'score_volatilidade': scores['volatilidade'],
-                'score_sharpe': scores['sharpe'],
-                'score_tendencia': scores['tendencia'],
-                'score_momento': scores['momento']
-            }
-            
-            resultados.append(resultado)
+        # NaN fica no fim nas duas direções
+        self.ordens = {}
+        for coluna, crescente in self.ORDENACOES.items():
+            if coluna in df.columns:
+                valores = df[coluna].to_numpy(dtype=float)
+                self.ordens[coluna] = np.argsort(valores if crescente else -valores, kind='stable')
+        
+        self.setores = {}
+        if 'setor' in df.columns:
+            codigos, nomes = pd.factorize(df['setor'])
+            self.setores = {nome: codigos == i for i, nome in enumerate(nomes)}
+        
+        self.exibicao = preparar_exibicao(df) if preparar_exibicao else None
+    
+    def __sizeof__(self):
+        # O DataFrame é o mesmo guardado na sessão; conta só os índices
+        tamanho = object.__sizeof__(self) + self._scores.nbytes
+        tamanho += sum(ordem.nbytes for ordem in self.ordens.values())
+        tamanho += sum(mascara.nbytes for mascara in self.setores.values())
+        if self.exibicao is not None:
+            tamanho += int(self.exibicao.memory_usage(index=True, deep=True).sum())
+        return tamanho
+    
+    def filtrar(self, score_minimo=None, setores=None, ordenar_por='score_total'):
+        """
+        Posições das linhas que passam nos filtros, na ordem pedida.
+        
+        Args:
+            score_minimo: Score total mínimo (opcional)
+            setores: Setores aceitos; setores ausentes do ranking são
+                ignorados (opcional, None = todos)
+            ordenar_por: Coluna de ``ORDENACOES``
             
-        except Exception as e:
-            continue
+        Returns:
+            Array de posições (para ``selecionar`` e ``tabela``)
+        """
+        mascara = np.ones(len(self._scores), dtype=bool)
+        
+        if score_minimo is not None:
+            mascara &= self._scores >= score_minimo
+        
+        if setores is not None:
+            mascara_setores = np.zeros_like(mascara)
+            for setor in setores:
+                if setor in self.setores:
+                    mascara_setores |= self.setores[setor]
+            mascara &= mascara_setores
+        
+        ordem = self.ordens[ordenar_por]
+        return ordem[mascara[ordem]]
     
-    # Criar DataFrame e ordenar
-    if not resultados:
-        return pd.DataFrame()
+    def _identidade(self, posicoes):
+        return len(posicoes) == len(self._scores) and \
+            bool((posicoes == np.arange(len(posicoes))).all())
     
-    df = pd.DataFrame(resultados)
-    df = df.sort_values('score_total', ascending=False).reset_index(drop=True)
-    df['ranking'] = range(1, len(df) + 1)
+    def selecionar(self, posicoes):
+        """
+        Linhas do ranking nas posições dadas.
+        
+        Sem filtros e na ordem original, retorna o próprio DataFrame (sem
+        cópia), que não deve ser alterado.
+        
+        Args:
+            posicoes: Posições retornadas por ``filtrar``
+            
+        Returns:
+            DataFrame
+        """
+        if self._identidade(posicoes):
+            return self.df
+        return self.df.take(posicoes)
     
-    return df
-
+    def tabela(self, posicoes):
+        """
+        Linhas da tabela de exibição nas posições dadas.
+        
+        Args:
+            posicoes: Posições retornadas por ``filtrar``
+            
+        Returns:
+            DataFrame formatado (ou None se não houver tabela de exibição)
+        """
+        if self.exibicao is None:
+            return None
+        if self._identidade(posicoes):
+            return self.exibicao
+        return self.exibicao.take(posicoes)
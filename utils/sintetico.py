@@ -0,0 +1,231 @@
+"""Gerador determinístico de dados de mercado sintéticos.
+
+``FonteSintetica`` implementa ``FonteDados`` e produz, para qualquer ticker,
+barras OHLCV e fundamentos reprodutíveis (mesma semente e mesmo ticker,
+mesmos dados), permitindo exercitar universos de milhares de ativos sem
+rede. As séries incluem:
+
+- GBM com regimes (alta/baixa) alternados por uma cadeia de Markov;
+- gaps de abertura, ocasionalmente grandes;
+- desdobramentos/grupamentos, retroajustados como no ``auto_adjust``;
+- dias faltantes e ativos listados há pouco tempo;
+- calendários distintos para B3 (.SA) e NYSE, com feriados fixos.
+"""
+
+import re
+import zlib
+from datetime import date
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from config import Config
+from utils.fontes import FonteDados
+from utils.mercado import bolsa_do_ticker
+
+# Feriados de data fixa (mês, dia) de cada bolsa
+_FERIADOS = {
+    'B3': [(1, 1), (4, 21), (5, 1), (9, 7), (10, 12), (11, 2), (11, 15), (12, 25)],
+    'NYSE': [(1, 1), (6, 19), (7, 4), (12, 25)]
+}
+
+# Parâmetros anuais (retorno, volatilidade) dos regimes de alta e de baixa
+_REGIMES = np.array([[0.15, 0.20], [-0.20, 0.40]])
+
+
+def universo_sintetico(quantidade: int, proporcao_b3: float = 0.5,
+                       prefixo: str = 'SIN') -> List[str]:
+    """
+    Gera uma lista de tickers sintéticos.
+
+    Args:
+        quantidade: Número de tickers
+        proporcao_b3: Fração de tickers da B3 (sufixo .SA)
+        prefixo: Prefixo dos símbolos
+
+    Returns:
+        Lista de tickers, intercalando B3 e NYSE na proporção pedida
+    """
+    limite_b3 = int(round(quantidade * proporcao_b3))
+    return [
+        f"{prefixo}{i:05d}.SA" if i < limite_b3 else f"{prefixo}{i:05d}"
+        for i in range(quantidade)
+    ]
+
+
+def _janela(period: str) -> Optional[pd.DateOffset]:
+    """Converte um período do yfinance ('5d', '6mo', '20y', 'max') em DateOffset."""
+    encontrado = re.fullmatch(r'(\d+)(d|wk|mo|y)', period)
+    if encontrado is None:
+        return None
+    n, unidade = int(encontrado.group(1)), encontrado.group(2)
+    return {
+        'd': pd.DateOffset(days=n),
+        'wk': pd.DateOffset(weeks=n),
+        'mo': pd.DateOffset(months=n),
+        'y': pd.DateOffset(years=n)
+    }[unidade]
+
+
+def calendario(bolsa: str, inicio, fim) -> pd.DatetimeIndex:
+    """
+    Dias de pregão de uma bolsa (dias úteis menos os feriados fixos).
+
+    Args:
+        bolsa: 'B3' ou 'NYSE'
+        inicio: Data inicial
+        fim: Data final
+
+    Returns:
+        DatetimeIndex com os dias de negociação
+    """
+    # Em numpy: pd.bdate_range gera um Timestamp por dia e domina o custo
+    dias = np.arange(
+        np.datetime64(pd.Timestamp(inicio).date()),
+        np.datetime64(pd.Timestamp(fim).date()) + 1
+    )
+    dias_semana = (dias.astype(np.int64) + 3) % 7     # 1970-01-01 foi quinta-feira
+    indice = pd.DatetimeIndex(dias)
+    mes_dia = indice.month * 100 + indice.day
+    feriados = [m * 100 + d for m, d in _FERIADOS[bolsa]]
+    return pd.DatetimeIndex(dias[(dias_semana < 5) & ~np.isin(mes_dia, feriados)])
+
+
+class FonteSintetica(FonteDados):
+    """
+    Fonte de dados sintética e determinística.
+
+    Cada ticker tem sua própria semente (derivada da semente global e do
+    símbolo). O histórico completo (``anos``) termina em ``fim`` e os
+    períodos pedidos são recortes dele, então períodos diferentes do mesmo
+    ticker são consistentes entre si.
+
+    Args:
+        semente: Semente global
+        anos: Tamanho máximo do histórico
+        fim: Última data das séries (padrão: hoje)
+        ajustar: Se False, não retroajusta desdobramentos (preços com saltos)
+    """
+
+    nome = 'sintetico'
+    limitada = False
+
+    def __init__(self, semente: int = 0, anos: int = 20,
+                 fim: Optional[date] = None, ajustar: bool = True):
+        self.semente = semente
+        self.anos = anos
+        self.fim = pd.Timestamp(fim or date.today()).normalize()
+        self.ajustar = ajustar
+
+    def _gerador(self, ticker: str, canal: int) -> np.random.Generator:
+        return np.random.default_rng([self.semente, zlib.crc32(ticker.encode()), canal])
+
+    def _historico(self, ticker: str) -> pd.DataFrame:
+        rng = self._gerador(ticker, 0)
+        bolsa = bolsa_do_ticker(ticker)
+
+        # Parte dos ativos foi listada recentemente
+        inicio = self.fim - pd.DateOffset(years=self.anos)
+        if rng.random() < 0.15:
+            inicio = self.fim - pd.DateOffset(days=int(rng.integers(60, 5 * 365)))
+        dias = calendario(bolsa, inicio, self.fim)
+
+        # Dias faltantes na fonte (a última barra é sempre mantida)
+        presentes = rng.random(len(dias)) >= 0.003
+        presentes[-1] = True
+        dias = dias[presentes]
+        n = len(dias)
+
+        # Regimes: durações geométricas alternando alta/baixa
+        duracoes = rng.geometric(1 / 120, size=n // 20 + 2)
+        estados = np.resize([0, 1], len(duracoes))
+        if rng.random() < 0.5:
+            estados = 1 - estados
+        regime = np.repeat(estados, duracoes)[:n]
+        if len(regime) < n:
+            regime = np.concatenate([regime, np.zeros(n - len(regime), dtype=int)])
+
+        escala = rng.uniform(0.6, 1.4)
+        mu = _REGIMES[regime, 0] / 252
+        sigma = _REGIMES[regime, 1] * escala / np.sqrt(252)
+
+        # Retorno diário dividido entre gap de abertura e movimento intradiário
+        gap = rng.normal(0, 0.3, n) * sigma
+        saltos = rng.random(n) < 0.01
+        gap[saltos] += rng.normal(0, 0.08, saltos.sum())
+        intradia = (mu - sigma ** 2 / 2) + rng.normal(0, 0.95, n) * sigma
+
+        preco_inicial = np.exp(rng.uniform(np.log(5), np.log(300)))
+        log_fechamento = np.log(preco_inicial) + np.cumsum(gap + intradia)
+        fechamento = np.exp(log_fechamento)
+        abertura = np.exp(log_fechamento - intradia)
+
+        amplitude = np.abs(rng.normal(0, 0.5, (2, n))) * sigma
+        maxima = np.maximum(abertura, fechamento) * np.exp(amplitude[0])
+        minima = np.minimum(abertura, fechamento) * np.exp(-amplitude[1])
+
+        volume_base = np.exp(rng.uniform(np.log(1e5), np.log(5e7)))
+        volume = volume_base * rng.lognormal(0, 0.4, n) * (1 + 20 * np.abs(gap + intradia))
+
+        dados = pd.DataFrame({
+            'Open': abertura, 'High': maxima, 'Low': minima,
+            'Close': fechamento, 'Volume': volume
+        }, index=pd.DatetimeIndex(dias, name='Date'))
+
+        dados['Adj Close'] = dados['Close']
+
+        # Desdobramentos: sem ajuste, os preços anteriores ficam multiplicados
+        # pelo fator e só 'Adj Close' permanece contínuo
+        if not self.ajustar and n > 1:
+            eventos = rng.random(n) < 1 / (252 * 8)
+            eventos[0] = False
+            fatores = np.where(eventos, rng.choice([2.0, 3.0, 0.1], n), 1.0)
+            acumulado = np.cumprod(fatores[::-1])[::-1] / fatores
+            for coluna in ('Open', 'High', 'Low', 'Close'):
+                dados[coluna] *= acumulado
+            dados['Volume'] /= acumulado
+
+        dados['Volume'] = dados['Volume'].round()
+        return dados
+
+    def baixar_barras(self, ticker: str, period: str) -> Optional[pd.DataFrame]:
+        dados = self._historico(ticker)
+        janela = _janela(period)
+        if janela is not None:
+            dados = dados[dados.index > self.fim - janela]
+        return dados if not dados.empty else None
+
+    def obter_info(self, ticker: str) -> Optional[Dict]:
+        rng = self._gerador(ticker, 1)
+        brasileiro = bolsa_do_ticker(ticker) == 'B3'
+        setores = list(Config.SETORES_PORTUGUES)[:11]
+        setor = setores[int(rng.integers(len(setores)))]
+        preco = float(self._historico(ticker)['Close'].iloc[-1])
+        acoes = np.exp(rng.uniform(np.log(1e7), np.log(5e9)))
+
+        return {
+            'longName': f"{ticker.split('.')[0]} Sintética S.A.",
+            'shortName': ticker.split('.')[0],
+            'sector': setor,
+            'industry': f"{setor} (sintético)",
+            'country': 'Brazil' if brasileiro else 'United States',
+            'currency': 'BRL' if brasileiro else 'USD',
+            'currentPrice': preco,
+            'regularMarketPrice': preco,
+            'marketCap': float(preco * acoes),
+            'trailingPE': float(rng.uniform(4, 40)) if rng.random() > 0.1 else None,
+            'dividendYield': float(rng.uniform(0, 0.1)) if rng.random() > 0.3 else None,
+            'beta': float(rng.normal(1.0, 0.4)),
+            'profitMargins': float(rng.normal(0.12, 0.1))
+        }
+
+    def obter_dividendos(self, ticker: str) -> pd.Series:
+        rng = self._gerador(ticker, 2)
+        dados = self._historico(ticker)
+        if rng.random() < 0.3:
+            return pd.Series(dtype=float, name='Dividends')
+
+        # Pagamentos trimestrais proporcionais ao preço
+        datas = dados.index[::63]
+        valores = dados['Close'].iloc[::63].to_numpy() * rng.uniform(0.005, 0.025)
+        return pd.Series(valores, index=datas, name='Dividends')